@@ -178,7 +178,6 @@ knights_archers_zombies_v10.env(
 
 import os
 import sys
-from itertools import repeat
 
 import gymnasium
 import numpy as np
@@ -190,6 +189,7 @@ from gymnasium.utils import EzPickle, seeding
 from pettingzoo import AECEnv
 from pettingzoo.butterfly.knights_archers_zombies.manual_policy import ManualPolicy
 from pettingzoo.butterfly.knights_archers_zombies.src import constants as const
+from pettingzoo.butterfly.knights_archers_zombies.src.entity_buffer import EntityBuffer
 from pettingzoo.butterfly.knights_archers_zombies.src.img import get_image
 from pettingzoo.butterfly.knights_archers_zombies.src.players import Archer, Knight
 from pettingzoo.butterfly.knights_archers_zombies.src.weapons import Arrow, Sword
@@ -393,6 +393,7 @@ class raw_env(AECEnv, EzPickle):
                 zombie.rect.y = 5
 
                 self.zombie_list.add(zombie)
+                self.entity_buffer.add("zombie", zombie)
                 self.zombie_spawn_rate = 0
 
     # actuate weapons
@@ -402,13 +403,21 @@ class raw_env(AECEnv, EzPickle):
                 if agent.weapon_timeout > const.SWORD_TIMEOUT:
                     # make sure that the current knight doesn't have a sword already
                     if len(agent.weapons) == 0:
-                        agent.weapons.add(Sword(agent))
+                        sword = Sword(agent)
+                        agent.weapons.add(sword)
+                        self.entity_buffer.add(
+                            "sword", sword, self.agent_name_mapping[agent.agent_name]
+                        )
 
             if agent.is_archer:
                 if agent.weapon_timeout > const.ARROW_TIMEOUT:
                     # make sure that the screen has less arrows than allowable
                     if self.num_active_arrows < self.max_arrows:
-                        agent.weapons.add(Arrow(agent))
+                        arrow = Arrow(agent)
+                        agent.weapons.add(arrow)
+                        self.entity_buffer.add(
+                            "arrow", arrow, self.agent_name_mapping[agent.agent_name]
+                        )
 
     # move weapons
     def update_weapons(self):
@@ -540,44 +549,34 @@ class raw_env(AECEnv, EzPickle):
 
             # get the agent position
             agent_state = agent.vector_state
-            agent_pos = np.expand_dims(agent_state[0:2], axis=0)
+            agent_pos = agent_state[0:2]
 
-            # get vector state of everything
-            vector_state = self.get_vector_state()
-            state = vector_state[:, -4:]
-            is_dead = np.sum(np.abs(state), axis=1) == 0.0
-            all_ids = vector_state[:, :-4]
-            all_pos = state[:, 0:2]
-            all_ang = state[:, 2:4]
+            # vector state of everything, rows without an entity are all zero
+            state = self.entity_buffer.state()
+            is_dead = ~self.entity_buffer.live()
+            width = self.entity_buffer.typemask_width
 
-            # get relative positions
-            rel_pos = all_pos - agent_pos
+            # get relative positions and the norm of the relative distance
+            rel_pos = state[:, width : width + 2] - agent_pos
+            norm_pos = np.linalg.norm(rel_pos, axis=1) / np.sqrt(2)
 
-            # get norm of relative distance
-            norm_pos = np.linalg.norm(rel_pos, axis=1, keepdims=True) / np.sqrt(2)
-
-            # kill dead things
-            all_ids[is_dead] *= 0
-            all_ang[is_dead] *= 0
-            rel_pos[is_dead] *= 0
-            norm_pos[is_dead] *= 0
-
-            # combine the typemasks, positions and angles
-            state = np.concatenate([all_ids, norm_pos, rel_pos, all_ang], axis=-1)
-
-            # get the agent state as absolute vector
+            # the agent state as absolute vector on the first row, then the typemasks,
+            # distances, relative positions and angles of everything
             # typemask is one longer to also include norm_pos
+            obs = np.empty((len(state) + 1, width + 5))
+            obs[0, : width + 1] = 0.0
             if self.use_typemasks:
-                typemask = np.zeros(self.typemask_width + 1)
-                typemask[-2] = 1.0
-            else:
-                typemask = np.array([0.0])
-            agent_state = agent.vector_state
-            agent_state = np.concatenate([typemask, agent_state], axis=0)
-            agent_state = np.expand_dims(agent_state, axis=0)
+                obs[0, width - 1] = 1.0
+            obs[0, width + 1 :] = agent_state
+            obs[1:, :width] = state[:, :width]
+            obs[1:, width] = norm_pos
+            obs[1:, width + 1 : width + 3] = rel_pos
+            obs[1:, width + 3 :] = state[:, width + 2 :]
+
+            # kill dead things
+            obs[1:][is_dead] = 0.0
 
-            # prepend agent state to the observation
-            state = np.concatenate([agent_state, state], axis=0)
+            state = obs
             if self.sequence_space:
                 # remove pure zero rows if using sequence space
                 state = state[~np.all(state == 0, axis=-1)]
@@ -596,82 +595,7 @@ class raw_env(AECEnv, EzPickle):
         return state
 
     def get_vector_state(self):
-        state = []
-        typemask = np.array([])
-
-        # handle agents
-        for agent_name in self.possible_agents:
-            if agent_name not in self.dead_agents:
-                agent = self.agent_list[self.agent_name_mapping[agent_name]]
-
-                if self.use_typemasks:
-                    typemask = np.zeros(self.typemask_width)
-                    if agent.is_archer:
-                        typemask[1] = 1.0
-                    elif agent.is_knight:
-                        typemask[2] = 1.0
-
-                vector = np.concatenate((typemask, agent.vector_state), axis=0)
-                state.append(vector)
-            else:
-                state.append(np.zeros(self.vector_width))
-
-        # handle swords
-        for agent in self.agent_list:
-            if agent.is_knight:
-                for sword in agent.weapons:
-                    if self.use_typemasks:
-                        typemask = np.zeros(self.typemask_width)
-                        typemask[4] = 1.0
-
-                    vector = np.concatenate((typemask, sword.vector_state), axis=0)
-                    state.append(vector)
-
-        # handle empty swords
-        state.extend(
-            repeat(
-                np.zeros(self.vector_width),
-                self.num_knights - self.num_active_swords,
-            )
-        )
-
-        # handle arrows
-        for agent in self.agent_list:
-            if agent.is_archer:
-                for arrow in agent.weapons:
-                    if self.use_typemasks:
-                        typemask = np.zeros(self.typemask_width)
-                        typemask[3] = 1.0
-
-                    vector = np.concatenate((typemask, arrow.vector_state), axis=0)
-                    state.append(vector)
-
-        # handle empty arrows
-        state.extend(
-            repeat(
-                np.zeros(self.vector_width),
-                self.max_arrows - self.num_active_arrows,
-            )
-        )
-
-        # handle zombies
-        for zombie in self.zombie_list:
-            if self.use_typemasks:
-                typemask = np.zeros(self.typemask_width)
-                typemask[0] = 1.0
-
-            vector = np.concatenate((typemask, zombie.vector_state), axis=0)
-            state.append(vector)
-
-        # handle empty zombies
-        state.extend(
-            repeat(
-                np.zeros(self.vector_width),
-                self.max_zombies - len(self.zombie_list),
-            )
-        )
-
-        return np.stack(state, axis=0)
+        return self.entity_buffer.state().copy()
 
     def step(self, action):
         # check if the particular agent is done
@@ -694,6 +618,7 @@ class raw_env(AECEnv, EzPickle):
 
         # this is... so whacky... but all actions here are index with 1 so... ok
         action = action + 1
+        self.entity_buffer.invalidate()
         out_of_bounds = agent.update(action)
 
         # check for out of bounds death
@@ -757,6 +682,7 @@ class raw_env(AECEnv, EzPickle):
                 self.terminations[k] = True
                 # add that we know this guy is dead
                 self.dead_agents.append(k)
+                self.entity_buffer.remove_agent(self.agent_name_mapping[k])
 
             # reset the kill list
             self.kill_list = []
@@ -894,6 +820,19 @@ class raw_env(AECEnv, EzPickle):
             self.agent_name_mapping[k_name] = a_count
             a_count += 1
 
+        # vector state of agents, swords, arrows and zombies, in that order
+        self.entity_buffer = EntityBuffer(
+            len(self.agent_list),
+            [
+                ("sword", self.num_knights, 4),
+                ("arrow", self.max_arrows, 3),
+                ("zombie", self.max_zombies, 0),
+            ],
+            typemask_width=self.vector_width - 4,
+        )
+        for i, agent in enumerate(self.agent_list):
+            self.entity_buffer.add_agent(i, agent, 1 if agent.is_archer else 2)
+
         if self.render_mode is not None:
             self.render()
         else:
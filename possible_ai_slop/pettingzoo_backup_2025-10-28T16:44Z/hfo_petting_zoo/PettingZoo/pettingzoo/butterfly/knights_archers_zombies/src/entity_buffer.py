@@ -0,0 +1,126 @@
+import numpy as np
+
+from pettingzoo.butterfly.knights_archers_zombies.src import constants as const
+
+
+class EntityBuffer:
+    """Vector state of every tracked entity, kept in one preallocated array.
+
+    The first rows belong to the agents, one each. Every other entity kind (swords,
+    arrows, zombies) owns a block of rows sized to its capacity. An entity takes a free
+    row of its block when it spawns, which is when its typemask is written, and the row
+    is zeroed and recycled once the sprite has left all of its groups. sync() only
+    refreshes the position and heading columns of the rows in use.
+
+    state() lists the rows in the environment's vector state order: the agents, then
+    for each block its entities ordered by owner and spawn time followed by the block's
+    empty rows.
+    """
+
+    def __init__(self, num_agents, blocks, typemask_width=0):
+        # blocks: a list of (kind, capacity, typemask index)
+        self.num_agents = num_agents
+        self.typemask_width = typemask_width
+        self.num_rows = num_agents + sum(capacity for _, capacity, _ in blocks)
+        self.data = np.zeros((self.num_rows, typemask_width + 4))
+
+        self._blocks = {}
+        self._typemask_index = {}
+        self._free = {}
+        start = num_agents
+        for kind, capacity, typemask_index in blocks:
+            self._blocks[kind] = range(start, start + capacity)
+            self._typemask_index[kind] = typemask_index
+            self._free[kind] = list(reversed(self._blocks[kind]))
+            start += capacity
+
+        self._entities = [None] * self.num_rows
+        self._live = np.zeros(self.num_rows, dtype=bool)
+        self._order_key = np.zeros(self.num_rows, dtype=np.int64)
+        self._spawned = 0
+        self._rows = None
+        self._state = None
+        self._state_live = None
+
+    def add_agent(self, index, agent, typemask_index):
+        self._take(index, agent, typemask_index)
+
+    def remove_agent(self, index):
+        self._release(index)
+
+    def add(self, kind, entity, owner=0):
+        """Give entity a row of its kind's block; owner orders it among its kind."""
+        free = self._free[kind]
+        if not free:
+            self._release_dead(kind)
+        row = free.pop()
+        self._take(row, entity, self._typemask_index[kind])
+        self._order_key[row] = (owner << 32) + self._spawned
+        self._spawned += 1
+
+    def _take(self, row, entity, typemask_index):
+        self._entities[row] = entity
+        self._live[row] = True
+        if self.typemask_width:
+            self.data[row, typemask_index] = 1.0
+        self._rows = None
+        self.invalidate()
+
+    def _release(self, row):
+        self._entities[row] = None
+        self._live[row] = False
+        self.data[row] = 0.0
+        self._rows = None
+        self.invalidate()
+
+    def _release_dead(self, kind):
+        for row in self._blocks[kind]:
+            entity = self._entities[row]
+            if entity is not None and not entity.alive():
+                self._release(row)
+                self._free[kind].append(row)
+
+    def invalidate(self):
+        """Mark positions and headings as out of date, e.g. after a step."""
+        self._state = None
+
+    def sync(self):
+        for kind in self._blocks:
+            self._release_dead(kind)
+        rows = np.flatnonzero(self._live)
+        if len(rows):
+            self.data[rows, -4:] = [
+                (e.rect.x, e.rect.y, *e.direction)
+                for e in map(self._entities.__getitem__, rows)
+            ]
+            self.data[rows, -4] /= const.SCREEN_WIDTH
+            self.data[rows, -3] /= const.SCREEN_HEIGHT
+
+    def rows(self):
+        """Row order of state(), recomputed only when entities come or go."""
+        if self._rows is None:
+            order = [np.arange(self.num_agents)]
+            for block in self._blocks.values():
+                block = np.arange(block.start, block.stop)
+                live = self._live[block]
+                order.append(block[live][np.argsort(self._order_key[block][live])])
+                order.append(block[~live])
+            self._rows = np.concatenate(order)
+        return self._rows
+
+    def state(self):
+        """(num_rows, typemask_width + 4) vector state, all zero on empty rows.
+
+        The array is cached until the next invalidate() and must not be modified.
+        """
+        if self._state is None:
+            self.sync()
+            rows = self.rows()
+            self._state = self.data[rows]
+            self._state_live = self._live[rows]
+        return self._state
+
+    def live(self):
+        """Which rows of state() hold an entity."""
+        self.state()
+        return self._state_live
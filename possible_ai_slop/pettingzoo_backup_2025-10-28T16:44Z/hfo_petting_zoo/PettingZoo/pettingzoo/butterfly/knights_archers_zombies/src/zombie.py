@@ -12,6 +12,7 @@ class Zombie(pygame.sprite.Sprite):
         super().__init__()
         self.image = get_image(os.path.join("img", "zombie.png"))
         self.rect = self.image.get_rect(center=(50, 50))
+        self.direction = pygame.Vector2(0, 1)
         self.randomizer = randomizer
 
         self.x_lims = [const.SCREEN_UNITS, const.SCREEN_WIDTH - const.SCREEN_UNITS]
@@ -22,8 +23,7 @@ class Zombie(pygame.sprite.Sprite):
             [
                 self.rect.x / const.SCREEN_WIDTH,
                 self.rect.y / const.SCREEN_HEIGHT,
-                0.0,
-                1.0,
+                *self.direction,
             ]
         )
 
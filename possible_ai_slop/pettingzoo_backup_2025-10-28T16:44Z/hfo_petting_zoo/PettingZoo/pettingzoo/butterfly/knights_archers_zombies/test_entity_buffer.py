@@ -0,0 +1,73 @@
+"""Test cases for the preallocated knights_archers_zombies vector state."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly.knights_archers_zombies.knights_archers_zombies import (
+    raw_env,
+)
+
+
+def reference_state(env):
+    """Vector state rebuilt from the sprite groups, entity by entity."""
+    width = env.vector_width - 4
+
+    def row(entity, typemask_index):
+        typemask = np.zeros(width)
+        if width:
+            typemask[typemask_index] = 1.0
+        return np.concatenate([typemask, entity.vector_state])
+
+    rows = []
+    for name in env.possible_agents:
+        agent = env.agent_list[env.agent_name_mapping[name]]
+        if name in env.dead_agents:
+            rows.append(np.zeros(env.vector_width))
+        else:
+            rows.append(row(agent, 1 if agent.is_archer else 2))
+    blocks = [
+        (
+            [w for a in env.agent_list if a.is_knight for w in a.weapons],
+            4,
+            env.num_knights,
+        ),
+        (
+            [w for a in env.agent_list if a.is_archer for w in a.weapons],
+            3,
+            env.max_arrows,
+        ),
+        (list(env.zombie_list), 0, env.max_zombies),
+    ]
+    for entities, typemask_index, capacity in blocks:
+        rows.extend(row(e, typemask_index) for e in entities)
+        rows.extend(np.zeros(env.vector_width) for _ in range(capacity - len(entities)))
+    return np.stack(rows)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"use_typemasks": True, "num_archers": 3, "max_arrows": 4, "spawn_rate": 2},
+        {"use_typemasks": True, "sequence_space": True, "line_death": True},
+    ],
+)
+def test_vector_state_matches_sprites(kwargs):
+    env = raw_env(max_cycles=200, **kwargs)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    for agent in env.agent_iter():
+        state = env.state()
+        assert np.array_equal(state, reference_state(env))
+
+        obs = env.observe(agent)
+        if not env.sequence_space:
+            assert obs.shape == env.observation_space(agent).shape
+        # everything but the agent row is relative to the observing agent
+        live = np.any(state != 0, axis=1)
+        assert np.count_nonzero(np.any(obs[1:] != 0, axis=1)) == np.count_nonzero(live)
+
+        done = env.terminations[agent] or env.truncations[agent]
+        env.step(None if done else int(rng.choice(6, p=[0.2, 0.1, 0.1, 0.1, 0.4, 0.1])))
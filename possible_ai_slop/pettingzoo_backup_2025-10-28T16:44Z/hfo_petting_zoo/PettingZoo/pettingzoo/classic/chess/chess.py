@@ -119,6 +119,20 @@ from pettingzoo.utils import wrappers
 from pettingzoo.utils.agent_selector import AgentSelector
 
 
+# Channel order of the observation seen by player_1: per history board, the 6 white
+# and the 6 black piece channels are swapped
+def _player_1_channels():
+    channels = np.arange(111)
+    for board in range(8):
+        ours = 7 + 13 * board
+        channels[ours : ours + 6] += 6
+        channels[ours + 6 : ours + 12] -= 6
+    return channels
+
+
+PLAYER_1_CHANNELS = _player_1_channels()
+
+
 def env(**kwargs):
     env = raw_env(**kwargs)
     env = wrappers.TerminateIllegalWrapper(env, illegal_reward=-1)
@@ -168,7 +182,10 @@ class raw_env(AECEnv, EzPickle):
 
         self.agent_selection = None
 
-        self.board_history = np.zeros((8, 8, 104), dtype=bool)
+        # Observation planes from white's side: 7 auxiliary planes followed by the
+        # board history, which is shifted in place by one board per move
+        self._planes = np.zeros((8, 8, 111), dtype=bool)
+        self.board_history = self._planes[:, :, 7:]
 
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
@@ -210,26 +227,20 @@ class raw_env(AECEnv, EzPickle):
     def observe(self, agent):
         current_index = self.possible_agents.index(agent)
 
-        observation = chess_utils.get_observation(self.board, current_index)
-        observation = np.dstack((observation[:, :, :7], self.board_history))
-        # We need to swap the white 6 channels with black 6 channels
-        if current_index == 1:
-            # 1. Mirror the board
-            observation = np.flip(observation, axis=0)
-            # 2. Swap the white 6 channels with the black 6 channels
-            for i in range(1, 9):
-                tmp = observation[..., 13 * i - 6 : 13 * i].copy()
-                observation[..., 13 * i - 6 : 13 * i] = observation[
-                    ..., 13 * i : 13 * i + 6
-                ]
-                observation[..., 13 * i : 13 * i + 6] = tmp
-        legal_moves = (
-            chess_utils.legal_moves(self.board) if agent == self.agent_selection else []
+        self._planes[:, :, :7] = chess_utils.boards_to_ndarray(
+            chess_utils.aux_masks(self.board, current_index)
         )
+        if current_index == 0:
+            observation = self._planes.copy()
+        else:
+            # Mirror the board and swap the white 6 channels with the black 6
+            # channels of every board in the history
+            observation = self._planes[::-1, :, PLAYER_1_CHANNELS]
 
-        action_mask = np.zeros(4672, "int8")
-        for i in legal_moves:
-            action_mask[i] = 1
+        if agent == self.agent_selection:
+            action_mask = chess_utils.legal_action_mask(self.board)
+        else:
+            action_mask = np.zeros(4672, "int8")
 
         return {"observation": observation, "action_mask": action_mask}
 
@@ -247,7 +258,7 @@ class raw_env(AECEnv, EzPickle):
         self.truncations = {name: False for name in self.agents}
         self.infos = {name: {} for name in self.agents}
 
-        self.board_history = np.zeros((8, 8, 104), dtype=bool)
+        self._planes.fill(False)
 
         if self.render_mode == "human":
             self.render()
@@ -275,9 +286,8 @@ class raw_env(AECEnv, EzPickle):
         assert chosen_move in self.board.legal_moves
         self.board.push(chosen_move)
 
-        next_legal_moves = chess_utils.legal_moves(self.board)
-
-        is_stale_or_checkmate = not any(next_legal_moves)
+        # the legal move generator is truthy as soon as one legal move exists
+        is_stale_or_checkmate = not self.board.legal_moves
 
         # claim draw is set to be true to align with normal tournament rules
         is_insufficient_material = self.board.is_insufficient_material()
@@ -293,9 +303,9 @@ class raw_env(AECEnv, EzPickle):
 
         # Update board after applying action
         # We always take the perspective of the white agent
-        next_board = chess_utils.get_observation(self.board, player=0)
-        self.board_history = np.dstack(
-            (next_board[:, :, 7:], self.board_history[:, :, :-13])
+        self.board_history[:, :, 13:] = self.board_history[:, :, :-13]
+        self.board_history[:, :, :13] = chess_utils.boards_to_ndarray(
+            chess_utils.board_masks(self.board, player=0)
         )
         self.agent_selection = (
             self._agent_selector.next()
@@ -136,21 +136,24 @@ def get_move_plane(move):
 moves_to_actions = {}
 actions_to_moves = {}
 
+TOTAL_ACTIONS = 8 * 8 * 73
 
-def action_to_move(board: chess.Board, action, player: int):
-    base_move = chess.Move.from_uci(actions_to_moves[action])
 
-    base_coord = square_to_coord(base_move.from_square)
-    mirr_move = mirror_move(base_move) if player else base_move
-    if mirr_move.promotion == chess.QUEEN:
-        mirr_move.promotion = None
+def action_to_move(board: chess.Board, action, player: int):
+    from_square, to_square, promotion = _action_moves[action]
+    base_rank = chess.square_rank(from_square)
+    if player:
+        from_square = chess.square_mirror(from_square)
+        to_square = chess.square_mirror(to_square)
+    if promotion == chess.QUEEN:
+        promotion = None
     if (
-        mirr_move.promotion is None
-        and str(board.piece_at(mirr_move.from_square)).lower() == "p"
-        and base_coord[1] == 6
+        promotion is None
+        and board.piece_type_at(from_square) == chess.PAWN
+        and base_rank == 6
     ):
-        mirr_move.promotion = chess.QUEEN
-    return mirr_move
+        promotion = chess.QUEEN
+    return chess.Move(from_square, to_square, promotion=promotion)
 
 
 def make_move_mapping(uci_move):
@@ -164,6 +167,39 @@ def make_move_mapping(uci_move):
 
     moves_to_actions[uci_move] = cur_action
     actions_to_moves[cur_action] = uci_move
+    return cur_action
+
+
+def _build_move_tables():
+    """Encode every move that can ever be legal, from white's point of view.
+
+    Fills moves_to_actions / actions_to_moves up front and returns the flat
+    (from_square, to_square, promotion) -> action list used by legal_moves and the
+    action -> (from_square, to_square, promotion) table used by action_to_move.
+    """
+    move_actions = [-1] * (64 * 64 * 7)
+    action_moves = {}
+    for from_square in chess.SQUARES:
+        for to_square in chess.SQUARES:
+            dx, dy = diff(square_to_coord(from_square), square_to_coord(to_square))
+            if from_square == to_square or not (
+                is_knight_move((dx, dy)) or dx == 0 or dy == 0 or abs(dx) == abs(dy)
+            ):
+                continue
+            promotions = [None]
+            if chess.square_rank(from_square) == 6 and dy == 1 and abs(dx) <= 1:
+                promotions += [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]
+            for promotion in promotions:
+                move = chess.Move(from_square, to_square, promotion=promotion)
+                action = make_move_mapping(move.uci())
+                move_actions[
+                    (from_square * 64 + to_square) * 7 + (promotion or 0)
+                ] = action
+                action_moves.setdefault(action, (from_square, to_square, promotion))
+    return move_actions, action_moves
+
+
+_move_actions, _action_moves = _build_move_tables()
 
 
 def legal_moves(orig_board: chess.Board):
@@ -178,151 +214,78 @@ def legal_moves(orig_board: chess.Board):
     underpromotions for pawn moves or captures in two possible diagonals, to knight, bishop or
     rook respectively. Other pawn moves or captures from the seventh rank are promoted to a
     queen
-    """
-    if orig_board.turn == chess.BLACK:  # white is 1, black is 0
-        board = orig_board.mirror()
-    else:
-        board = orig_board
-
-    legal_moves = []
-    for move in board.legal_moves:
-        uci_move = move.uci()
-        if uci_move in moves_to_actions:
-            legal_moves.append(moves_to_actions[move.uci()])
-        else:
-            make_move_mapping(uci_move)
-            legal_moves.append(moves_to_actions[move.uci()])
-
-    return legal_moves
 
-
-def get_observation(orig_board: chess.Board, player: int):
-    """Returns observation array.
-
-    Observation is an 8x8x(P + L) dimensional array.
-    P is going to be your pieces positions + your opponents pieces positions
-    L is going to be some metadata such as repetition count,,
-    """
-    board = orig_board
-    if player:
-        board = board.mirror()
-    else:
-        board = board
-
-    all_squares = chess.SquareSet(chess.BB_ALL)
-    HISTORY_LEN = 1
-    PLANES_PER_BOARD = 13
-    AUX_SIZE = 7
-    RESULT_SIZE = AUX_SIZE + HISTORY_LEN * PLANES_PER_BOARD
-    result = [chess.SquareSet(chess.BB_EMPTY) for _ in range(RESULT_SIZE)]
-    AUX_OFF = 0
-    BASE = AUX_SIZE
-
-    """        // "Legacy" input planes with:
-    // - Plane 104 (0-based) filled with 1 if white can castle queenside.
-    // - Plane 105 filled with ones if white can castle kingside.
-    // - Plane 106 filled with ones if black can castle queenside.
-    // - Plane 107 filled with ones if white can castle kingside.
-    if (board.castlings().we_can_000()) result[kAuxPlaneBase + 0].SetAll();
-    if (board.castlings().we_can_00()) result[kAuxPlaneBase + 1].SetAll();
-    if (board.castlings().they_can_000()) {
-      result[kAuxPlaneBase + 2].SetAll();
-    }
-    if (board.castlings().they_can_00()) result[kAuxPlaneBase + 3].SetAll();
+    Moves of black are encoded on the mirrored board (white is 1, black is 0).
     """
-    if board.castling_rights & chess.BB_H1:
-        result[AUX_OFF + 0] = all_squares
-    if board.castling_rights & chess.BB_A1:
-        result[AUX_OFF + 1] = all_squares
-    if board.castling_rights & chess.BB_H8:
-        result[AUX_OFF + 2] = all_squares
-    if board.castling_rights & chess.BB_A8:
-        result[AUX_OFF + 3] = all_squares
+    flip = 56 if orig_board.turn == chess.BLACK else 0
+    table = _move_actions
+    return [
+        table[
+            ((move.from_square ^ flip) * 64 + (move.to_square ^ flip)) * 7
+            + (move.promotion or 0)
+        ]
+        for move in orig_board.generate_legal_moves()
+    ]
+
+
+def legal_action_mask(board: chess.Board):
+    """Returns the (4672,) int8 mask of the legal actions of the player to move."""
+    action_mask = np.zeros(TOTAL_ACTIONS, "int8")
+    action_mask[legal_moves(board)] = 1
+    return action_mask
+
+
+# In the module `chess`, the color is represented by 1 for white and 0 for black.
+PIECE_TYPES = (
+    chess.PAWN,
+    chess.KNIGHT,
+    chess.BISHOP,
+    chess.ROOK,
+    chess.QUEEN,
+    chess.KING,
+)
+AUX_SIZE = 7
+PLANES_PER_BOARD = 13
+
+
+def aux_masks(orig_board: chess.Board, player: int):
+    """Bitboards of the 7 auxiliary planes of get_observation.
+
+    Legacy lc0 input planes, seen from player's side of the board:
+    - 0/1: filled if we can castle kingside / queenside
+    - 2/3: filled if they can castle kingside / queenside
+    - 4: filled if we are black
+    - 5: the square halfmove_clock // 2 set
+    - 6: all ones, to help the network find the board edges
     """
-        if (we_are_black) result[kAuxPlaneBase + 4].SetAll();
-        result[kAuxPlaneBase + 5].Fill(history.Last().GetNoCaptureNoPawnPly());
-        // Plane kAuxPlaneBase + 6 used to be movecount plane, now it's all zeros.
-        // Plane kAuxPlaneBase + 7 is all ones to help NN find board edges.
-        result[kAuxPlaneBase + 7].SetAll();
-      }
-      """
+    castling_rights = orig_board.castling_rights
     if player:
-        result[AUX_OFF + 4] = all_squares
-    result[AUX_OFF + 5].add(board.halfmove_clock // 2)
-    result[AUX_OFF + 6] = all_squares
-    """
-      bool flip = false;
-      int history_idx = history.GetLength() - 1;
-      for (int i = 0; i < std::min(history_planes, kMoveHistory);
-           ++i, --history_idx) {
-        const Position& position =
-            history.GetPositionAt(history_idx < 0 ? 0 : history_idx);
-        const ChessBoard& board =
-            flip ? position.GetThemBoard() : position.GetBoard();
-        if (history_idx < 0 && fill_empty_history == FillEmptyHistory::NO) break;
-        // Board may be flipped so compare with position.GetBoard().
-        if (history_idx < 0 && fill_empty_history == FillEmptyHistory::FEN_ONLY &&
-            position.GetBoard() == ChessBoard::kStartposBoard) {
-          break;
-        }
-
-        const int base = i * kPlanesPerBoard;
-        result[base + 0].mask = (board.ours() & board.pawns()).as_int();
-        result[base + 1].mask = (board.our_knights()).as_int();
-        result[base + 2].mask = (board.ours() & board.bishops()).as_int();
-        result[base + 3].mask = (board.ours() & board.rooks()).as_int();
-        result[base + 4].mask = (board.ours() & board.queens()).as_int();
-        result[base + 5].mask = (board.our_king()).as_int();
-
-        result[base + 6].mask = (board.theirs() & board.pawns()).as_int();
-        result[base + 7].mask = (board.their_knights()).as_int();
-        result[base + 8].mask = (board.theirs() & board.bishops()).as_int();
-        result[base + 9].mask = (board.theirs() & board.rooks()).as_int();
-        result[base + 10].mask = (board.theirs() & board.queens()).as_int();
-        result[base + 11].mask = (board.their_king()).as_int();
-
-        """
-    base = BASE
-    # In the module `chess`, the color is represented by 1 for white and 0 for black.
-    OURS = 1
-    THEIRS = 0
-    result[base + 0] = board.pieces(chess.PAWN, OURS)
-    result[base + 1] = board.pieces(chess.KNIGHT, OURS)
-    result[base + 2] = board.pieces(chess.BISHOP, OURS)
-    result[base + 3] = board.pieces(chess.ROOK, OURS)
-    result[base + 4] = board.pieces(chess.QUEEN, OURS)
-    result[base + 5] = board.pieces(chess.KING, OURS)
-
-    result[base + 6] = board.pieces(chess.PAWN, THEIRS)
-    result[base + 7] = board.pieces(chess.KNIGHT, THEIRS)
-    result[base + 8] = board.pieces(chess.BISHOP, THEIRS)
-    result[base + 9] = board.pieces(chess.ROOK, THEIRS)
-    result[base + 10] = board.pieces(chess.QUEEN, THEIRS)
-    result[base + 11] = board.pieces(chess.KING, THEIRS)
-
-    """
-    const int repetitions = position.GetRepetitions();
-    if (repetitions >= 1) result[base + 12].SetAll();
-    """
-    has_repeated = board.is_repetition(2)
-    if has_repeated >= 1:
-        result[base + 12] = all_squares
-    """
-        // If en passant flag is set, undo last pawn move by removing the pawn from
-        // the new square and putting into pre-move square.
-        if (history_idx < 0 && !board.en_passant().empty()) {
-          const auto idx = GetLowestBit(board.en_passant().as_int());
-          if (idx < 8) {  // "Us" board
-            result[base + 0].mask +=
-                ((0x0000000000000100ULL - 0x0000000001000000ULL) << idx);
-          } else {
-            result[base + 6].mask +=
-                ((0x0001000000000000ULL - 0x0000000100000000ULL) << (idx - 56));
-          }
-        }
-        if (history_idx > 0) flip = !flip;
-      }
+        castling_rights = chess.flip_vertical(castling_rights)
+    return [
+        chess.BB_ALL if castling_rights & chess.BB_H1 else chess.BB_EMPTY,
+        chess.BB_ALL if castling_rights & chess.BB_A1 else chess.BB_EMPTY,
+        chess.BB_ALL if castling_rights & chess.BB_H8 else chess.BB_EMPTY,
+        chess.BB_ALL if castling_rights & chess.BB_A8 else chess.BB_EMPTY,
+        chess.BB_ALL if player else chess.BB_EMPTY,
+        1 << (orig_board.halfmove_clock // 2),
+        chess.BB_ALL,
+    ]
+
+
+def board_masks(orig_board: chess.Board, player: int):
+    """Bitboards of the 13 piece planes of get_observation.
+
+    Our 6 piece types, their 6 piece types and a plane filled if the position has
+    repeated, all read from the bitboards python-chess keeps up to date on push/pop.
+    For player 1 the board is mirrored (and has no move stack, so no repetition).
     """
+    ours, theirs = (chess.BLACK, chess.WHITE) if player else (chess.WHITE, chess.BLACK)
+    masks = [orig_board.pieces_mask(piece, ours) for piece in PIECE_TYPES]
+    masks += [orig_board.pieces_mask(piece, theirs) for piece in PIECE_TYPES]
+    if player:
+        masks = [chess.flip_vertical(mask) for mask in masks]
+    has_repeated = not player and orig_board.is_repetition(2)
+    masks.append(chess.BB_ALL if has_repeated else chess.BB_EMPTY)
 
     """
     The LeelaChessZero-style en passant flag.
@@ -354,7 +317,9 @@ def get_observation(orig_board: chess.Board, player: int):
     """
 
     # square where the en passant happened, ranging from 0 to 63 (int)
-    square = board.ep_square
+    square = orig_board.ep_square
+    if square is not None and player:
+        square = chess.square_mirror(square)
     if square:
         # Less than 32 is a white square, otherwise it's a black square
         ours = square < 32
@@ -362,14 +327,25 @@ def get_observation(orig_board: chess.Board, player: int):
         dest_col_add = 0 if ours else 8 * 7
         dest_square = dest_col_add + row
         if ours:
-            # Set the `square + 8` position in channel `base` to False
-            result[base + 0].remove(square + 8)
-            # Set the `dest_square` position in channel `base` to True
-            result[base + 0].add(dest_square)
+            # Move our pawn from `square + 8` to `dest_square`
+            masks[0] = (masks[0] & ~chess.BB_SQUARES[square + 8]) | chess.BB_SQUARES[
+                dest_square
+            ]
         else:
-            # Set the `square + 8` position in channel `base` to False
-            result[base + 6].remove(square - 8)
-            # Set the `dest_square` position in channel `base` to True
-            result[base + 6].add(dest_square)
+            # Move their pawn from `square - 8` to `dest_square`
+            masks[6] = (masks[6] & ~chess.BB_SQUARES[square - 8]) | chess.BB_SQUARES[
+                dest_square
+            ]
+    return masks
+
+
+def get_observation(orig_board: chess.Board, player: int):
+    """Returns observation array.
 
-    return boards_to_ndarray(result)
+    Observation is an 8x8x(P + L) dimensional array.
+    P is going to be your pieces positions + your opponents pieces positions
+    L is going to be some metadata such as repetition count,,
+    """
+    return boards_to_ndarray(
+        aux_masks(orig_board, player) + board_masks(orig_board, player)
+    )
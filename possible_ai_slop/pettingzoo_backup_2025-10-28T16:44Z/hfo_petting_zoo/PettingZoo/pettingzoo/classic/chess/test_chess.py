@@ -65,3 +65,52 @@ def test_chess():
     _ = chess_utils.get_observation(board, player=1)
     board.push_san("c4")
     _ = chess_utils.get_observation(board, player=1)
+
+
+def test_move_tables():
+    # every encodable move is in the tables, with queen promotions sharing the queen plane
+    # 1456 queen moves, 336 knight moves and 22 pawn moves to 3 underpromotions
+    assert len(chess_utils.actions_to_moves) == 1456 + 336 + 22 * 3
+    assert chess_utils.moves_to_actions["e7e8q"] == chess_utils.moves_to_actions["e7e8"]
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        board = chess.Board()
+        while not board.is_game_over() and board.ply() < 200:
+            player = 0 if board.turn == chess.WHITE else 1
+            actions = chess_utils.legal_moves(board)
+            mask = chess_utils.legal_action_mask(board)
+            assert mask.sum() == len(actions) == board.legal_moves.count()
+            moves = {chess_utils.action_to_move(board, a, player) for a in actions}
+            assert moves == set(board.legal_moves)
+            board.push(chess_utils.action_to_move(board, rng.choice(actions), player))
+
+
+def test_observation_planes():
+    from pettingzoo.classic.chess.chess import raw_env
+
+    env = raw_env()
+    env.reset()
+    rng = np.random.default_rng(0)
+    for ply in range(60):
+        white = env.observe("player_0")["observation"]
+        black = env.observe("player_1")["observation"]
+        assert white.shape == black.shape == (8, 8, 111)
+        # the latest board is the white-side view of the current position
+        if ply:
+            latest = chess_utils.get_observation(env.board, 0)[:, :, 7:]
+            assert np.array_equal(white[:, :, 7:20], latest)
+        else:
+            assert not white[:, :, 7:].any()
+        for i in range(8):
+            ours, theirs = 7 + 13 * i, 13 + 13 * i
+            assert np.array_equal(
+                black[::-1, :, ours:theirs], white[:, :, theirs : theirs + 6]
+            )
+            assert np.array_equal(
+                black[::-1, :, theirs : theirs + 6], white[:, :, ours:theirs]
+            )
+        mask = env.observe(env.agent_selection)["action_mask"]
+        env.step(rng.choice(np.flatnonzero(mask)))
+        if any(env.terminations.values()):
+            break
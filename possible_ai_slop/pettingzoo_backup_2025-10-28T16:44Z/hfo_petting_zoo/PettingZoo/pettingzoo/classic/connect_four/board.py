@@ -0,0 +1,180 @@
+"""Bitboard engine for Connect Four.
+
+Each player's pieces are one integer mask. Every column uses ROWS + 1 bits (bottom
+row first) and the extra bit on top of each column is always zero, so shifting a mask
+by 1 (vertical), ROWS + 1 (horizontal), ROWS (one diagonal) or ROWS + 2 (the other)
+never wraps into the next column. Four in a row is then two shift-and-and steps per
+direction, whatever the number of pieces on the board.
+
+Board plays a single game with python integers and keeps the (6, 7, 2) observation
+planes up to date one cell per move. BoardBatch steps N games at once on uint64 arrays,
+e.g. to generate self-play data.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+ROWS = 6
+COLS = 7
+COLUMN_BITS = ROWS + 1
+
+# vertical, horizontal and the two diagonals
+DIRECTIONS = (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1)
+
+# bit of the cell at (row, col), with row 0 at the top of the board
+CELL_BITS = np.array(
+    [
+        [col * COLUMN_BITS + (ROWS - 1 - row) for col in range(COLS)]
+        for row in range(ROWS)
+    ],
+    dtype=np.uint64,
+)
+
+
+def connected_four(mask):
+    """Whether the pieces in mask contain four in a row (python int or uint64 array)."""
+    if isinstance(mask, np.ndarray):
+        found = np.zeros(mask.shape, dtype=bool)
+        for shift in DIRECTIONS:
+            pairs = mask & (mask >> np.uint64(shift))
+            found |= (pairs & (pairs >> np.uint64(2 * shift))) != 0
+        return found
+    for shift in DIRECTIONS:
+        pairs = mask & (mask >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class Board:
+    """Board for a single Connect Four game.
+
+    Players are 0 and 1. The board can be viewed as the flat, row-major list used by
+    the environment (0 empty, 1 and 2 for the players' pieces) through squares().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.masks = [0, 0]
+        self.heights = [0] * COLS
+        self.moves = 0
+        # planes[row, col, player] is 1 where the player has a piece
+        self.planes = np.zeros((ROWS, COLS, 2), dtype=np.int8)
+
+    def play(self, player, col):
+        """Drop a piece of player into col and return whether that move wins."""
+        col = int(col)
+        assert 0 <= col < COLS and self.heights[col] < ROWS, "played illegal move."
+        height = self.heights[col]
+        self.masks[player] |= 1 << (col * COLUMN_BITS + height)
+        self.heights[col] = height + 1
+        self.moves += 1
+        self.planes[ROWS - 1 - height, col, player] = 1
+        return connected_four(self.masks[player])
+
+    def is_win(self, player):
+        return connected_four(self.masks[player])
+
+    def is_full(self):
+        return self.moves == ROWS * COLS
+
+    def legal_moves(self):
+        return [col for col in range(COLS) if self.heights[col] < ROWS]
+
+    def legal_mask(self):
+        return np.array([h < ROWS for h in self.heights], dtype=np.int8)
+
+    def observation(self, player):
+        """(6, 7, 2) planes: the player's pieces first, then the opponent's."""
+        if player == 0:
+            return self.planes.copy()
+        return self.planes[:, :, ::-1].copy()
+
+    def squares(self):
+        return (self.planes[:, :, 0] + 2 * self.planes[:, :, 1]).ravel().tolist()
+
+
+class BoardBatch:
+    """N independent Connect Four games stepped together.
+
+    Player 0 moves first in every game. step() takes one column per game, ignores
+    games that are already over and returns the per-player rewards of that step
+    (+1 for the winner, -1 for the loser) together with the done flags.
+
+    Example of usage:
+
+    games = BoardBatch(1024)
+    rng = np.random.default_rng(0)
+    while not games.done.all():
+        obs, mask = games.observations(), games.legal_mask()
+        actions = (rng.random(mask.shape) * mask).argmax(axis=1)
+        rewards, done = games.step(actions)
+    """
+
+    def __init__(self, n_games):
+        self.n_games = n_games
+        self.masks = np.zeros((n_games, 2), dtype=np.uint64)
+        self.heights = np.zeros((n_games, COLS), dtype=np.int8)
+        self.moves = np.zeros(n_games, dtype=np.int16)
+        self.winner = np.full(n_games, -1, dtype=np.int8)
+        self.done = np.zeros(n_games, dtype=bool)
+
+    def reset(self, games=None):
+        """Reset all games, or only the given indices / boolean mask."""
+        games = slice(None) if games is None else games
+        self.masks[games] = 0
+        self.heights[games] = 0
+        self.moves[games] = 0
+        self.winner[games] = -1
+        self.done[games] = False
+
+    @property
+    def to_move(self):
+        return self.moves % 2
+
+    def legal_mask(self):
+        """(n_games, 7) int8 action masks; all zero for finished games."""
+        return ((self.heights < ROWS) & ~self.done[:, None]).astype(np.int8)
+
+    def observations(self, player=None):
+        """(n_games, 6, 7, 2) int8 planes from the view of player (default: the player to move)."""
+        first = (
+            self.to_move if player is None else np.broadcast_to(player, self.n_games)
+        )
+        games = np.arange(self.n_games)
+        masks = np.stack(
+            [self.masks[games, first], self.masks[games, 1 - first]], axis=-1
+        )
+        planes = (masks[:, None, None, :] >> CELL_BITS[None, :, :, None]) & np.uint64(1)
+        return planes.astype(np.int8)
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.zeros((self.n_games, 2), dtype=np.int8)
+        games = np.flatnonzero(~self.done)
+        if len(games) == 0:
+            return rewards, self.done.copy()
+
+        cols = actions[games]
+        assert np.all((cols >= 0) & (cols < COLS)), "played illegal move."
+        heights = self.heights[games, cols]
+        assert np.all(heights < ROWS), "played illegal move."
+
+        player = self.to_move[games]
+        bits = np.left_shift(
+            np.uint64(1), (cols * COLUMN_BITS + heights).astype(np.uint64)
+        )
+        self.masks[games, player] |= bits
+        self.heights[games, cols] += 1
+        self.moves[games] += 1
+
+        won = connected_four(self.masks[games, player])
+        winners, winner_player = games[won], player[won]
+        rewards[winners, winner_player] = 1
+        rewards[winners, 1 - winner_player] = -1
+        self.winner[winners] = winner_player
+        self.done[games[won | (self.moves[games] == ROWS * COLS)]] = True
+        return rewards, self.done.copy()
@@ -68,6 +68,7 @@ from gymnasium import spaces
 from gymnasium.utils import EzPickle
 
 from pettingzoo import AECEnv
+from pettingzoo.classic.connect_four.board import Board
 from pettingzoo.utils import wrappers
 from pettingzoo.utils.agent_selector import AgentSelector
 
@@ -107,12 +108,12 @@ class raw_env(AECEnv, EzPickle):
         # blank space = 0
         # agent 0 -- 1
         # agent 1 -- 2
-        # flat representation in row major order
+        # flat representation in row major order, see board
         self.screen = None
         self.render_mode = render_mode
         self.screen_scaling = screen_scaling
 
-        self.board = [0] * (6 * 7)
+        self.game = Board()
 
         self.agents = ["player_0", "player_1"]
         self.possible_agents = self.agents[:]
@@ -147,22 +148,21 @@ class raw_env(AECEnv, EzPickle):
     #        [2, 0, 0, 0, 1, 1, 0],
     #        [1, 1, 2, 1, 0, 1, 0]], dtype=int8)
     def observe(self, agent):
-        board_vals = np.array(self.board).reshape(6, 7)
         cur_player = self.possible_agents.index(agent)
-        opp_player = (cur_player + 1) % 2
+        observation = self.game.observation(cur_player)
 
-        cur_p_board = np.equal(board_vals, cur_player + 1)
-        opp_p_board = np.equal(board_vals, opp_player + 1)
-
-        observation = np.stack([cur_p_board, opp_p_board], axis=2).astype(np.int8)
-        legal_moves = self._legal_moves() if agent == self.agent_selection else []
-
-        action_mask = np.zeros(7, "int8")
-        for i in legal_moves:
-            action_mask[i] = 1
+        if agent == self.agent_selection:
+            action_mask = self.game.legal_mask()
+        else:
+            action_mask = np.zeros(7, "int8")
 
         return {"observation": observation, "action_mask": action_mask}
 
+    @property
+    def board(self):
+        """Flat, row-major view of the board: 0 empty, 1 for player_0, 2 for player_1."""
+        return self.game.squares()
+
     def observation_space(self, agent):
         return self.observation_spaces[agent]
 
@@ -170,7 +170,7 @@ class raw_env(AECEnv, EzPickle):
         return self.action_spaces[agent]
 
     def _legal_moves(self):
-        return [i for i in range(7) if self.board[i] == 0]
+        return self.game.legal_moves()
 
     # action in this case is a value from 0 to 6 indicating position to move on the flat representation of the connect4 board
     def step(self, action):
@@ -179,26 +179,18 @@ class raw_env(AECEnv, EzPickle):
             or self.terminations[self.agent_selection]
         ):
             return self._was_dead_step(action)
-        # assert valid move
-        assert self.board[0:7][action] == 0, "played illegal move."
-
-        piece = self.agents.index(self.agent_selection) + 1
-        for i in list(filter(lambda x: x % 7 == action, list(range(41, -1, -1)))):
-            if self.board[i] == 0:
-                self.board[i] = piece
-                break
+        # play asserts that the move is valid and checks the lines through it
+        winner = self.game.play(self.agents.index(self.agent_selection), action)
 
         next_agent = self._agent_selector.next()
 
-        winner = self.check_for_winner()
-
         # check if there is a winner
         if winner:
             self.rewards[self.agent_selection] += 1
             self.rewards[next_agent] -= 1
             self.terminations = {i: True for i in self.agents}
         # check if there is a tie
-        elif all(x in [1, 2] for x in self.board):
+        elif self.game.is_full():
             # once either play wins or there is a draw, game over, both players are done
             self.terminations = {i: True for i in self.agents}
 
@@ -211,7 +203,7 @@ class raw_env(AECEnv, EzPickle):
 
     def reset(self, seed=None, options=None):
         # reset environment
-        self.board = [0] * (6 * 7)
+        self.game.reset()
 
         self.agents = self.possible_agents[:]
         self.rewards = {i: 0 for i in self.agents}
@@ -264,8 +256,9 @@ class raw_env(AECEnv, EzPickle):
         self.screen.blit(board_img, (0, 0))
 
         # Blit the necessary chips and their positions
+        board = self.board
         for i in range(0, 42):
-            if self.board[i] == 1:
+            if board[i] == 1:
                 self.screen.blit(
                     red_chip,
                     (
@@ -273,7 +266,7 @@ class raw_env(AECEnv, EzPickle):
                         int(i / 7) * (tile_size) + (tile_size * (6 / 13)),
                     ),
                 )
-            elif self.board[i] == 2:
+            elif board[i] == 2:
                 self.screen.blit(
                     black_chip,
                     (
@@ -301,54 +294,4 @@ class raw_env(AECEnv, EzPickle):
             self.screen = None
 
     def check_for_winner(self):
-        board = np.array(self.board).reshape(6, 7)
-        piece = self.agents.index(self.agent_selection) + 1
-
-        # Check horizontal locations for win
-        column_count = 7
-        row_count = 6
-
-        for c in range(column_count - 3):
-            for r in range(row_count):
-                if (
-                    board[r][c] == piece
-                    and board[r][c + 1] == piece
-                    and board[r][c + 2] == piece
-                    and board[r][c + 3] == piece
-                ):
-                    return True
-
-        # Check vertical locations for win
-        for c in range(column_count):
-            for r in range(row_count - 3):
-                if (
-                    board[r][c] == piece
-                    and board[r + 1][c] == piece
-                    and board[r + 2][c] == piece
-                    and board[r + 3][c] == piece
-                ):
-                    return True
-
-        # Check positively sloped diagonals
-        for c in range(column_count - 3):
-            for r in range(row_count - 3):
-                if (
-                    board[r][c] == piece
-                    and board[r + 1][c + 1] == piece
-                    and board[r + 2][c + 2] == piece
-                    and board[r + 3][c + 3] == piece
-                ):
-                    return True
-
-        # Check negatively sloped diagonals
-        for c in range(column_count - 3):
-            for r in range(3, row_count):
-                if (
-                    board[r][c] == piece
-                    and board[r - 1][c + 1] == piece
-                    and board[r - 2][c + 2] == piece
-                    and board[r - 3][c + 3] == piece
-                ):
-                    return True
-
-        return False
+        return self.game.is_win(self.agents.index(self.agent_selection))
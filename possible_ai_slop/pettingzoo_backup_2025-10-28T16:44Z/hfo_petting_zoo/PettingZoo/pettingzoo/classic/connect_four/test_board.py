@@ -0,0 +1,115 @@
+"""Test cases for the Connect Four bitboard."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pettingzoo.classic.connect_four.board import COLS, ROWS, Board, BoardBatch
+from pettingzoo.classic.connect_four_v3 import raw_env
+
+
+def scan_for_winner(squares, piece):
+    """Check every window of four on the flat board."""
+    board = np.array(squares).reshape(ROWS, COLS)
+    for r in range(ROWS):
+        for c in range(COLS):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + k * dr, c + k * dc) for k in range(4)]
+                if all(0 <= rr < ROWS and 0 <= cc < COLS for rr, cc in cells) and all(
+                    board[rr, cc] == piece for rr, cc in cells
+                ):
+                    return True
+    return False
+
+
+def random_game(rng, board):
+    """Play random moves until a win or a full board; yields (player, col, won)."""
+    player = 0
+    while not board.is_full():
+        col = int(rng.choice(board.legal_moves()))
+        won = board.play(player, col)
+        yield player, col, won
+        if won:
+            return
+        player = 1 - player
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_win_detection_matches_scan(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(100):
+        board = Board()
+        for player, _, won in random_game(rng, board):
+            assert won == scan_for_winner(board.squares(), player + 1)
+
+
+def test_vertical_horizontal_and_diagonal_wins():
+    board = Board()
+    for _ in range(3):
+        assert not board.play(0, 2)
+    assert board.play(0, 2)
+
+    board = Board()
+    for col in range(3):
+        assert not board.play(1, col)
+    assert board.play(1, 3)
+
+    # diagonal from the bottom left, no wrap across columns
+    board = Board()
+    for col, height in enumerate(range(4)):
+        for _ in range(height):
+            board.play(1, col)
+    assert [board.play(0, col) for col in range(4)] == [False, False, False, True]
+
+    board = Board()
+    for col in range(5):
+        board.play(0, 6)
+    with pytest.raises(AssertionError):
+        for _ in range(2):
+            board.play(0, 6)
+
+
+def test_batch_matches_single_boards():
+    rng = np.random.default_rng(0)
+    n_games = 64
+    games = BoardBatch(n_games)
+    boards = [Board() for _ in range(n_games)]
+    while not games.done.all():
+        mask, obs = games.legal_mask(), games.observations()
+        to_move = games.to_move.copy()
+        actions = (rng.random(mask.shape) * mask).argmax(axis=1)
+        active = ~games.done
+        rewards, done = games.step(actions)
+        for i in np.flatnonzero(active):
+            assert np.array_equal(obs[i], boards[i].observation(to_move[i]))
+            assert np.array_equal(mask[i], boards[i].legal_mask())
+            won = boards[i].play(to_move[i], actions[i])
+            assert done[i] == (won or boards[i].is_full())
+            assert rewards[i, to_move[i]] == int(won)
+            assert rewards[i, 1 - to_move[i]] == -int(won)
+    games.reset([0, 1])
+    assert not games.done[:2].any() and games.done[2:].all()
+    assert games.legal_mask()[0].all()
+
+
+def test_env_observations_match_flat_board():
+    env = raw_env()
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        env.reset()
+        while not any(env.terminations.values()):
+            board = np.array(env.board).reshape(ROWS, COLS)
+            for i, agent in enumerate(env.agents):
+                obs = env.observe(agent)
+                expected = np.stack([board == i + 1, board == 2 - i], axis=2).astype(
+                    np.int8
+                )
+                assert np.array_equal(obs["observation"], expected)
+                if agent == env.agent_selection:
+                    legal = (board[0] == 0).astype(np.int8)
+                else:
+                    legal = np.zeros(COLS, dtype=np.int8)
+                assert np.array_equal(obs["action_mask"], legal)
+            mask = env.observe(env.agent_selection)["action_mask"]
+            env.step(int(rng.choice(np.flatnonzero(mask))))
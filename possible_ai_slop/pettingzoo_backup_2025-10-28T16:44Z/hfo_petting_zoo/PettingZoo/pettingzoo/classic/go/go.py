@@ -244,12 +244,8 @@ class raw_env(AECEnv, EzPickle):
         agent_factor = (
             go_base.BLACK if agent == self.possible_agents[0] else go_base.WHITE
         )
-        current_agent_plane_idx = np.where(self._go.board == agent_factor)
-        opponent_agent_plane_idx = np.where(self._go.board == -agent_factor)
-        current_agent_plane = np.zeros([self._N, self._N], dtype=bool)
-        opponent_agent_plane = np.zeros([self._N, self._N], dtype=bool)
-        current_agent_plane[current_agent_plane_idx] = 1
-        opponent_agent_plane[opponent_agent_plane_idx] = 1
+        current_agent_plane = self._go.board == agent_factor
+        opponent_agent_plane = self._go.board == -agent_factor
         return current_agent_plane, opponent_agent_plane
 
     def _int_to_name(self, ind):
@@ -268,15 +264,13 @@ class raw_env(AECEnv, EzPickle):
         return [1, -1] if result == 1 else [-1, 1]
 
     def observe(self, agent):
-        current_agent_plane, opponent_agent_plane = self._encode_board_planes(agent)
         player_plane = self._encode_player_plane(agent)
 
         observation = np.dstack((self.board_history, player_plane))
 
         legal_moves = self.next_legal_moves if agent == self.agent_selection else []
         action_mask = np.zeros((self._N * self._N) + 1, "int8")
-        for i in legal_moves:
-            action_mask[i] = 1
+        action_mask[legal_moves] = 1
 
         return {"observation": observation, "action_mask": action_mask}
 
@@ -155,9 +155,12 @@ def is_eyeish(board, c):
 class Group(namedtuple("Group", ["id", "stones", "liberties", "color"])):
     """Defines a Group.
 
-    stones: a frozenset of Coordinates belonging to this group
-    liberties: a frozenset of Coordinates that are empty and adjacent to this group.
+    stones: a set of Coordinates belonging to this group
+    liberties: a set of Coordinates that are empty and adjacent to this group.
     color: color of this group
+
+    The sets may be shared between LibertyTrackers copied from one another and must
+    only be modified through the tracker that owns them.
     """
 
     def __eq__(self, other):
@@ -168,65 +171,120 @@ class Group(namedtuple("Group", ["id", "stones", "liberties", "color"])):
         )
 
 
+_ZOBRIST_KEYS = {}
+
+
+def zobrist_keys():
+    """Random 64-bit keys per color and Coordinate, for the current board size.
+
+    keys[color][c] is xor-ed into a position's hash when a stone of color is placed on
+    or removed from c. The keys are drawn from a fixed seed, so hashes are reproducible.
+    """
+    keys = _ZOBRIST_KEYS.get(N)
+    if keys is None:
+        rng = np.random.default_rng([0x5EED, N])
+        keys = {}
+        for color in (BLACK, WHITE):
+            values = rng.integers(0, 2**64, size=N * N, dtype=np.uint64).tolist()
+            keys[color] = dict(
+                zip([(i, j) for i in range(N) for j in range(N)], values)
+            )
+        _ZOBRIST_KEYS[N] = keys
+    return keys
+
+
+def zobrist_hash(board):
+    """Zobrist hash of the stones on board."""
+    keys = zobrist_keys()
+    h = 0
+    for x, y in zip(*np.nonzero(board)):
+        h ^= keys[int(board[x, y])][int(x), int(y)]
+    return h
+
+
 class LibertyTracker:
+    """Chains of stones and their liberties, updated one stone at a time.
+
+    group_index maps every stone to the id of its chain. Chains touching a new stone
+    are merged by size: the largest keeps its id and absorbs the others, so only the
+    stones of the smaller chains are relabelled. lib_counts holds the number of
+    liberties per group id, from which the per-stone liberty_cache is derived.
+
+    Copies are copy-on-write: the copy shares the Group objects and a group's stone or
+    liberty set is only duplicated the first time one of the trackers modifies it.
+    """
+
     @staticmethod
     def from_board(board):
-        board = np.copy(board)
-        curr_group_id = 0
+        size = board.shape[0]
+        flat = board.ravel().tolist()
+        parent = list(range(size * size))
+
+        def find(p):
+            while parent[p] != p:
+                parent[p] = parent[parent[p]]
+                p = parent[p]
+            return p
+
+        stones = [p for p, color in enumerate(flat) if color != EMPTY]
+        for p in stones:
+            x, y = divmod(p, size)
+            if x + 1 < size and flat[p + size] == flat[p]:
+                parent[find(p + size)] = find(p)
+            if y + 1 < size and flat[p + 1] == flat[p]:
+                parent[find(p + 1)] = find(p)
+
         lib_tracker = LibertyTracker()
-        for color in (WHITE, BLACK):
-            while color in board:
-                curr_group_id += 1
-                found_color = np.where(board == color)
-                coord = found_color[0][0], found_color[1][0]
-                chain, reached = find_reached(board, coord)
-                liberties = frozenset(r for r in reached if board[r] == EMPTY)
-                new_group = Group(curr_group_id, frozenset(chain), liberties, color)
-                lib_tracker.groups[curr_group_id] = new_group
-                for s in chain:
-                    lib_tracker.group_index[s] = curr_group_id
-                place_stones(board, FILL, chain)
-
-        lib_tracker.max_group_id = curr_group_id
-
-        liberty_counts = np.zeros([N, N], dtype=np.uint8)
-        for group in lib_tracker.groups.values():
-            num_libs = len(group.liberties)
-            for s in group.stones:
-                liberty_counts[s] = num_libs
-        lib_tracker.liberty_cache = liberty_counts
+        chains = {}
+        for p in stones:
+            chains.setdefault(find(p), []).append(divmod(p, size))
+        for group_id, chain in enumerate(chains.values(), start=1):
+            liberties = {n for s in chain for n in NEIGHBORS[s] if board[n] == EMPTY}
+            lib_tracker._add_group(
+                Group(group_id, set(chain), liberties, int(board[chain[0]]))
+            )
+            for s in chain:
+                lib_tracker.group_index[s] = group_id
 
         return lib_tracker
 
-    def __init__(
-        self, group_index=None, groups=None, liberty_cache=None, max_group_id=1
-    ):
+    def __init__(self, group_index=None, groups=None, max_group_id=1, lib_counts=None):
         # group_index: a NxN numpy array of group_ids. -1 means no group
         # groups: a dict of group_id to groups
-        # liberty_cache: a NxN numpy array of liberty counts
+        # lib_counts: a numpy array of liberty counts indexed by group_id
         self.group_index = (
             group_index if group_index is not None else -np.ones([N, N], dtype=np.int32)
         )
         self.groups = groups or {}
-        self.liberty_cache = (
-            liberty_cache
-            if liberty_cache is not None
-            else np.zeros([N, N], dtype=np.uint8)
-        )
         self.max_group_id = max_group_id
+        if lib_counts is None:
+            lib_counts = np.zeros(max(64, 2 * max_group_id), dtype=np.int32)
+            for group in self.groups.values():
+                lib_counts[group.id] = len(group.liberties)
+        self.lib_counts = lib_counts
+        # ids of the groups whose liberty / stone sets are private to this tracker
+        self._own_liberties = set()
+        self._own_stones = set()
 
     def __deepcopy__(self, memodict={}):
-        new_group_index = np.copy(self.group_index)
-        new_lib_cache = np.copy(self.liberty_cache)
-        # shallow copy
-        new_groups = copy.copy(self.groups)
+        # from now on both trackers share every group
+        self._own_liberties.clear()
+        self._own_stones.clear()
         return LibertyTracker(
-            new_group_index,
-            new_groups,
-            liberty_cache=new_lib_cache,
+            np.copy(self.group_index),
+            dict(self.groups),
             max_group_id=self.max_group_id,
+            lib_counts=np.copy(self.lib_counts),
         )
 
+    def liberty_counts(self):
+        """Returns an NxN array with the liberty count of each stone's group, 0 on empty points."""
+        return np.where(self.group_index >= 0, self.lib_counts[self.group_index], 0)
+
+    @property
+    def liberty_cache(self):
+        return self.liberty_counts().astype(np.uint8)
+
     def add_stone(self, color, c):
         assert self.group_index[c] == MISSING_GROUP_ID
         captured_stones = set()
@@ -235,7 +293,7 @@ class LibertyTracker:
         empty_neighbors = set()
 
         for n in NEIGHBORS[c]:
-            neighbor_group_id = self.group_index[n]
+            neighbor_group_id = int(self.group_index[n])
             if neighbor_group_id != MISSING_GROUP_ID:
                 neighbor_group = self.groups[neighbor_group_id]
                 if neighbor_group.color == color:
@@ -245,73 +303,97 @@ class LibertyTracker:
             else:
                 empty_neighbors.add(n)
 
-        new_group = self._merge_from_played(
+        new_group_id = self._merge_from_played(
             color, c, empty_neighbors, friendly_neighboring_group_ids
         )
 
-        # new_group becomes stale as _update_liberties and
-        # _handle_captures are called; must refetch with self.groups[new_group.id]
         for group_id in opponent_neighboring_group_ids:
             neighbor_group = self.groups[group_id]
             if len(neighbor_group.liberties) == 1:
                 captured = self._capture_group(group_id)
                 captured_stones.update(captured)
             else:
-                self._update_liberties(group_id, remove={c})
+                self._update_liberties(group_id, remove=(c,))
 
         self._handle_captures(captured_stones)
 
         # suicide is illegal
-        if len(self.groups[new_group.id].liberties) == 0:
+        if self.lib_counts[new_group_id] == 0:
             raise IllegalMove(f"Move at {c} would commit suicide!\n")
 
         return captured_stones
 
+    def _add_group(self, group):
+        self.groups[group.id] = group
+        self.max_group_id = max(self.max_group_id, group.id)
+        if group.id >= len(self.lib_counts):
+            grown = np.zeros(2 * group.id, dtype=np.int32)
+            grown[: len(self.lib_counts)] = self.lib_counts
+            self.lib_counts = grown
+        self.lib_counts[group.id] = len(group.liberties)
+        self._own_liberties.add(group.id)
+        self._own_stones.add(group.id)
+
+    def _writable(self, group_id, stones=False):
+        """The group with its liberty set (and stone set) private to this tracker."""
+        group = self.groups[group_id]
+        if group_id not in self._own_liberties:
+            group = group._replace(liberties=set(group.liberties))
+            self._own_liberties.add(group_id)
+        if stones and group_id not in self._own_stones:
+            group = group._replace(stones=set(group.stones))
+            self._own_stones.add(group_id)
+        self.groups[group_id] = group
+        return group
+
     def _merge_from_played(self, color, played, libs, other_group_ids):
-        stones = {played}
-        liberties = set(libs)
-        for group_id in other_group_ids:
-            other = self.groups.pop(group_id)
-            stones.update(other.stones)
-            liberties.update(other.liberties)
-
-        if other_group_ids:
-            liberties.remove(played)
-        assert stones.isdisjoint(liberties)
-        self.max_group_id += 1
-        result = Group(
-            self.max_group_id, frozenset(stones), frozenset(liberties), color
+        if not other_group_ids:
+            group = Group(self.max_group_id + 1, {played}, set(libs), color)
+            self._add_group(group)
+            self.group_index[played] = group.id
+            return group.id
+
+        group_id = max(
+            sorted(other_group_ids), key=lambda g: len(self.groups[g].stones)
         )
-        self.groups[result.id] = result
-
-        for s in result.stones:
-            self.group_index[s] = result.id
-            self.liberty_cache[s] = len(result.liberties)
-
-        return result
+        group = self._writable(group_id, stones=True)
+        for other_id in other_group_ids - {group_id}:
+            other = self.groups.pop(other_id)
+            self._own_liberties.discard(other_id)
+            self._own_stones.discard(other_id)
+            group.stones.update(other.stones)
+            group.liberties.update(other.liberties)
+            for s in other.stones:
+                self.group_index[s] = group_id
+        group.stones.add(played)
+        group.liberties.update(libs)
+        group.liberties.discard(played)
+        assert group.stones.isdisjoint(group.liberties)
+        self.group_index[played] = group_id
+        self.lib_counts[group_id] = len(group.liberties)
+        return group_id
 
     def _capture_group(self, group_id):
         dead_group = self.groups.pop(group_id)
+        self._own_liberties.discard(group_id)
+        self._own_stones.discard(group_id)
+        self.lib_counts[group_id] = 0
         for s in dead_group.stones:
             self.group_index[s] = MISSING_GROUP_ID
-            self.liberty_cache[s] = 0
         return dead_group.stones
 
-    def _update_liberties(self, group_id, add=set(), remove=set()):
-        group = self.groups[group_id]
-        new_libs = (group.liberties | add) - remove
-        self.groups[group_id] = Group(group_id, group.stones, new_libs, group.color)
-
-        new_lib_count = len(new_libs)
-        for s in self.groups[group_id].stones:
-            self.liberty_cache[s] = new_lib_count
+    def _update_liberties(self, group_id, add=(), remove=()):
+        group = self._writable(group_id)
+        group.liberties.update(add)
+        group.liberties.difference_update(remove)
+        self.lib_counts[group_id] = len(group.liberties)
 
     def _handle_captures(self, captured_stones):
         for s in captured_stones:
             for n in NEIGHBORS[s]:
-                group_id = self.group_index[n]
+                group_id = int(self.group_index[n])
                 if group_id != MISSING_GROUP_ID:
-                    self._update_liberties(group_id, add={s})
+                    self._update_liberties(group_id, add=(s,))
 
 
 class Position:
@@ -326,6 +408,8 @@ class Position:
         recent=tuple(),
         board_deltas=None,
         to_play=BLACK,
+        zobrist=None,
+        board_hashes=None,
     ):
         """Initializes the `Position` class.
 
@@ -340,6 +424,13 @@ class Position:
             made to the board at each move (played move and captures).
             Should satisfy next_pos.board - next_pos.board_deltas[0] == pos.board
         to_play: BLACK or WHITE
+        zobrist: the Zobrist hash of board
+        board_hashes: a frozenset of the Zobrist hashes of every board seen so far,
+            including the current one, for positional superko checks.
+
+        Copies (copy.deepcopy, or play_move / pass_move without mutate) share board
+        and lib_tracker with the original until either of them plays a stone, so both
+        must be treated as read-only outside of this class.
         """
         assert type(recent) is tuple
         self.board = board if board is not None else np.copy(EMPTY_BOARD)
@@ -356,22 +447,49 @@ class Position:
             else np.zeros([0, N, N], dtype=np.int8)
         )
         self.to_play = to_play
+        self.zobrist = zobrist if zobrist is not None else zobrist_hash(self.board)
+        self.board_hashes = (
+            board_hashes if board_hashes is not None else frozenset([self.zobrist])
+        )
+        self._shared = False
 
     def __deepcopy__(self, memodict={}):
-        new_board = np.copy(self.board)
-        new_lib_tracker = copy.deepcopy(self.lib_tracker)
-        return Position(
-            new_board,
+        pos = Position(
+            self.board,
             self.n,
             self.komi,
             self.caps,
-            new_lib_tracker,
+            self.lib_tracker,
             self.ko,
             self.recent,
             self.board_deltas,
             self.to_play,
+            self.zobrist,
+            self.board_hashes,
+        )
+        pos._shared = self._shared = True
+        return pos
+
+    def __eq__(self, other):
+        """Same stones, player to move and ko point, compared through the hash."""
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.zobrist, self.to_play, self.ko) == (
+            other.zobrist,
+            other.to_play,
+            other.ko,
         )
 
+    def __hash__(self):
+        return hash((self.zobrist, self.to_play, self.ko))
+
+    def _unshare(self):
+        """Take private copies of board and lib_tracker before modifying them."""
+        if self._shared:
+            self.board = np.copy(self.board)
+            self.lib_tracker = copy.deepcopy(self.lib_tracker)
+            self._shared = False
+
     def __str__(self, colors=True):
         if colors:
             pretty_print_map = {
@@ -456,25 +574,31 @@ class Position:
         legal_moves = np.ones([N, N], dtype=np.int8)
         # ...unless there is already a stone there
         legal_moves[self.board != EMPTY] = 0
-        # calculate which spots have 4 stones next to them
+        # look at the color and liberty count of the four neighbours of every point;
         # padding is because the edge always counts as a lost liberty.
-        adjacent = np.ones([N + 2, N + 2], dtype=np.int8)
-        adjacent[1:-1, 1:-1] = np.abs(self.board)
-        num_adjacent_stones = (
-            adjacent[:-2, 1:-1]
-            + adjacent[1:-1, :-2]
-            + adjacent[2:, 1:-1]
-            + adjacent[1:-1, 2:]
+        colors = np.full([N + 2, N + 2], FILL, dtype=np.int8)
+        colors[1:-1, 1:-1] = self.board
+        libs = np.zeros([N + 2, N + 2], dtype=np.int32)
+        libs[1:-1, 1:-1] = self.lib_tracker.liberty_counts()
+        neighbors = (
+            (slice(None, -2), slice(1, -1)),
+            (slice(1, -1), slice(None, -2)),
+            (slice(2, None), slice(1, -1)),
+            (slice(1, -1), slice(2, None)),
         )
-        # Surrounded spots are those that are empty and have 4 adjacent stones.
-        surrounded_spots = np.multiply(
-            (self.board == EMPTY), (num_adjacent_stones == 4)
+        neighbor_colors = np.stack([colors[n] for n in neighbors])
+        neighbor_libs = np.stack([libs[n] for n in neighbors])
+        surrounded_spots = (self.board == EMPTY) & (neighbor_colors != EMPTY).all(
+            axis=0
         )
-        # Such spots are possibly illegal, unless they are capturing something.
-        # Iterate over and manually check each spot.
-        for coord in np.transpose(np.nonzero(surrounded_spots)):
-            if self.is_move_suicidal(tuple(coord)):
-                legal_moves[tuple(coord)] = 0
+        # playing there is still fine if it captures an opponent group in atari, or
+        # joins a friendly group that keeps a liberty other than this point.
+        saved = (
+            ((neighbor_colors == self.to_play) & (neighbor_libs > 1))
+            | ((neighbor_colors == -self.to_play) & (neighbor_libs == 1))
+        ).any(axis=0)
+        # Surrounded spots that neither capture nor connect out are suicide.
+        legal_moves[surrounded_spots & ~saved] = 0
 
         # ...and retaking ko is always illegal
         if self.ko is not None:
@@ -503,19 +627,40 @@ class Position:
     def get_liberties(self):
         return self.lib_tracker.liberty_cache
 
+    def is_superko(self, c):
+        """Whether playing c would recreate a board seen earlier (positional superko).
+
+        The resulting hash is worked out from the groups c would capture, without
+        playing the move.
+        """
+        if c is None:
+            return False
+        keys = zobrist_keys()
+        h = self.zobrist ^ keys[self.to_play][c]
+        captured_ids = set()
+        for n in NEIGHBORS[c]:
+            group_id = int(self.lib_tracker.group_index[n])
+            if group_id == MISSING_GROUP_ID or group_id in captured_ids:
+                continue
+            group = self.lib_tracker.groups[group_id]
+            if group.color != self.to_play and len(group.liberties) == 1:
+                captured_ids.add(group_id)
+                for s in group.stones:
+                    h ^= keys[group.color][s]
+        return h in self.board_hashes
+
     def play_move(self, c, color=None, mutate=False):
         # Obeys CGOS Rules of Play. In short:
         # No suicides
         # Chinese/area scoring
-        # Positional superko (this is very crudely approximate at the moment.)
+        # Positional superko (not enforced here; see is_superko.)
         if color is None:
             color = self.to_play
 
         pos = self if mutate else copy.deepcopy(self)
 
         if c is None:
-            pos = pos.pass_move(mutate=mutate)
-            return pos
+            return pos.pass_move(mutate=True)
 
         if not self.is_move_legal(c):
             raise IllegalMove(
@@ -528,12 +673,19 @@ class Position:
 
         potential_ko = is_koish(self.board, c)
 
+        pos._unshare()
         place_stones(pos.board, color, [c])
         captured_stones = pos.lib_tracker.add_stone(color, c)
         place_stones(pos.board, EMPTY, captured_stones)
 
         opp_color = color * -1
 
+        keys = zobrist_keys()
+        pos.zobrist ^= keys[color][c]
+        for s in captured_stones:
+            pos.zobrist ^= keys[opp_color][s]
+        pos.board_hashes = pos.board_hashes | {pos.zobrist}
+
         new_board_delta = np.zeros([N, N], dtype=np.int8)
         new_board_delta[c] = color
         place_stones(new_board_delta, color, captured_stones)
@@ -0,0 +1,91 @@
+"""Test cases for the incremental Go engine."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pettingzoo.classic.go import coords, go_base
+
+
+def reference_groups(board):
+    """(stones, liberties, color) of every chain, found by flood fill."""
+    groups = []
+    seen = set()
+    for c in zip(*np.nonzero(board)):
+        c = (int(c[0]), int(c[1]))
+        if c in seen:
+            continue
+        chain, reached = go_base.find_reached(board, c)
+        seen |= chain
+        liberties = {r for r in reached if board[r] == go_base.EMPTY}
+        groups.append((sorted(chain), sorted(liberties), int(board[c])))
+    return sorted(groups)
+
+
+def tracker_groups(lib_tracker):
+    return sorted(
+        (sorted(g.stones), sorted(g.liberties), g.color)
+        for g in lib_tracker.groups.values()
+    )
+
+
+def random_game(rng, max_moves=400):
+    pos = go_base.Position()
+    positions = [pos]
+    while not pos.is_game_over() and pos.n < max_moves:
+        legal = np.flatnonzero(pos.all_legal_moves())
+        if len(legal) > 1 and rng.random() < 0.95:
+            legal = legal[:-1]
+        pos = pos.play_move(coords.from_flat(int(rng.choice(legal))))
+        positions.append(pos)
+    return positions
+
+
+def test_tracker_legal_moves_and_hash_match_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(3):
+        for pos in random_game(rng)[::7]:
+            assert tracker_groups(pos.lib_tracker) == reference_groups(pos.board)
+            assert tracker_groups(
+                go_base.LibertyTracker.from_board(pos.board)
+            ) == reference_groups(pos.board)
+            assert pos.zobrist == go_base.zobrist_hash(pos.board)
+
+            legal = [
+                pos.is_move_legal(coords.from_flat(i))
+                for i in range(go_base.N * go_base.N + 1)
+            ]
+            assert np.array_equal(pos.all_legal_moves(), np.array(legal, dtype=np.int8))
+
+
+def test_copies_do_not_affect_each_other():
+    rng = np.random.default_rng(1)
+    positions = random_game(rng, max_moves=150)
+    snapshots = [
+        (pos.board.copy(), tracker_groups(pos.lib_tracker)) for pos in positions
+    ]
+    # branch off every position; neither the branches nor the original line change
+    for pos in positions[:-1]:
+        for flat in np.flatnonzero(pos.all_legal_moves())[:3]:
+            branch = pos.play_move(coords.from_flat(int(flat)))
+            assert tracker_groups(branch.lib_tracker) == reference_groups(branch.board)
+    for pos, (board, groups) in zip(positions, snapshots):
+        assert np.array_equal(pos.board, board)
+        assert tracker_groups(pos.lib_tracker) == groups
+
+
+def test_superko_and_position_equality():
+    board = np.zeros([go_base.N, go_base.N], dtype=np.int8)
+    go_base.place_stones(board, go_base.BLACK, [(0, 1), (1, 0), (2, 1)])
+    go_base.place_stones(board, go_base.WHITE, [(0, 2), (1, 1), (2, 2), (1, 3)])
+    pos = go_base.Position(board=board)
+    after_capture = pos.play_move((1, 2))
+    assert after_capture.ko == (1, 1)
+    assert after_capture.is_superko((1, 1))
+    assert not after_capture.is_superko((5, 5))
+    assert not after_capture.is_superko(None)
+
+    a = go_base.Position().play_move((3, 3)).play_move((4, 4)).play_move((5, 5))
+    b = go_base.Position().play_move((5, 5)).play_move((4, 4)).play_move((3, 3))
+    assert a == b and hash(a) == hash(b)
+    assert a != a.pass_move()
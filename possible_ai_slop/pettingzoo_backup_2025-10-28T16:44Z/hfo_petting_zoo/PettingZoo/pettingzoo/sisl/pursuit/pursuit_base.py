@@ -6,6 +6,7 @@ import numpy as np
 import pygame
 from gymnasium import spaces
 from gymnasium.utils import seeding
+from numpy.lib.stride_tricks import sliding_window_view
 
 from pettingzoo.sisl.pursuit.utils import agent_utils, two_d_maps
 from pettingzoo.sisl.pursuit.utils.agent_layer import AgentLayer
@@ -157,6 +158,24 @@ class Pursuit:
         self.model_state = np.zeros((4,) + self.map_matrix.shape, dtype=np.float32)
         self.pixel_scale = 30
 
+        # Observation windows are strided views into abs(model_state[0:3]) padded by
+        # obs_offset (walls outside the map), so no per-agent clipping is needed
+        self._obs_size = 2 * self.obs_offset + 1
+        self._obs_pad = np.zeros(
+            (3, self.x_size + 2 * self.obs_offset, self.y_size + 2 * self.obs_offset),
+            dtype=np.float32,
+        )
+        self._obs_pad[0].fill(1.0)
+        self._obs_windows = sliding_window_view(
+            self._obs_pad, (self._obs_size, self._obs_size), axis=(1, 2)
+        )
+        self._obs_stale = True
+        self._obs_batch = None
+
+        self._pursuer_pos = np.zeros((self.n_pursuers, 2), dtype=np.int64)
+        self._evader_counts = np.zeros(self.map_matrix.shape, dtype=np.int32)
+        self._surround_need = self.surround_need_matrix()
+
         self.frames = 0
         self.reset()
 
@@ -235,7 +254,8 @@ class Pursuit:
 
         self.model_state[0] = self.map_matrix
         self.model_state[1] = self.pursuer_layer.get_state_matrix()
-        self.model_state[2] = self.evader_layer.get_state_matrix()
+        self._pursuer_pos[:] = self.pursuer_layer.get_positions()
+        self.update_evader_state()
 
         self.frames = 0
 
@@ -247,10 +267,15 @@ class Pursuit:
         opponent_controller = self.evader_controller
 
         # actual action application, change the pursuer layer
-        agent_layer.move_agent(agent_id, action)
+        pos = self._pursuer_pos[agent_id]
+        x, y = agent_layer.move_agent(agent_id, action)
 
-        # Update only the pursuer layer
-        self.model_state[1] = self.pursuer_layer.get_state_matrix()
+        # Update only the moved pursuer's cells in the pursuer layer
+        if x != pos[0] or y != pos[1]:
+            self.model_state[1, pos[0], pos[1]] -= 1
+            self.model_state[1, x, y] += 1
+            pos[:] = x, y
+            self._obs_stale = True
 
         self.latest_reward_state = self.reward() / self.num_agents
 
@@ -267,9 +292,8 @@ class Pursuit:
             self.latest_reward_state += self.urgency_reward
             self.frames = self.frames + 1
 
-        # Update the remaining layers
-        self.model_state[0] = self.map_matrix
-        self.model_state[2] = self.evader_layer.get_state_matrix()
+            # Evaders only move (or disappear) here, the map never changes
+            self.update_evader_state()
 
         global_val = self.latest_reward_state.mean()
         local_val = self.latest_reward_state
@@ -438,28 +462,11 @@ class Pursuit:
         pygame.image.save(subcapture, file_name)
 
     def reward(self):
-        es = self.evader_layer.get_state_matrix()  # evader positions
-        rewards = [
-            self.tag_reward
-            * np.sum(
-                es[
-                    np.clip(
-                        self.pursuer_layer.get_position(i)[0]
-                        + self.surround_mask[:, 0],
-                        0,
-                        self.x_size - 1,
-                    ),
-                    np.clip(
-                        self.pursuer_layer.get_position(i)[1]
-                        + self.surround_mask[:, 1],
-                        0,
-                        self.y_size - 1,
-                    ),
-                ]
-            )
-            for i in range(self.n_pursuers)
-        ]
-        return np.array(rewards)
+        # evaders on the surround_mask cells of every pursuer (clipped to the map)
+        nbrs = self._pursuer_pos[:, None, :] + self.surround_mask
+        xs = np.clip(nbrs[..., 0], 0, self.x_size - 1)
+        ys = np.clip(nbrs[..., 1], 0, self.y_size - 1)
+        return self.tag_reward * self._evader_counts[xs, ys].sum(axis=1)
 
     @property
     def is_terminal(self):
@@ -479,25 +486,62 @@ class Pursuit:
         return self.pursuer_layer.n_agents()
 
     def safely_observe(self, i):
-        agent_layer = self.pursuer_layer
-        obs = self.collect_obs(agent_layer, i)
-        return obs
+        assert 0 <= i < self.n_agents(), "bad index"
+        return self.safely_observe_all()[i].copy()
+
+    def safely_observe_all(self):
+        """Returns the observations of all pursuers as one (n, 3, obs_range, obs_range) array.
+
+        The array is gathered once per change of the state and shared by later calls, so
+        it must not be modified.
+        """
+        self.refresh_obs_pad()
+        if self._obs_batch is None:
+            self._obs_batch = self.collect_obs_batch(self.pursuer_layer)
+        return self._obs_batch
+
+    def update_evader_state(self):
+        self._evader_counts = self.evader_layer.get_state_matrix()
+        self.model_state[2] = self._evader_counts
+        self._obs_stale = True
+
+    def refresh_obs_pad(self):
+        """Copies abs(model_state[0:3]) into the padded observation buffer if it changed."""
+        if self._obs_stale:
+            ofs = self.obs_offset
+            np.abs(
+                self.model_state[0:3],
+                out=self._obs_pad[:, ofs : ofs + self.x_size, ofs : ofs + self.y_size],
+            )
+            self._obs_stale = False
+            self._obs_batch = None
 
     def collect_obs(self, agent_layer, i):
-        for j in range(self.n_agents()):
-            if i == j:
-                return self.collect_obs_by_idx(agent_layer, i)
-        assert False, "bad index"
+        assert 0 <= i < self.n_agents(), "bad index"
+        return self.collect_obs_by_idx(agent_layer, i)
 
     def collect_obs_by_idx(self, agent_layer, agent_idx):
         # returns a flattened array of all the observations
-        obs = np.zeros((3, self.obs_range, self.obs_range), dtype=np.float32)
-        obs[0].fill(1.0)  # border walls set to -0.1?
+        self.refresh_obs_pad()
         xp, yp = agent_layer.get_position(agent_idx)
+        if self._obs_size == self.obs_range:
+            return self._obs_windows[:, xp, yp].copy()
+        # an even obs_range leaves the last row and column as border
+        obs = np.zeros((3, self.obs_range, self.obs_range), dtype=np.float32)
+        obs[0].fill(1.0)
+        obs[:, : self._obs_size, : self._obs_size] = self._obs_windows[:, xp, yp]
+        return obs
 
-        xlo, xhi, ylo, yhi, xolo, xohi, yolo, yohi = self.obs_clip(xp, yp)
-
-        obs[0:3, xolo:xohi, yolo:yohi] = np.abs(self.model_state[0:3, xlo:xhi, ylo:yhi])
+    def collect_obs_batch(self, agent_layer):
+        """Gathers the observation windows of every agent in agent_layer at once."""
+        self.refresh_obs_pad()
+        pos = agent_layer.get_positions()
+        windows = self._obs_windows[:, pos[:, 0], pos[:, 1]].swapaxes(0, 1)
+        if self._obs_size == self.obs_range:
+            return np.ascontiguousarray(windows)
+        obs = np.zeros((len(pos), 3, self.obs_range, self.obs_range), dtype=np.float32)
+        obs[:, 0].fill(1.0)
+        obs[:, :, : self._obs_size, : self._obs_size] = windows
         return obs
 
     def obs_clip(self, x, y):
@@ -524,63 +568,50 @@ class Pursuit:
         purs_sur: bool array, which pursuers surrounded an evader
         """
         n_pursuer_removed = 0
-        n_evader_removed = 0
-        removed_evade = []
-        removed_pursuit = []
-
-        ai = 0
-        rems = 0
-        xpur, ypur = np.nonzero(self.model_state[1])
         purs_sur = np.zeros(self.n_pursuers, dtype=bool)
-        for i in range(self.n_evaders):
-            if self.evaders_gone[i]:
-                continue
-            x, y = self.evader_layer.get_position(ai)
-            if self.surround:
-                pos_that_catch = self.surround_mask + self.evader_layer.get_position(ai)
-                truths = np.array(
-                    [
-                        np.equal([xi, yi], pos_that_catch).all(axis=1)
-                        for xi, yi in zip(xpur, ypur)
-                    ]
-                )
-                if np.sum(truths.any(axis=0)) == self.need_to_surround(x, y):
-                    removed_evade.append(ai - rems)
-                    self.evaders_gone[i] = True
-                    rems += 1
-                    tt = truths.any(axis=1)
-                    for j in range(self.n_pursuers):
-                        xpp, ypp = self.pursuer_layer.get_position(j)
-                        tes = np.concatenate((xpur[tt], ypur[tt])).reshape(
-                            2, len(xpur[tt])
-                        )
-                        tem = tes.T == np.array([xpp, ypp])
-                        if np.any(np.all(tem, axis=1)):
-                            purs_sur[j] = True
-                ai += 1
-            else:
-                if self.model_state[1, x, y] >= self.n_catch:
-                    # add prob remove?
-                    removed_evade.append(ai - rems)
-                    self.evaders_gone[i] = True
-                    rems += 1
-                    for j in range(self.n_pursuers):
-                        xpp, ypp = self.pursuer_layer.get_position(j)
-                        if xpp == x and ypp == y:
-                            purs_sur[j] = True
-                ai += 1
-
-        ai = 0
-        for i in range(self.pursuer_layer.n_agents()):
-            x, y = self.pursuer_layer.get_position(i)
-            # can remove pursuers probabilitcally here?
-        for ridx in removed_evade:
+        if self.evader_layer.n_agents() == 0:
+            return 0, n_pursuer_removed, purs_sur
+
+        ev_pos = self.evader_layer.get_positions()
+        xe, ye = ev_pos[:, 0], ev_pos[:, 1]
+        catch_cells = np.zeros(self.map_matrix.shape, dtype=bool)
+        if self.surround:
+            occupied = self.surround_counts(self.model_state[1] > 0)
+            caught = occupied[xe, ye] == self._surround_need[xe, ye]
+            catch_cells[xe[caught], ye[caught]] = True
+            # pursuers next to a caught evader took part in the capture
+            catch_cells = self.surround_counts(catch_cells) > 0
+        else:
+            caught = self.model_state[1, xe, ye] >= self.n_catch
+            catch_cells[xe[caught], ye[caught]] = True
+        purs_sur[:] = catch_cells[self._pursuer_pos[:, 0], self._pursuer_pos[:, 1]]
+
+        removed_evade = np.flatnonzero(caught)
+        self.evaders_gone[np.flatnonzero(~self.evaders_gone)[removed_evade]] = True
+        for ridx in removed_evade[::-1]:
             self.evader_layer.remove_agent(ridx)
-            n_evader_removed += 1
-        for ridx in removed_pursuit:
-            self.pursuer_layer.remove_agent(ridx)
-            n_pursuer_removed += 1
-        return n_evader_removed, n_pursuer_removed, purs_sur
+        return len(removed_evade), n_pursuer_removed, purs_sur
+
+    def surround_counts(self, layer):
+        """Sums layer over the surround_mask neighbours of every cell (nothing outside the map)."""
+        padded = np.pad(layer, 1)
+        counts = np.zeros(self.map_matrix.shape, dtype=np.int32)
+        for dx, dy in self.surround_mask:
+            counts += padded[
+                1 + dx : 1 + dx + self.x_size, 1 + dy : 1 + dy + self.y_size
+            ]
+        return counts
+
+    def surround_need_matrix(self):
+        """need_to_surround() for every cell of the map."""
+        xg, yg = np.indices(self.map_matrix.shape)
+        need = 4 - ((xg == 0) | (xg == self.x_size - 1)).astype(np.int32)
+        need -= (yg == 0) | (yg == self.y_size - 1)
+        for dx, dy in self.surround_mask:
+            xn, yn = xg + dx, yg + dy
+            inner = (0 < xn) & (xn < self.x_size) & (0 < yn) & (yn < self.y_size)
+            need[inner] -= self.map_matrix[xn[inner], yn[inner]] == -1
+        return need
 
     def need_to_surround(self, x, y):
         """Compute the number of surrounding grid cells.
@@ -0,0 +1,80 @@
+"""Test cases for the batched pursuit core."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pettingzoo.sisl.pursuit.pursuit_base import Pursuit
+
+
+def reference_obs(env, idx):
+    """Per-agent clipped window, as collect_obs_by_idx computed it before batching."""
+    obs = np.zeros((3, env.obs_range, env.obs_range), dtype=np.float32)
+    obs[0].fill(1.0)
+    xp, yp = env.pursuer_layer.get_position(idx)
+    xlo, xhi, ylo, yhi, xolo, xohi, yolo, yohi = env.obs_clip(xp, yp)
+    obs[0:3, xolo:xohi, yolo:yohi] = np.abs(env.model_state[0:3, xlo:xhi, ylo:yhi])
+    return obs
+
+
+def reference_catches(env):
+    """Evaders (live indices) and pursuers a per-evader scan would mark as caught."""
+    caught = []
+    purs_sur = np.zeros(env.n_pursuers, dtype=bool)
+    pursuers = [tuple(p) for p in env.pursuer_layer.get_positions()]
+    for ai, (x, y) in enumerate(env.evader_layer.get_positions()):
+        if env.surround:
+            cells = [(x + dx, y + dy) for dx, dy in env.surround_mask]
+            touching = {c for c in cells if c in pursuers}
+            hit = len(touching) == env.need_to_surround(x, y)
+        else:
+            touching = {(x, y)}
+            hit = env.model_state[1, x, y] >= env.n_catch
+        if hit:
+            caught.append(ai)
+            purs_sur |= np.array([p in touching for p in pursuers])
+    return caught, purs_sur
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"obs_range": 6},
+        {"surround": False, "n_catch": 1, "x_size": 8, "y_size": 20},
+        {"n_pursuers": 30, "n_evaders": 15},
+    ],
+)
+def test_pursuit_matches_reference(kwargs):
+    env = Pursuit(**kwargs)
+    env._seed(0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    n = env.n_pursuers
+    for _ in range(40):
+        for i in range(n):
+            env.step(int(rng.integers(5)), i, i == n - 1)
+            assert np.array_equal(env.safely_observe(i), reference_obs(env, i))
+            assert np.array_equal(
+                env.model_state[1], env.pursuer_layer.get_state_matrix()
+            )
+        batch = env.safely_observe_all()
+        for i in range(n):
+            assert np.array_equal(batch[i], reference_obs(env, i))
+
+        caught, purs_sur = reference_catches(env)
+        n_live = env.evader_layer.n_agents()
+        n_removed, _, got_sur = env.remove_agents()
+        assert n_removed == len(caught)
+        assert env.evader_layer.n_agents() == n_live - len(caught)
+        assert np.array_equal(got_sur, purs_sur)
+        env.update_evader_state()
+
+
+def test_surround_need_matrix():
+    env = Pursuit(x_size=12, y_size=9)
+    need = env.surround_need_matrix()
+    for x in range(env.x_size):
+        for y in range(env.y_size):
+            assert need[x, y] == env.need_to_surround(x, y)
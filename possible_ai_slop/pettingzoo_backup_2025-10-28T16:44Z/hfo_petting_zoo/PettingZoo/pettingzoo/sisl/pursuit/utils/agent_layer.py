@@ -37,6 +37,13 @@ class AgentLayer:
         """Returns the position of the given agent."""
         return self.allies[agent_idx].current_position()
 
+    def get_positions(self):
+        """Returns an (n_agents, 2) array with the positions of all allies."""
+        pos = np.zeros((self.nagents, 2), dtype=np.int64)
+        for i, ally in enumerate(self.allies):
+            pos[i] = ally.current_position()
+        return pos
+
     def get_nactions(self, agent_idx):
         return self.allies[agent_idx].nactions()
 
@@ -0,0 +1,62 @@
+"""Test cases for the batched waterworld sensors."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pymunk")
+
+from pettingzoo.sisl.waterworld.waterworld_base import WaterworldBase  # noqa: E402
+
+
+def reference_readings(env, pursuer, objects, max_speed):
+    """Per-object get_sensor_reading calls reduced to the closest object."""
+    distances, velocities = [], []
+    for obj in objects:
+        distance, velocity = pursuer.get_sensor_reading(
+            obj.body.position, obj.radius, obj.body.velocity, max_speed
+        )
+        distances.append(distance)
+        velocities.append(velocity)
+    return env.get_sensor_readings(
+        distances, pursuer.sensor_range, velocites=velocities
+    )
+
+
+@pytest.mark.parametrize("n_pursuers", [2, 20])
+def test_observe_list_matches_per_object_readings(n_pursuers):
+    env = WaterworldBase(n_pursuers=n_pursuers, n_evaders=8, n_poisons=12)
+    env._seed(0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    n = env.n_sensors
+    for _ in range(20):
+        for i in range(env.n_pursuers):
+            env.step(rng.uniform(-1, 1, 2), i, i == env.n_pursuers - 1)
+
+        for i, obs in enumerate(env.observe_list()):
+            pursuer = env.pursuers[i]
+            others = [p for j, p in enumerate(env.pursuers) if j != i]
+            obstacle_vals, _ = reference_readings(env, pursuer, env.obstacles, 0.0)
+            evader_d, evader_v = reference_readings(
+                env, pursuer, env.evaders, env.evader_speed
+            )
+            poison_d, poison_v = reference_readings(
+                env, pursuer, env.poisons, env.poison_speed
+            )
+            pursuer_d, pursuer_v = reference_readings(
+                env, pursuer, others, env.pursuer_speed
+            )
+            expected = [
+                obstacle_vals,
+                pursuer.get_sensor_barrier_readings(),
+                evader_d,
+                evader_v,
+                poison_d,
+                poison_v,
+                pursuer_d,
+                pursuer_v,
+            ]
+            for k, block in enumerate(expected):
+                np.testing.assert_allclose(obs[k * n : (k + 1) * n], block.ravel())
@@ -13,6 +13,8 @@ from pettingzoo.sisl.waterworld.waterworld_models import (
     Obstacle,
     Poisons,
     Pursuers,
+    barrier_readings,
+    sensor_readings,
 )
 
 FPS = 15
@@ -486,141 +488,108 @@ class WaterworldBase:
         return np.array(self.last_obs[agent_id], dtype=np.float32)
 
     def observe_list(self):
-        observe_list = []
+        positions, velocities, _ = self.object_arrays(self.pursuers)
 
-        for i, pursuer in enumerate(self.pursuers):
-            obstacle_distances = []
+        # All pursuers share the same sensors, sensor range and maximum speed
+        sensing = self.pursuers[0]
 
-            evader_distances = []
-            evader_velocities = []
-
-            poison_distances = []
-            poison_velocities = []
-
-            _pursuer_distances = []
-            _pursuer_velocities = []
-
-            for obstacle in self.obstacles:
-                obstacle_distance, _ = pursuer.get_sensor_reading(
-                    obstacle.body.position, obstacle.radius, obstacle.body.velocity, 0.0
-                )
-                obstacle_distances.append(obstacle_distance)
-
-            obstacle_sensor_vals = self.get_sensor_readings(
-                obstacle_distances, pursuer.sensor_range
+        def readings(objects, object_max_speed, exclude_self=False):
+            object_positions, object_velocities, object_radii = self.object_arrays(
+                objects
+            )
+            return sensor_readings(
+                positions,
+                velocities,
+                sensing.sensors,
+                sensing.sensor_range,
+                sensing.max_speed,
+                object_positions,
+                object_radii,
+                object_velocities,
+                object_max_speed,
+                exclude_self=exclude_self,
             )
 
-            barrier_distances = pursuer.get_sensor_barrier_readings()
+        obstacle_sensor_vals, _ = readings(self.obstacles, 0.0)
 
-            for evader in self.evaders:
-                evader_distance, evader_velocity = pursuer.get_sensor_reading(
-                    evader.body.position,
-                    evader.radius,
-                    evader.body.velocity,
-                    self.evader_speed,
-                )
-                evader_distances.append(evader_distance)
-                evader_velocities.append(evader_velocity)
+        barrier_distances = barrier_readings(
+            positions, sensing.sensors, sensing.sensor_range, sensing.pixel_scale
+        )
 
-            (
-                evader_sensor_distance_vals,
-                evader_sensor_velocity_vals,
-            ) = self.get_sensor_readings(
-                evader_distances,
-                pursuer.sensor_range,
-                velocites=evader_velocities,
-            )
+        (
+            evader_sensor_distance_vals,
+            evader_sensor_velocity_vals,
+        ) = readings(self.evaders, self.evader_speed)
 
-            for poison in self.poisons:
-                poison_distance, poison_velocity = pursuer.get_sensor_reading(
-                    poison.body.position,
-                    poison.radius,
-                    poison.body.velocity,
-                    self.poison_speed,
-                )
-                poison_distances.append(poison_distance)
-                poison_velocities.append(poison_velocity)
+        (
+            poison_sensor_distance_vals,
+            poison_sensor_velocity_vals,
+        ) = readings(self.poisons, self.poison_speed)
 
+        # When there is only one pursuer the sensors will not sense
+        # another pursuer
+        if self.n_pursuers > 1:
             (
-                poison_sensor_distance_vals,
-                poison_sensor_velocity_vals,
-            ) = self.get_sensor_readings(
-                poison_distances,
-                pursuer.sensor_range,
-                velocites=poison_velocities,
-            )
+                _pursuer_sensor_distance_vals,
+                _pursuer_sensor_velocity_vals,
+            ) = readings(self.pursuers, self.pursuer_speed, exclude_self=True)
+        else:
+            _pursuer_sensor_distance_vals = np.zeros((1, self.n_sensors))
+            _pursuer_sensor_velocity_vals = np.zeros((1, self.n_sensors))
 
-            # When there is only one pursuer the sensors will not sense
-            # another pursuer
-            if self.n_pursuers > 1:
-                for j, _pursuer in enumerate(self.pursuers):
-                    # Get sensor readings only for other pursuers
-                    if i == j:
-                        continue
-
-                    _pursuer_distance, _pursuer_velocity = pursuer.get_sensor_reading(
-                        _pursuer.body.position,
-                        _pursuer.radius,
-                        _pursuer.body.velocity,
-                        self.pursuer_speed,
-                    )
-                    _pursuer_distances.append(_pursuer_distance)
-                    _pursuer_velocities.append(_pursuer_velocity)
+        food_obs = np.array(
+            [[p.shape.food_touched_indicator >= 1] for p in self.pursuers],
+            dtype=np.float64,
+        )
+        poison_obs = np.array(
+            [[p.shape.poison_indicator >= 1] for p in self.pursuers],
+            dtype=np.float64,
+        )
 
-                (
+        # concatenate all observations
+        if self.speed_features:
+            pursuer_observations = np.concatenate(
+                [
+                    obstacle_sensor_vals,
+                    barrier_distances,
+                    evader_sensor_distance_vals,
+                    evader_sensor_velocity_vals,
+                    poison_sensor_distance_vals,
+                    poison_sensor_velocity_vals,
                     _pursuer_sensor_distance_vals,
                     _pursuer_sensor_velocity_vals,
-                ) = self.get_sensor_readings(
-                    _pursuer_distances,
-                    pursuer.sensor_range,
-                    velocites=_pursuer_velocities,
-                )
-            else:
-                _pursuer_sensor_distance_vals = np.zeros(self.n_sensors)
-                _pursuer_sensor_velocity_vals = np.zeros(self.n_sensors)
-
-            if pursuer.shape.food_touched_indicator >= 1:
-                food_obs = 1
-            else:
-                food_obs = 0
-
-            if pursuer.shape.poison_indicator >= 1:
-                poison_obs = 1
-            else:
-                poison_obs = 0
-
-            # concatenate all observations
-            if self.speed_features:
-                pursuer_observation = np.concatenate(
-                    [
-                        obstacle_sensor_vals,
-                        barrier_distances,
-                        evader_sensor_distance_vals,
-                        evader_sensor_velocity_vals,
-                        poison_sensor_distance_vals,
-                        poison_sensor_velocity_vals,
-                        _pursuer_sensor_distance_vals,
-                        _pursuer_sensor_velocity_vals,
-                        np.array([food_obs]),
-                        np.array([poison_obs]),
-                    ]
-                )
-            else:
-                pursuer_observation = np.concatenate(
-                    [
-                        obstacle_sensor_vals,
-                        barrier_distances,
-                        evader_sensor_distance_vals,
-                        poison_sensor_distance_vals,
-                        _pursuer_sensor_distance_vals,
-                        np.array([food_obs]),
-                        np.array([poison_obs]),
-                    ]
-                )
-
-            observe_list.append(pursuer_observation)
+                    food_obs,
+                    poison_obs,
+                ],
+                axis=1,
+            )
+        else:
+            pursuer_observations = np.concatenate(
+                [
+                    obstacle_sensor_vals,
+                    barrier_distances,
+                    evader_sensor_distance_vals,
+                    poison_sensor_distance_vals,
+                    _pursuer_sensor_distance_vals,
+                    food_obs,
+                    poison_obs,
+                ],
+                axis=1,
+            )
 
-        return observe_list
+        return list(pursuer_observations)
+
+    @staticmethod
+    def object_arrays(objects):
+        """Positions (n, 2), velocities (n, 2) and radii (n,) of a list of objects."""
+        positions = np.array(
+            [obj.body.position for obj in objects], dtype=np.float64
+        ).reshape(-1, 2)
+        velocities = np.array(
+            [obj.body.velocity for obj in objects], dtype=np.float64
+        ).reshape(-1, 2)
+        radii = np.array([obj.radius for obj in objects], dtype=np.float64)
+        return positions, velocities, radii
 
     def get_sensor_readings(self, positions, sensor_range, velocites=None):
         """Get readings from sensors.
@@ -4,6 +4,128 @@ import pymunk
 from gymnasium import spaces
 
 
+def sensor_readings(
+    positions,
+    velocities,
+    sensors,
+    sensor_range,
+    max_speed,
+    object_positions,
+    object_radii,
+    object_velocities,
+    object_max_speed,
+    exclude_self=False,
+):
+    """Closest-object reading of every sensor of every pursuer at once.
+
+    Batched equivalent of Pursuers.get_sensor_reading over all pursuers x objects,
+    reduced to the closest object per sensor like WaterworldBase.get_sensor_readings.
+    positions and velocities are (n_pursuers, 2), object_positions and object_velocities
+    (n_objects, 2) and object_radii (n_objects,). With exclude_self the objects are the
+    pursuers themselves and no pursuer senses itself.
+
+    Pairs further apart than sensor_range + radius cannot intersect any sensor ray, so
+    they are culled before the projections are computed.
+
+    Returns (n_pursuers, n_sensors) arrays of distances and velocities.
+    """
+    n_pursuers, n_objects, n_sensors = (
+        len(positions),
+        len(object_positions),
+        len(sensors),
+    )
+    if n_objects == 0:
+        return np.ones((n_pursuers, n_sensors)), np.zeros((n_pursuers, n_sensors))
+
+    # Readings of objects that are not sensed: full range, no velocity
+    distances = np.ones((n_pursuers, n_objects, n_sensors))
+    relative_velocities = np.zeros((n_pursuers, n_objects, n_sensors))
+
+    offsets = object_positions[None, :, :] - positions[:, None, :]
+    distance_squared = offsets[..., 0] ** 2 + offsets[..., 1] ** 2
+
+    reach_squared = (sensor_range + object_radii) ** 2 + object_radii**2
+    candidates = distance_squared <= reach_squared * (1 + 1e-9)
+    if exclude_self:
+        np.fill_diagonal(candidates, False)
+    pursuer_idx, object_idx = np.nonzero(candidates)
+
+    if len(pursuer_idx):
+        radii = object_radii[object_idx, None]
+
+        # Project distances and relative velocities to sensor vectors
+        sensor_distances = offsets[pursuer_idx, object_idx] @ sensors.T
+        sensor_velocities = (
+            (object_velocities[object_idx] - velocities[pursuer_idx])
+            @ sensors.T
+            / (object_max_speed + max_speed)
+        )
+
+        # Check for valid detection criterions
+        wrong_direction_idx = sensor_distances < 0
+        out_of_range_idx = sensor_distances - radii > sensor_range
+        no_intersection_idx = (
+            distance_squared[pursuer_idx, object_idx, None] - sensor_distances**2
+            > radii**2
+        )
+        not_sensed_idx = wrong_direction_idx | out_of_range_idx | no_intersection_idx
+
+        sensor_distances = np.clip(sensor_distances / sensor_range, 0, 1)
+        sensor_distances[not_sensed_idx] = 1.0
+        sensor_velocities[not_sensed_idx] = 0.0
+
+        distances[pursuer_idx, object_idx] = sensor_distances
+        relative_velocities[pursuer_idx, object_idx] = sensor_velocities
+
+    if exclude_self:
+        # never the closest object, even when nothing else is sensed either
+        self_idx = np.arange(n_pursuers)
+        distances[self_idx, self_idx] = np.inf
+
+    # Sensor only reads the closest object
+    closest = np.argmin(distances, axis=1)[:, None, :]
+    return (
+        np.take_along_axis(distances, closest, axis=1)[:, 0, :],
+        np.take_along_axis(relative_velocities, closest, axis=1)[:, 0, :],
+    )
+
+
+def barrier_readings(positions, sensors, sensor_range, pixel_scale):
+    """Distance to the barrier along every sensor of every pursuer, (n_pursuers, n_sensors).
+
+    See Pursuers.get_sensor_barrier_readings.
+    """
+    # Get the endpoint position of each sensor
+    sensor_vectors = sensors * sensor_range
+    sensor_endpoints = positions[:, None, :] + sensor_vectors
+
+    # Clip sensor lines on the environment's barriers.
+    # Note that any clipped vectors may not be at the same angle as the original sensors
+    clipped_vectors = (
+        np.clip(sensor_endpoints, 0.0, pixel_scale) - positions[:, None, :]
+    )
+
+    # Find the ratio of the clipped sensor vector to the original sensor vector
+    # Scaling the vector by this ratio will limit the end of the vector to the barriers
+    ratios = np.divide(
+        clipped_vectors,
+        sensor_vectors,
+        out=np.ones_like(clipped_vectors),
+        where=np.abs(sensor_vectors) > 1e-8,
+    )
+
+    # Find the minimum ratio (x or y) of clipped endpoints to original endpoints
+    sensor_values = np.amin(ratios, axis=2)
+
+    # Set values beyond sensor range to 1.0
+    sensor_values[sensor_values >= (1.0 - 1e-4)] = 1.0
+
+    # Convert -0 to 0
+    sensor_values[sensor_values == -0] = 0
+
+    return sensor_values
+
+
 class Obstacle:
     def __init__(self, x, y, pixel_scale=750, radius=0.1):
         self.body = pymunk.Body(0, 0, pymunk.Body.STATIC)
@@ -181,42 +303,10 @@ class Pursuers(MovingObject):
         See https://github.com/BolunDai0216/WaterworldRevamp for
         a detailed explanation.
         """
-        # Get the endpoint position of each sensor
-        sensor_vectors = self._sensors * self.sensor_range
-        position_vec = np.array([self.body.position.x, self.body.position.y])
-        sensor_endpoints = position_vec + sensor_vectors
-
-        # Clip sensor lines on the environment's barriers.
-        # Note that any clipped vectors may not be at the same angle as the original sensors
-        clipped_endpoints = np.clip(sensor_endpoints, 0.0, self.pixel_scale)
-
-        # Extract just the sensor vectors after clipping
-        clipped_vectors = clipped_endpoints - position_vec
-
-        # Find the ratio of the clipped sensor vector to the original sensor vector
-        # Scaling the vector by this ratio will limit the end of the vector to the barriers
-        ratios = np.divide(
-            clipped_vectors,
-            sensor_vectors,
-            out=np.ones_like(clipped_vectors),
-            where=np.abs(sensor_vectors) > 1e-8,
-        )
-
-        # Find the minimum ratio (x or y) of clipped endpoints to original endpoints
-        minimum_ratios = np.amin(ratios, axis=1)
-
-        # Convert to 2d array of size (n_sensors, 1)
-        sensor_values = np.expand_dims(minimum_ratios, 0)
-
-        # Set values beyond sensor range to 1.0
-        does_sense = minimum_ratios < (1.0 - 1e-4)
-        does_sense = np.expand_dims(does_sense, 0)
-        sensor_values[np.logical_not(does_sense)] = 1.0
-
-        # Convert -0 to 0
-        sensor_values[sensor_values == -0] = 0
-
-        return sensor_values[0, :]
+        position_vec = np.array([[self.body.position.x, self.body.position.y]])
+        return barrier_readings(
+            position_vec, self._sensors, self.sensor_range, self.pixel_scale
+        )[0]
 
     def get_sensor_reading(
         self, object_coord, object_radius, object_velocity, object_max_velocity
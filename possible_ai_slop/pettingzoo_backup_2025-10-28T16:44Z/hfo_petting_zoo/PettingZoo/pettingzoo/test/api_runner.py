@@ -0,0 +1,453 @@
+"""Runs the API conformance tests of many environments across a process pool.
+
+Each (environment, test) pair is an independent job, so the whole battery takes about
+as long as its slowest jobs once there are enough cores. The tests are
+
+- api: api_test()
+- seed: seed_test()
+- parallel_api: parallel_api_test()
+- parallel_seed: parallel_seed_test()
+- max_cycles: max_cycles_test()
+
+where the parallel tests need a parallel_env() and max_cycles needs an environment
+taking a max_cycles argument. Environments are given as names like "classic/go_v5" or
+as the module path of a custom environment, which should define env() and optionally
+parallel_env() like the bundled environments do:
+
+    python -m pettingzoo.test.api_runner classic/go_v5 my_package.my_env_v0 --fast
+
+Passes are cached by a hash of the source of the environment, of the test and of
+every module of their packages they import, so unchanged environments are not tested
+again. With --fast, the long runs (1000 cycles of api_test, 500 of seed_test) are
+replaced by a few short probes with random seeds; the seed is printed so that a
+failing probe can be repeated with --seed. Fast runs neither use nor update the
+cache, as a pass only covers the seeds that happened to be drawn.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import io
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import gymnasium
+import numpy as np
+
+import pettingzoo
+
+TESTS = {
+    "api": "pettingzoo.test.api_test",
+    "seed": "pettingzoo.test.seed_test",
+    "parallel_api": "pettingzoo.test.parallel_test",
+    "parallel_seed": "pettingzoo.test.seed_test",
+    "max_cycles": "pettingzoo.test.max_cycles_test",
+}
+
+FAST_CYCLES = 50
+FAST_PROBES = 3
+
+CACHE_VERSION = 2
+
+
+def _imported_names(path: str, module_name: str, is_package: bool):
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    package = module_name if is_package else module_name.rpartition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                base = importlib.util.resolve_name("." * node.level + base, package)
+            yield base
+            # `from package import module` imports a module too
+            yield from (f"{base}.{alias.name}" for alias in node.names)
+
+
+def source_files(module_name: str, roots: list[str]) -> dict[str, str]:
+    """Source files of a module and of everything under roots it imports, recursively.
+
+    The imports are read from the source, without importing the modules themselves.
+
+    Returns:
+        dict[str, str]: module name to source file
+    """
+    files = {}
+    pending = [module_name]
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, AttributeError, ValueError):
+            # not a module, e.g. a class imported with `from module import Class`
+            continue
+        if spec is None or not spec.has_location or not spec.origin.endswith(".py"):
+            continue
+        origin = os.path.realpath(spec.origin)
+        if not any(origin.startswith(root) for root in roots):
+            continue
+        files[name] = origin
+        is_package = spec.submodule_search_locations is not None
+        pending.extend(_imported_names(origin, name, is_package))
+        # parent packages run before the module does
+        pending.append(name.rpartition(".")[0])
+    return files
+
+
+def _package_root(module_name: str) -> str:
+    spec = importlib.util.find_spec(module_name.partition(".")[0])
+    if spec.submodule_search_locations:
+        return os.path.realpath(spec.submodule_search_locations[0])
+    return os.path.dirname(os.path.realpath(spec.origin))
+
+
+def cache_key(module_name: str, test: str, params: dict[str, Any]) -> str:
+    """Hash of everything that decides whether a passed test would still pass."""
+    roots = [_package_root("pettingzoo"), _package_root(module_name)]
+    files = source_files(module_name, roots)
+    files.update(source_files(TESTS[test], roots))
+    sources = {}
+    for name, path in sorted(files.items()):
+        with open(path, "rb") as f:
+            sources[name] = hashlib.sha256(f.read()).hexdigest()
+    key = {
+        "module": module_name,
+        "test": test,
+        "params": params,
+        "sources": sources,
+        "versions": [
+            sys.version,
+            pettingzoo.__version__,
+            gymnasium.__version__,
+            np.__version__,
+        ],
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def load_cache(path: str | None) -> dict[str, Any]:
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        cache = json.load(f)
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache["passed"]
+
+
+def save_cache(path: str | None, passed: dict[str, Any]):
+    if path is None:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "passed": passed}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _missing_dependency(error: ImportError, module_name: str) -> bool:
+    missing = error.name or ""
+    return isinstance(error, ModuleNotFoundError) and not (
+        module_name == missing or module_name.startswith(missing + ".")
+    )
+
+
+def _accepts_max_cycles(module) -> bool:
+    try:
+        parameters = inspect.signature(module.raw_env).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return "max_cycles" in parameters or any(
+        p.kind == p.VAR_KEYWORD for p in parameters.values()
+    )
+
+
+def _seed_probe(seed: int):
+    # api_test and parallel_api_test sample actions with the global generators
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def _seed_spaces(env, seed: int):
+    # api_test checks for possible_agents itself
+    for i, agent in enumerate(getattr(env, "possible_agents", [])):
+        env.action_space(agent).seed(seed + i)
+
+
+def _run_probe(module, test: str, cycles: int | None, seed: int | None):
+    from pettingzoo.test import (
+        api_test,
+        max_cycles_test,
+        parallel_api_test,
+        parallel_seed_test,
+        seed_test,
+    )
+
+    kwargs = {} if cycles is None else {"num_cycles": cycles}
+    if seed is not None:
+        _seed_probe(seed)
+
+    if test == "api":
+        env = module.env()
+        if seed is not None:
+            _seed_spaces(env, seed)
+        api_test(env, **kwargs)
+    elif test == "parallel_api":
+        env = module.parallel_env()
+        if seed is not None:
+            _seed_spaces(env, seed)
+        parallel_api_test(env, **kwargs)
+    elif test == "seed":
+        seed_test(module.env, **kwargs, **({} if seed is None else {"seed": seed}))
+    elif test == "parallel_seed":
+        parallel_seed_test(
+            module.parallel_env, **kwargs, **({} if seed is None else {"seed": seed})
+        )
+    elif test == "max_cycles":
+        max_cycles_test(module)
+
+
+def run_test(
+    module_name: str, test: str, cycles: int | None = None, seeds: list | None = None
+) -> dict[str, Any]:
+    """Runs one test of one environment, once per seed or once with its defaults.
+
+    Returns:
+        dict[str, Any]: the "status" (passed, failed, skipped or error), its duration,
+        the captured output and warnings, and the traceback of a failure
+    """
+    result = {"module": module_name, "test": test, "seeds": seeds}
+    start = time.perf_counter()
+    output = io.StringIO()
+    try:
+        with warnings.catch_warnings(record=True) as caught, contextlib.redirect_stdout(
+            output
+        ):
+            warnings.simplefilter("always")
+            module = importlib.import_module(module_name)
+            needs_parallel = test in ("parallel_api", "parallel_seed", "max_cycles")
+            if needs_parallel and not hasattr(module, "parallel_env"):
+                result.update(status="skipped", reason="no parallel_env()")
+            elif test == "max_cycles" and not _accepts_max_cycles(module):
+                result.update(status="skipped", reason="no max_cycles argument")
+            else:
+                if test == "max_cycles":
+                    seeds = None
+                for seed in seeds or [None]:
+                    result["seed"] = seed
+                    _run_probe(module, test, cycles, seed)
+                result.pop("seed")
+                result["status"] = "passed"
+    except ImportError as e:
+        if _missing_dependency(e, module_name):
+            result.update(status="skipped", reason=f"{type(e).__name__}: {e}")
+        else:
+            result.update(status="error", traceback=traceback.format_exc())
+    except AssertionError:
+        result.update(status="failed", traceback=traceback.format_exc())
+    except Exception:
+        result.update(status="error", traceback=traceback.format_exc())
+    result["duration"] = time.perf_counter() - start
+    result["output"] = output.getvalue()
+    result["warnings"] = sorted({str(w.message) for w in caught})
+    return result
+
+
+def run_api_tests(
+    modules: list[str],
+    tests: list[str] | None = None,
+    fast: bool = False,
+    cycles: int | None = None,
+    probes: int = FAST_PROBES,
+    seed: int | None = None,
+    workers: int | None = None,
+    cache_path: str | None = None,
+    report=print,
+) -> list[dict[str, Any]]:
+    """Runs every test of every module, each in a process of a pool.
+
+    Args:
+        modules (list[str]): module paths of the environments
+        tests (list[str] | None): names from TESTS, all by default
+        fast (bool): run short probes with random seeds instead of the full tests
+        cycles (int | None): cycles per probe, FAST_CYCLES in fast mode and the tests'
+            own defaults otherwise
+        probes (int): number of probes per test in fast mode
+        seed (int | None): seed the probe seeds are drawn from, random by default
+        workers (int | None): number of processes, one per core by default
+        cache_path (str | None): JSON file of the passed tests, no caching if None or
+            in fast mode
+        report (Callable): called with a line per finished job
+
+    Returns:
+        list[dict[str, Any]]: the result of run_test() of each job, cached passes
+        having the status "cached"
+    """
+    tests = tests or list(TESTS)
+    if fast:
+        cycles = cycles or FAST_CYCLES
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**31)
+        report(f"fast mode, {probes} probes of {cycles} cycles, seed {seed}")
+        rng = random.Random(seed)
+    params = {"cycles": cycles}
+
+    # a fast pass only vouches for its random seeds, so it must not pin the result
+    cache = {} if fast else load_cache(cache_path)
+    results, jobs = [], []
+    for module_name in modules:
+        for test in tests:
+            key = None if fast else cache_key(module_name, test, params)
+            if key in cache:
+                result = {"module": module_name, "test": test, "status": "cached"}
+                results.append(result)
+                report(_format_result(result))
+            else:
+                seeds = (
+                    [rng.randrange(2**31) for _ in range(probes)] if fast else None
+                )
+                jobs.append((key, module_name, test, seeds))
+
+    for job, result in _run_jobs(jobs, cycles, workers or os.cpu_count()):
+        key, module_name, test, _ = job
+        if result["status"] == "passed" and key is not None:
+            cache[key] = {
+                "module": module_name,
+                "test": test,
+                "duration": result["duration"],
+            }
+        results.append(result)
+        report(_format_result(result))
+
+    if not fast:
+        save_cache(cache_path, cache)
+    return results
+
+
+def _run_jobs(jobs: list[tuple], cycles: int | None, workers: int):
+    """Yields (job, result) as the jobs finish, running them on a pool of workers.
+
+    When a worker dies, every job still pending on the pool fails with it. Those jobs
+    are run again, each in a process of its own, so that only the job that crashes
+    is reported as an error.
+    """
+    # spawn, so that jobs do not inherit state (e.g. seeded generators) of the caller
+    context = mp.get_context("spawn")
+    unfinished = []
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        futures = {}
+        for job in jobs:
+            _, module_name, test, seeds = job
+            futures[pool.submit(run_test, module_name, test, cycles, seeds)] = job
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                unfinished.append(futures[future])
+                continue
+            yield futures[future], result
+    if not unfinished:
+        return
+    with ThreadPoolExecutor(workers) as threads:
+        futures = {
+            threads.submit(_run_alone, job, cycles, context): job for job in unfinished
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _run_alone(job: tuple, cycles: int | None, context) -> dict[str, Any]:
+    _, module_name, test, seeds = job
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        try:
+            return pool.submit(run_test, module_name, test, cycles, seeds).result()
+        except BrokenProcessPool:
+            return {
+                "module": module_name,
+                "test": test,
+                "seeds": seeds,
+                "status": "error",
+                "traceback": "the worker process died, e.g. from a crash",
+            }
+
+
+def _format_result(result: dict[str, Any]) -> str:
+    line = f"{result['status'].upper():8} {result['module']} {result['test']}"
+    if "duration" in result:
+        line += f" ({result['duration']:.1f}s)"
+    if result["status"] == "skipped":
+        line += f": {result['reason']}"
+    elif result["status"] in ("failed", "error"):
+        if result.get("seed") is not None:
+            line += f" with seed {result['seed']}"
+        line += "\n" + result["traceback"]
+    return line
+
+
+def resolve_modules(names: list[str]) -> list[str]:
+    """Module paths of environment names like "classic/go_v5" and of module paths."""
+    from pettingzoo.test.benchmark_suite import environment_names
+
+    known = environment_names()
+    if not names:
+        return list(known.values())
+    return [known.get(name, name) for name in names]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "envs", nargs="*", help="e.g. classic/go_v5 or my_package.my_env_v0"
+    )
+    parser.add_argument("--tests", nargs="*", choices=list(TESTS))
+    parser.add_argument("--fast", action="store_true", help="run short probes")
+    parser.add_argument("--cycles", type=int)
+    parser.add_argument("--probes", type=int, default=FAST_PROBES)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cache", default=".pettingzoo_api_cache.json")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_api_tests(
+        resolve_modules(args.envs),
+        args.tests,
+        fast=args.fast,
+        cycles=args.cycles,
+        probes=args.probes,
+        seed=args.seed,
+        workers=args.workers,
+        cache_path=None if args.no_cache else args.cache,
+        report=lambda line: print(line, flush=True),
+    )
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print(", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    return int(any(r["status"] in ("failed", "error") for r in results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+"""Throughput benchmarks over the bundled environments.
+
+Every configuration (environment, API, keyword arguments, render mode) is stepped with
+random legal actions after a warmup, for several timed trials. The suite records:
+
+- steps/s (env.step calls) and agent steps/s (actions taken), with their spread over
+  the trials
+- the cost of reset()
+- the peak resident set size of the process running the configuration
+- the peak traced memory and net number of allocated blocks over a fixed number of
+  steps, measured in a separate pass with tracemalloc on
+
+Results are written as JSON and can be compared against a stored baseline, e.g.
+
+    python -m pettingzoo.test.benchmark_suite --envs classic/go_v5 sisl/pursuit_v4 \\
+        --out results.json --baseline baseline.json --threshold 0.1
+
+which exits with status 1 when a configuration got slower than the threshold allows.
+Environments whose dependencies are not installed are reported as skipped, and ones
+that raise or crash their process as errors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import pkgutil
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from queue import Empty
+from typing import Any, Callable
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+FAMILIES = ["atari", "butterfly", "classic", "mpe", "sisl"]
+
+# third party environments benchmarked alongside the bundled ones
+EXTRA_ENVIRONMENTS = {"mpe2/simple_tag_v3": "mpe2.simple_tag_v3"}
+
+# keyword arguments changing the number of agents, per environment
+AGENT_COUNT_KWARGS = {
+    "butterfly/knights_archers_zombies_v10": [
+        {"num_archers": 4, "num_knights": 4},
+        {"num_archers": 8, "num_knights": 8},
+    ],
+    "butterfly/pistonball_v6": [{"n_pistons": 40}],
+    "classic/texas_holdem_no_limit_v6": [{"num_players": 6}],
+    "mpe/simple_tag_v3": [{"num_good": 4, "num_adversaries": 12}],
+    "mpe2/simple_tag_v3": [{"num_good": 4, "num_adversaries": 12}],
+    "sisl/multiwalker_v9": [{"n_walkers": 6}],
+    "sisl/pursuit_v4": [{"n_pursuers": 32, "n_evaders": 60}],
+    "sisl/waterworld_v4": [{"n_pursuers": 20}],
+}
+
+
+def environment_names() -> dict[str, str]:
+    """Names like "classic/go_v5" mapped to their module, without importing them."""
+    names = {}
+    for family in FAMILIES:
+        package = importlib.import_module(f"pettingzoo.{family}")
+        for module in pkgutil.iter_modules(package.__path__):
+            if re.fullmatch(r".+_v\d+", module.name):
+                names[f"{family}/{module.name}"] = f"pettingzoo.{family}.{module.name}"
+    names.update(EXTRA_ENVIRONMENTS)
+    return dict(sorted(names.items()))
+
+
+def benchmark_configs(
+    env_names: list[str] | None = None,
+    apis: tuple[str, ...] = ("aec", "parallel"),
+    render_modes: tuple[str | None, ...] = (None,),
+    agent_counts: bool = True,
+) -> list[dict[str, Any]]:
+    """The sweep: every environment, API, agent count variant and render mode."""
+    modules = environment_names()
+    configs = []
+    for name in env_names or modules:
+        kwargs_variants = [{}]
+        if agent_counts:
+            kwargs_variants += AGENT_COUNT_KWARGS.get(name, [])
+        for api in apis:
+            for kwargs in kwargs_variants:
+                for render_mode in render_modes:
+                    configs.append(
+                        {
+                            "env": name,
+                            "module": modules.get(name, name),
+                            "api": api,
+                            "kwargs": kwargs,
+                            "render_mode": render_mode,
+                        }
+                    )
+    return configs
+
+
+def _aec_stepper(env, render: bool, rng: np.random.Generator) -> Callable[[], int]:
+    agent_iter = iter(env.agent_iter())
+
+    def step():
+        nonlocal agent_iter
+        agent = next(agent_iter, None)
+        if agent is None:
+            env.reset()
+            agent_iter = iter(env.agent_iter())
+            agent = next(agent_iter)
+        obs, _, termination, truncation, _ = env.last()
+        if termination or truncation:
+            action = None
+        elif isinstance(obs, dict) and "action_mask" in obs:
+            action = rng.choice(np.flatnonzero(obs["action_mask"]))
+        else:
+            action = env.action_space(agent).sample()
+        env.step(action)
+        if render:
+            env.render()
+        return 1
+
+    return step
+
+
+def _parallel_stepper(env, render: bool) -> Callable[[], int]:
+    def step():
+        if not env.agents:
+            env.reset()
+        actions = {agent: env.action_space(agent).sample() for agent in env.agents}
+        env.step(actions)
+        if render:
+            env.render()
+        return len(actions)
+
+    return step
+
+
+def _make_env(config: dict[str, Any]):
+    module = importlib.import_module(config["module"])
+    kwargs = dict(config["kwargs"])
+    if config["render_mode"] is not None:
+        kwargs["render_mode"] = config["render_mode"]
+    if config["api"] == "parallel":
+        if not hasattr(module, "parallel_env"):
+            raise NotImplementedError("no parallel API")
+        return module.parallel_env(**kwargs)
+    return module.env(**kwargs)
+
+
+def _summary(values: list[float]) -> dict[str, Any]:
+    return {
+        "mean": statistics.fmean(values),
+        "std": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "min": min(values),
+        "max": max(values),
+        "trials": values,
+    }
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def benchmark_env(
+    config: dict[str, Any],
+    trials: int = 5,
+    seconds: float = 1.0,
+    warmup_steps: int = 100,
+    reset_trials: int = 10,
+    alloc_steps: int = 200,
+) -> dict[str, Any]:
+    """Benchmarks one configuration from benchmark_configs().
+
+    Args:
+        config (dict[str, Any]): the environment, API, keyword arguments and render mode
+        trials (int): number of timed trials
+        seconds (float): wall-clock length of each trial
+        warmup_steps (int): untimed steps before the first trial
+        reset_trials (int): number of timed resets
+        alloc_steps (int): steps of the allocation pass
+
+    Returns:
+        dict[str, Any]: the config with a "status" and, if it ran, its metrics
+    """
+    result = dict(config)
+    try:
+        env = _make_env(config)
+    except (ImportError, NotImplementedError) as e:
+        result.update(status="skipped", reason=f"{type(e).__name__}: {e}")
+        return result
+    except Exception as e:
+        result.update(status="error", reason=f"{type(e).__name__}: {e}")
+        return result
+
+    try:
+        reset_ms = []
+        for i in range(reset_trials):
+            start = time.perf_counter()
+            env.reset(seed=i)
+            reset_ms.append((time.perf_counter() - start) * 1000)
+
+        for i, agent in enumerate(env.possible_agents):
+            env.action_space(agent).seed(i)
+        render = config["render_mode"] is not None
+        if config["api"] == "parallel":
+            step = _parallel_stepper(env, render)
+        else:
+            step = _aec_stepper(env, render, np.random.default_rng(0))
+
+        for _ in range(warmup_steps):
+            step()
+
+        steps_per_s, agent_steps_per_s = [], []
+        for _ in range(trials):
+            steps = agent_steps = 0
+            start = time.perf_counter()
+            end = start + seconds
+            now = start
+            while now < end:
+                agent_steps += step()
+                steps += 1
+                now = time.perf_counter()
+            steps_per_s.append(steps / (now - start))
+            agent_steps_per_s.append(agent_steps / (now - start))
+
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        for _ in range(alloc_steps):
+            step()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        net_blocks = sys.getallocatedblocks() - blocks_before
+
+        result.update(
+            status="ok",
+            steps_per_s=_summary(steps_per_s),
+            agent_steps_per_s=_summary(agent_steps_per_s),
+            reset_ms=_summary(reset_ms),
+            peak_rss_mb=_peak_rss_mb(),
+            traced_peak_kb=traced_peak / 1024,
+            net_blocks_per_step=net_blocks / alloc_steps,
+        )
+    except Exception as e:
+        result.update(status="error", reason=f"{type(e).__name__}: {e}")
+    try:
+        env.close()
+    except Exception as e:
+        if result.get("status") != "error":
+            result.update(status="error", reason=f"close: {type(e).__name__}: {e}")
+    return result
+
+
+def _run_isolated(queue, config, kwargs):
+    queue.put(benchmark_env(config, **kwargs))
+
+
+def _isolated_result(ctx, config: dict[str, Any], kwargs: dict[str, Any]):
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_isolated, args=(queue, config, kwargs))
+    process.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=1.0)
+            except Empty:
+                if process.exitcode is None:
+                    continue
+            # the process may have exited right after putting its result
+            try:
+                return queue.get(timeout=1.0)
+            except Empty:
+                reason = f"benchmark process exited with code {process.exitcode}"
+                return dict(config, status="error", reason=reason)
+    finally:
+        process.join()
+
+
+def run_benchmark_suite(
+    configs: list[dict[str, Any]], isolate: bool = True, verbose: bool = True, **kwargs
+) -> dict[str, Any]:
+    """Runs benchmark_env() on every config.
+
+    With isolate, each configuration runs in a fresh process so that peak_rss_mb is
+    its own and one environment's global state cannot affect another.
+    """
+    ctx = mp.get_context("spawn")
+    results = []
+    for config in configs:
+        if isolate:
+            result = _isolated_result(ctx, config, kwargs)
+        else:
+            result = benchmark_env(config, **kwargs)
+        results.append(result)
+        if verbose:
+            print(_format_result(result), flush=True)
+    return {"machine": machine_info(), "results": results}
+
+
+def machine_info() -> dict[str, Any]:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": mp.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def _config_key(result: dict[str, Any]) -> str:
+    return json.dumps(
+        [result["env"], result["api"], result["kwargs"], result["render_mode"]],
+        sort_keys=True,
+    )
+
+
+def _format_result(result: dict[str, Any]) -> str:
+    name = f"{result['env']} [{result['api']}]"
+    if result["kwargs"]:
+        name += " " + json.dumps(result["kwargs"], sort_keys=True)
+    if result["render_mode"]:
+        name += f" render={result['render_mode']}"
+    if result["status"] != "ok":
+        return f"{name}: {result['status']} ({result['reason']})"
+    steps = result["steps_per_s"]
+    return (
+        f"{name}: {steps['mean']:.0f} ± {steps['std']:.0f} steps/s, "
+        f"reset {result['reset_ms']['mean']:.2f} ms, "
+        f"peak RSS {result['peak_rss_mb'] or 0:.0f} MB"
+    )
+
+
+def compare_to_baseline(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.1
+) -> list[dict[str, Any]]:
+    """Configurations whose mean steps/s fell more than threshold below the baseline.
+
+    Only configurations that ran in both result sets are compared. A slowdown smaller
+    than the spread of the two runs (sum of their standard deviations) is not reported.
+    """
+    base = {_config_key(r): r for r in baseline["results"] if r["status"] == "ok"}
+    regressions = []
+    for result in current["results"]:
+        previous = base.get(_config_key(result))
+        if result["status"] != "ok" or previous is None:
+            continue
+        now, before = result["steps_per_s"], previous["steps_per_s"]
+        slowdown = before["mean"] - now["mean"]
+        if (
+            now["mean"] < before["mean"] * (1 - threshold)
+            and slowdown > now["std"] + before["std"]
+        ):
+            regressions.append(
+                {
+                    "env": result["env"],
+                    "api": result["api"],
+                    "kwargs": result["kwargs"],
+                    "render_mode": result["render_mode"],
+                    "baseline_steps_per_s": before["mean"],
+                    "steps_per_s": now["mean"],
+                    "change": now["mean"] / before["mean"] - 1,
+                }
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--envs", nargs="*", help="e.g. classic/go_v5 (default: all)")
+    parser.add_argument("--api", nargs="*", default=["aec", "parallel"])
+    parser.add_argument(
+        "--render-modes",
+        nargs="*",
+        default=["none"],
+        help='render modes to sweep, "none" for no rendering',
+    )
+    parser.add_argument("--no-agent-counts", action="store_true")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--warmup-steps", type=int, default=100)
+    parser.add_argument("--no-isolate", action="store_true")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    configs = benchmark_configs(
+        args.envs,
+        tuple(args.api),
+        tuple(None if mode == "none" else mode for mode in args.render_modes),
+        agent_counts=not args.no_agent_counts,
+    )
+    results = run_benchmark_suite(
+        configs,
+        isolate=not args.no_isolate,
+        trials=args.trials,
+        seconds=args.seconds,
+        warmup_steps=args.warmup_steps,
+    )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['env']} [{r['api']}] {json.dumps(r['kwargs'])}: "
+                f"{r['baseline_steps_per_s']:.0f} -> {r['steps_per_s']:.0f} steps/s "
+                f"({r['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
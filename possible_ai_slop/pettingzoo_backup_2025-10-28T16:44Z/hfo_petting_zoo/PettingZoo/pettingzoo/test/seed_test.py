@@ -3,31 +3,31 @@ from __future__ import annotations
 from gymnasium.utils.env_checker import data_equivalence
 
 
-def seed_action_spaces(env):
+def seed_action_spaces(env, seed=42):
     if hasattr(env, "agents"):
         for i, agent in enumerate(env.agents):
-            env.action_space(agent).seed(42 + i)
+            env.action_space(agent).seed(seed + i)
 
 
-def seed_observation_spaces(env):
+def seed_observation_spaces(env, seed=42):
     if hasattr(env, "agents"):
         for i, agent in enumerate(env.agents):
-            env.observation_space(agent).seed(42 + i)
+            env.observation_space(agent).seed(seed + i)
 
 
-def check_environment_deterministic(env1, env2, num_cycles):
+def check_environment_deterministic(env1, env2, num_cycles, seed=42):
     """Check that two AEC environments execute the same way."""
 
-    env1.reset(seed=42)
-    env2.reset(seed=42)
+    env1.reset(seed=seed)
+    env2.reset(seed=seed)
 
     # seed action spaces to ensure sampled actions are the same
-    seed_action_spaces(env1)
-    seed_action_spaces(env2)
+    seed_action_spaces(env1, seed)
+    seed_action_spaces(env2, seed)
 
     # seed observation spaces to ensure first observation is the same
-    seed_observation_spaces(env1)
-    seed_observation_spaces(env2)
+    seed_observation_spaces(env1, seed)
+    seed_observation_spaces(env2, seed)
 
     iter = 0
     max_env_iters = num_cycles * len(env1.agents)
@@ -79,27 +79,27 @@ def check_environment_deterministic(env1, env2, num_cycles):
     env2.close()
 
 
-def check_environment_deterministic_parallel(env1, env2, num_cycles):
+def check_environment_deterministic_parallel(env1, env2, num_cycles, seed=42):
     """Check that two parallel environments execute the same way."""
-    env1.reset(seed=42)
-    env2.reset(seed=42)
+    env1.reset(seed=seed)
+    env2.reset(seed=seed)
 
     # seed action spaces to ensure sampled actions are the same
-    seed_action_spaces(env1)
-    seed_action_spaces(env2)
+    seed_action_spaces(env1, seed)
+    seed_action_spaces(env2, seed)
 
     # seed observation spaces to ensure first observation is the same
-    seed_observation_spaces(env1)
-    seed_observation_spaces(env2)
+    seed_observation_spaces(env1, seed)
+    seed_observation_spaces(env2, seed)
 
     iter = 0
     max_env_iters = num_cycles * len(env1.agents)
 
-    env1.reset(seed=42)
-    env2.reset(seed=42)
+    env1.reset(seed=seed)
+    env2.reset(seed=seed)
 
-    seed_action_spaces(env1)
-    seed_action_spaces(env2)
+    seed_action_spaces(env1, seed)
+    seed_action_spaces(env2, seed)
 
     while env1.agents:
         actions1 = {agent: env1.action_space(agent).sample() for agent in env1.agents}
@@ -125,15 +125,15 @@ def check_environment_deterministic_parallel(env1, env2, num_cycles):
     env2.close()
 
 
-def seed_test(env_constructor, num_cycles=500):
+def seed_test(env_constructor, num_cycles=500, seed=42):
     env1 = env_constructor()
     env2 = env_constructor()
 
-    check_environment_deterministic(env1, env2, num_cycles)
+    check_environment_deterministic(env1, env2, num_cycles, seed)
 
 
-def parallel_seed_test(parallel_env_fn, num_cycles=500):
+def parallel_seed_test(parallel_env_fn, num_cycles=500, seed=42):
     env1 = parallel_env_fn()
     env2 = parallel_env_fn()
 
-    check_environment_deterministic_parallel(env1, env2, num_cycles)
+    check_environment_deterministic_parallel(env1, env2, num_cycles, seed)
@@ -8,6 +8,7 @@ from pettingzoo.utils.conversions import (
 from pettingzoo.utils.env import AECEnv, ParallelEnv
 from pettingzoo.utils.random_demo import random_demo
 from pettingzoo.utils.save_observation import save_observation
+from pettingzoo.utils.vector_env import ParallelVecEnv
 from pettingzoo.utils.wrappers import (
     AssertOutOfBoundsWrapper,
     BaseParallelWrapper,
@@ -22,5 +23,6 @@ __all__ = [
     "AECEnv",
     "AgentSelector",
     "ParallelEnv",
+    "ParallelVecEnv",
     "save_observation",
 ]
@@ -4,6 +4,9 @@ import warnings
 from collections import defaultdict
 from typing import Callable, Dict, Optional
 
+import numpy as np
+from gymnasium.spaces import Box, MultiBinary, MultiDiscrete
+
 from pettingzoo.utils import AgentSelector
 from pettingzoo.utils.env import ActionType, AECEnv, AgentID, ObsType, ParallelEnv
 from pettingzoo.utils.wrappers import OrderEnforcingWrapper
@@ -42,19 +45,19 @@ def aec_wrapper_fn(par_env_fn: Callable) -> Callable:
 
 
 def aec_to_parallel(
-    aec_env: AECEnv[AgentID, ObsType, ActionType]
+    aec_env: AECEnv[AgentID, ObsType, ActionType], zero_copy: bool = False
 ) -> ParallelEnv[AgentID, ObsType, ActionType]:
     """Converts an AEC environment to a Parallel environment.
 
     In the case of an existing Parallel environment wrapped using a `parallel_to_aec_wrapper`, this function will return the original Parallel environment.
-    Otherwise, it will apply the `aec_to_parallel_wrapper` to convert the environment.
+    Otherwise, it will apply the `aec_to_parallel_wrapper` to convert the environment, see it for `zero_copy`.
     """
     if isinstance(aec_env, OrderEnforcingWrapper) and isinstance(
         aec_env.env, parallel_to_aec_wrapper
     ):
         return aec_env.env.env
     else:
-        par_env = aec_to_parallel_wrapper(aec_env)
+        par_env = aec_to_parallel_wrapper(aec_env, zero_copy=zero_copy)
         return par_env
 
 
@@ -103,9 +106,17 @@ def from_parallel(
 
 
 class aec_to_parallel_wrapper(ParallelEnv[AgentID, ObsType, ActionType]):
-    """Converts an AEC environment into a Parallel environment."""
+    """Converts an AEC environment into a Parallel environment.
+
+    With `zero_copy`, which needs Box, MultiBinary or MultiDiscrete observation spaces of a single dtype,
+    each agent's observation is copied into its row of `observation_buffer`, a preallocated
+    (len(possible_agents), ...) array in possible_agents order, and the observations returned are views of it.
+    Its rows have the observation shape when all agents share it, and are flattened and zero padded otherwise;
+    the rows of agents that are not alive are zero. The dictionaries returned by reset() and step() are reused as well,
+    so everything they return is only valid until the next call and must be copied to be kept.
+    """
 
-    def __init__(self, aec_env):
+    def __init__(self, aec_env, zero_copy: bool = False):
         assert aec_env.metadata.get("is_parallelizable", False), (
             "Converting from an AEC environment to a Parallel environment "
             "with the to_parallel wrapper is not generally safe "
@@ -139,6 +150,57 @@ class aec_to_parallel_wrapper(ParallelEnv[AgentID, ObsType, ActionType]):
         except AttributeError:
             pass
 
+        self.zero_copy = zero_copy
+        if zero_copy:
+            self._init_observation_buffer()
+
+    def _init_observation_buffer(self):
+        spaces = [self.observation_space(agent) for agent in self.possible_agents]
+        assert all(
+            isinstance(space, (Box, MultiBinary, MultiDiscrete)) for space in spaces
+        ), "zero_copy needs Box, MultiBinary or MultiDiscrete observation spaces"
+        dtypes = {space.dtype for space in spaces}
+        assert (
+            len(dtypes) == 1
+        ), f"zero_copy needs a single observation dtype, got {dtypes}"
+        shapes = [space.shape for space in spaces]
+
+        if len(set(shapes)) == 1:
+            self.observation_buffer = np.zeros((len(spaces), *shapes[0]), *dtypes)
+            slots = list(self.observation_buffer)
+        else:
+            sizes = [int(np.prod(shape)) for shape in shapes]
+            self.observation_buffer = np.zeros((len(spaces), max(sizes)), *dtypes)
+            slots = [
+                row[:size].reshape(shape)
+                for row, size, shape in zip(self.observation_buffer, sizes, shapes)
+            ]
+        self._observation_slots = dict(zip(self.possible_agents, slots))
+
+        self._observations = {}
+        self._rewards = defaultdict(int)
+        self._terminations = {}
+        self._truncations = {}
+        self._infos = {}
+
+    def _observe_into_buffer(self, agents):
+        """Fills the reused observation dict with views of the rows of agents."""
+        observations = self._observations
+        observations.clear()
+        for agent, slot in self._observation_slots.items():
+            if agent in agents:
+                np.copyto(slot, self.aec_env.observe(agent))
+                observations[agent] = slot
+            else:
+                slot.fill(0)
+        return observations
+
+    @staticmethod
+    def _refill(reused, values):
+        reused.clear()
+        reused.update(values)
+        return reused
+
     @property
     def observation_spaces(self):
         warnings.warn(
@@ -178,6 +240,19 @@ class aec_to_parallel_wrapper(ParallelEnv[AgentID, ObsType, ActionType]):
     def reset(self, seed=None, options=None):
         self.aec_env.reset(seed=seed, options=options)
         self.agents = self.aec_env.agents[:]
+        if self.zero_copy:
+            observations = self._observe_into_buffer(
+                {
+                    agent
+                    for agent in self.aec_env.agents
+                    if not (
+                        self.aec_env.terminations[agent]
+                        or self.aec_env.truncations[agent]
+                    )
+                }
+            )
+            return observations, self._refill(self._infos, self.aec_env.infos)
+
         observations = {
             agent: self.aec_env.observe(agent)
             for agent in self.aec_env.agents
@@ -188,11 +263,11 @@ class aec_to_parallel_wrapper(ParallelEnv[AgentID, ObsType, ActionType]):
         return observations, infos
 
     def step(self, actions):
-        rewards = defaultdict(int)
-        terminations = {}
-        truncations = {}
-        infos = {}
-        observations = {}
+        if self.zero_copy:
+            rewards = self._rewards
+            rewards.clear()
+        else:
+            rewards = defaultdict(int)
         for agent in self.aec_env.agents:
             if agent != self.aec_env.agent_selection:
                 if self.aec_env.terminations[agent] or self.aec_env.truncations[agent]:
@@ -203,17 +278,25 @@ class aec_to_parallel_wrapper(ParallelEnv[AgentID, ObsType, ActionType]):
                     raise AssertionError(
                         f"expected agent {agent} got agent {self.aec_env.agent_selection}, Parallel environment wrapper expects agents to step in a cycle."
                     )
-            obs, rew, termination, truncation, info = self.aec_env.last()
+            # the observation is unused, zero_copy saves observing it
+            if not self.zero_copy:
+                obs, rew, termination, truncation, info = self.aec_env.last()
             self.aec_env.step(actions[agent])
             for agent in self.aec_env.agents:
                 rewards[agent] += self.aec_env.rewards[agent]
 
-        terminations = dict(**self.aec_env.terminations)
-        truncations = dict(**self.aec_env.truncations)
-        infos = dict(**self.aec_env.infos)
-        observations = {
-            agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
-        }
+        if self.zero_copy:
+            terminations = self._refill(self._terminations, self.aec_env.terminations)
+            truncations = self._refill(self._truncations, self.aec_env.truncations)
+            infos = self._refill(self._infos, self.aec_env.infos)
+            observations = self._observe_into_buffer(set(self.aec_env.agents))
+        else:
+            terminations = dict(**self.aec_env.terminations)
+            truncations = dict(**self.aec_env.truncations)
+            infos = dict(**self.aec_env.infos)
+            observations = {
+                agent: self.aec_env.observe(agent) for agent in self.aec_env.agents
+            }
         while self.aec_env.agents and (
             self.aec_env.terminations[self.aec_env.agent_selection]
             or self.aec_env.truncations[self.aec_env.agent_selection]
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import traceback
+from copy import deepcopy
+from typing import Any, Callable, Sequence
+
+import numpy as np
+from gymnasium.spaces import Space
+from gymnasium.vector.utils import (
+    CloudpickleWrapper,
+    batch_space,
+    concatenate,
+    create_empty_array,
+    create_shared_memory,
+    iterate,
+    read_from_shared_memory,
+    write_to_shared_memory,
+)
+
+from pettingzoo.utils.env import ActionType, AgentID, ObsType, ParallelEnv
+
+
+def _empty_observation(space: Space) -> Any:
+    """A zero observation of space, used for agents that are not in a sub-environment."""
+    return next(iterate(batch_space(space, 1), create_empty_array(space, n=1)))
+
+
+def _step_or_reset(
+    env: ParallelEnv, actions: dict[AgentID, ActionType]
+) -> tuple[
+    dict[AgentID, ObsType],
+    dict[AgentID, float],
+    dict[AgentID, bool],
+    dict[AgentID, bool],
+    dict[AgentID, dict],
+    list[AgentID],
+]:
+    """Steps env with the actions of its live agents and resets it once no agent is left.
+
+    On reset, the returned observations and infos are those of the new episode, and each
+    agent's info gains the `final_observation` and `final_info` of the episode that ended.
+    The agents still in env come last.
+    """
+    obs, rewards, terminations, truncations, infos = env.step(
+        {agent: actions[agent] for agent in env.agents}
+    )
+    if not env.agents:
+        final_obs, final_infos = obs, infos
+        obs, infos = env.reset()
+        infos = {agent: dict(info) for agent, info in infos.items()}
+        for agent, agent_obs in final_obs.items():
+            info = infos.setdefault(agent, {})
+            info["final_observation"] = agent_obs
+            info["final_info"] = final_infos.get(agent, {})
+    return obs, rewards, terminations, truncations, infos, list(env.agents)
+
+
+class ParallelVecEnv:
+    """Steps `num_envs` independent copies of a ParallelEnv as one batch.
+
+    Results are stacked per agent over `possible_agents`: observations are batched
+    according to each agent's observation space, rewards are float arrays and
+    terminations / truncations are bool arrays of shape `(num_envs,)`. Actions are
+    passed the same way, as a dict of per-agent arrays (or sequences) of length
+    `num_envs`.
+
+    An agent that is not in a sub-environment (e.g. it died earlier in the episode)
+    gets a zero observation and reward, and its action is ignored; `agent_mask[agent]`
+    tells which sub-environments the agent is still in, i.e. expect an action from it.
+    A sub-environment without agents left is reset straight away, so its observation
+    in the returned batch is the first one of the new episode and the final
+    observation is available in `infos[i][agent]["final_observation"]`.
+
+    With `asynchronous=True` every sub-environment runs in its own process and writes
+    its observations directly into shared memory, only rewards, flags and infos go
+    through pipes. Set `shared_memory=False` for observation spaces that cannot be
+    placed in shared memory.
+
+    Example of usage:
+
+    envs = ParallelVecEnv([lambda: simple_tag_v3.parallel_env()] * 8, asynchronous=True)
+    observations, infos = envs.reset(seed=42)
+    while True:
+        actions = {
+            agent: envs.action_space(agent).sample() for agent in envs.possible_agents
+        }
+        observations, rewards, terminations, truncations, infos = envs.step(actions)
+    """
+
+    def __init__(
+        self,
+        env_fns: Sequence[Callable[[], ParallelEnv]],
+        asynchronous: bool = False,
+        shared_memory: bool = True,
+        context: str | None = None,
+        copy: bool = True,
+    ):
+        """__init__.
+
+        Args:
+            env_fns (Sequence[Callable[[], ParallelEnv]]): functions creating the sub-environments
+            asynchronous (bool): run each sub-environment in its own process
+            shared_memory (bool): with asynchronous, pass observations through shared memory
+            context (str | None): multiprocessing start method, e.g. "spawn" or "fork"
+            copy (bool): return copies of the observation buffers rather than views that the next step overwrites
+        """
+        assert len(env_fns) > 0, "ParallelVecEnv needs at least one environment."
+        self.num_envs = len(env_fns)
+        self.asynchronous = asynchronous
+        self.copy = copy
+        self.closed = False
+
+        if asynchronous:
+            dummy_env = env_fns[0]()
+            self._read_spaces(dummy_env)
+            dummy_env.close()
+            del dummy_env
+            self._envs = None
+            self._start_workers(env_fns, shared_memory, context)
+        else:
+            self._envs = [env_fn() for env_fn in env_fns]
+            self._read_spaces(self._envs[0])
+            self._shared_obs = None
+            self._obs_buffers = {
+                agent: create_empty_array(
+                    self._observation_spaces[agent], self.num_envs
+                )
+                for agent in self.possible_agents
+            }
+
+        self.agent_mask = {
+            agent: np.zeros(self.num_envs, dtype=bool) for agent in self.possible_agents
+        }
+
+    def _read_spaces(self, env: ParallelEnv) -> None:
+        self.metadata = env.metadata
+        self.possible_agents = list(env.possible_agents)
+        self._observation_spaces = {
+            agent: env.observation_space(agent) for agent in self.possible_agents
+        }
+        self._action_spaces = {
+            agent: env.action_space(agent) for agent in self.possible_agents
+        }
+        self._batched_observation_spaces = {
+            agent: batch_space(space, self.num_envs)
+            for agent, space in self._observation_spaces.items()
+        }
+        self._batched_action_spaces = {
+            agent: batch_space(space, self.num_envs)
+            for agent, space in self._action_spaces.items()
+        }
+
+    def observation_space(self, agent: AgentID) -> Space:
+        """Batched observation space of agent."""
+        return self._batched_observation_spaces[agent]
+
+    def action_space(self, agent: AgentID) -> Space:
+        """Batched action space of agent."""
+        return self._batched_action_spaces[agent]
+
+    def single_observation_space(self, agent: AgentID) -> Space:
+        """Observation space of agent in a single sub-environment."""
+        return self._observation_spaces[agent]
+
+    def single_action_space(self, agent: AgentID) -> Space:
+        """Action space of agent in a single sub-environment."""
+        return self._action_spaces[agent]
+
+    def reset(
+        self,
+        seed: int | Sequence[int | None] | None = None,
+        options: dict | None = None,
+    ) -> tuple[dict[AgentID, Any], list[dict[AgentID, dict]]]:
+        """Resets every sub-environment.
+
+        Args:
+            seed (int | Sequence[int | None] | None): sub-environment `i` is reset with `seed + i`, or with `seed[i]` for a sequence
+            options (dict | None): options passed to every sub-environment
+
+        Returns:
+            tuple[dict[AgentID, Any], list[dict[AgentID, dict]]]: the stacked observations and the infos of each sub-environment
+        """
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            assert len(seeds) == self.num_envs, "Expected one seed per environment."
+
+        if self._envs is not None:
+            results = [
+                (*env.reset(seed=s, options=options), list(env.agents))
+                for env, s in zip(self._envs, seeds)
+            ]
+        else:
+            results = self._call_workers(
+                "reset", [{"seed": s, "options": options} for s in seeds]
+            )
+
+        self._update_agent_mask([agents for *_, agents in results])
+        observations = [obs for obs, *_ in results]
+        infos = [info for _, info, _ in results]
+        return self._stack_observations(observations), infos
+
+    def step(
+        self, actions: dict[AgentID, Any]
+    ) -> tuple[
+        dict[AgentID, Any],
+        dict[AgentID, np.ndarray],
+        dict[AgentID, np.ndarray],
+        dict[AgentID, np.ndarray],
+        list[dict[AgentID, dict]],
+    ]:
+        """Steps every sub-environment, resetting the ones whose episode ended.
+
+        Args:
+            actions (dict[AgentID, Any]): per-agent batch of `num_envs` actions
+
+        Returns:
+            tuple[
+                dict[AgentID, Any],
+                dict[AgentID, np.ndarray],
+                dict[AgentID, np.ndarray],
+                dict[AgentID, np.ndarray],
+                list[dict[AgentID, dict]],
+            ]: stacked observations, rewards, terminations, truncations and the infos of each sub-environment
+        """
+        env_actions = [
+            {
+                agent: agent_actions[i]
+                for agent, agent_actions in actions.items()
+                if self.agent_mask[agent][i]
+            }
+            for i in range(self.num_envs)
+        ]
+
+        if self._envs is not None:
+            results = [
+                _step_or_reset(env, env_actions[i]) for i, env in enumerate(self._envs)
+            ]
+        else:
+            results = self._call_workers("step", env_actions)
+
+        rewards = {
+            agent: np.zeros(self.num_envs, dtype=np.float64)
+            for agent in self.possible_agents
+        }
+        terminations = {
+            agent: np.zeros(self.num_envs, dtype=bool) for agent in self.possible_agents
+        }
+        truncations = {
+            agent: np.zeros(self.num_envs, dtype=bool) for agent in self.possible_agents
+        }
+        infos = []
+        for i, (_, rew, term, trunc, info, _) in enumerate(results):
+            for agent, value in rew.items():
+                rewards[agent][i] = value
+            for agent, value in term.items():
+                terminations[agent][i] = value
+            for agent, value in trunc.items():
+                truncations[agent][i] = value
+            infos.append(info)
+
+        self._update_agent_mask([agents for *_, agents in results])
+        observations = self._stack_observations([obs for obs, *_ in results])
+        return observations, rewards, terminations, truncations, infos
+
+    def _update_agent_mask(self, live_agents: list[list[AgentID]]) -> None:
+        for agent in self.possible_agents:
+            self.agent_mask[agent][:] = [agent in agents for agents in live_agents]
+
+    def _stack_observations(
+        self, observations: list[dict[AgentID, ObsType] | list[AgentID]]
+    ) -> dict[AgentID, Any]:
+        """The per-agent observation batches.
+
+        In shared memory the workers already wrote the observations and only report
+        which agents they hold.
+        """
+        if self._shared_obs is not None:
+            batches = self._shared_obs
+        else:
+            batches = {}
+            for agent in self.possible_agents:
+                space = self._observation_spaces[agent]
+                empty = None
+                items = []
+                for obs in observations:
+                    if agent in obs:
+                        items.append(obs[agent])
+                    else:
+                        if empty is None:
+                            empty = _empty_observation(space)
+                        items.append(empty)
+                batches[agent] = concatenate(space, items, self._obs_buffers[agent])
+        return deepcopy(batches) if self.copy else batches
+
+    def _start_workers(
+        self,
+        env_fns: Sequence[Callable[[], ParallelEnv]],
+        shared_memory: bool,
+        context: str | None,
+    ) -> None:
+        ctx = mp.get_context(context)
+        if shared_memory:
+            memory = {
+                agent: create_shared_memory(space, n=self.num_envs, ctx=ctx)
+                for agent, space in self._observation_spaces.items()
+            }
+            self._shared_obs = {
+                agent: read_from_shared_memory(
+                    self._observation_spaces[agent], memory[agent], n=self.num_envs
+                )
+                for agent in self.possible_agents
+            }
+        else:
+            memory = None
+            self._shared_obs = None
+            self._obs_buffers = {
+                agent: create_empty_array(space, self.num_envs)
+                for agent, space in self._observation_spaces.items()
+            }
+
+        self._pipes, self._processes = [], []
+        for index, env_fn in enumerate(env_fns):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_async_worker,
+                name=f"ParallelVecEnvWorker-{index}",
+                args=(
+                    index,
+                    CloudpickleWrapper(env_fn),
+                    child_pipe,
+                    parent_pipe,
+                    memory,
+                    self._observation_spaces,
+                ),
+                daemon=True,
+            )
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+            process.start()
+            child_pipe.close()
+
+    def _call_workers(self, command: str, data: list[Any]) -> list[Any]:
+        for pipe, item in zip(self._pipes, data):
+            pipe.send((command, item))
+        results, errors = [], []
+        for index, pipe in enumerate(self._pipes):
+            result, success = pipe.recv()
+            if success:
+                results.append(result)
+            else:
+                errors.append((index, result))
+        if errors:
+            index, (error, remote_traceback) = errors[0]
+            self.close()
+            raise RuntimeError(
+                f"Sub-environment {index} raised {type(error).__name__}:\n{remote_traceback}"
+            ) from error
+        return results
+
+    def close(self) -> None:
+        """Closes every sub-environment and joins the worker processes."""
+        if self.closed:
+            return
+        if self._envs is not None:
+            for env in self._envs:
+                env.close()
+        else:
+            for pipe, process in zip(self._pipes, self._processes):
+                if process.is_alive():
+                    try:
+                        pipe.send(("close", None))
+                        pipe.recv()
+                    except (OSError, EOFError):
+                        pass
+                pipe.close()
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+
+def _async_worker(
+    index: int,
+    env_fn: CloudpickleWrapper,
+    pipe,
+    parent_pipe,
+    shared_memory: dict[AgentID, Any] | None,
+    observation_spaces: dict[AgentID, Space],
+) -> None:
+    env = env_fn()
+    parent_pipe.close()
+    empty = {}
+
+    def send_observations(
+        obs: dict[AgentID, ObsType]
+    ) -> dict[AgentID, ObsType] | list[AgentID]:
+        if shared_memory is None:
+            return obs
+        for agent, space in observation_spaces.items():
+            if agent in obs:
+                value = obs[agent]
+            else:
+                if agent not in empty:
+                    empty[agent] = _empty_observation(space)
+                value = empty[agent]
+            write_to_shared_memory(space, index, value, shared_memory[agent])
+        return list(obs)
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                obs, infos = env.reset(**data)
+                pipe.send(((send_observations(obs), infos, list(env.agents)), True))
+            elif command == "step":
+                obs, *rest = _step_or_reset(env, data)
+                pipe.send(((send_observations(obs), *rest), True))
+            elif command == "close":
+                pipe.send((None, True))
+                break
+            else:
+                raise RuntimeError(f"Unknown command {command!r}.")
+    except (KeyboardInterrupt, Exception) as error:
+        pipe.send(((error, traceback.format_exc()), False))
+    finally:
+        env.close()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+from pettingzoo.test.api_runner import main, run_api_tests
+
+CUSTOM_ENV = """
+from runner_test_helpers import make_env
+
+from pettingzoo.classic.rps_v2 import parallel_env, raw_env
+
+
+def env(**kwargs):
+    return make_env(**kwargs)
+"""
+
+HELPERS = """
+from pettingzoo.classic.rps_v2 import env
+
+
+def make_env(**kwargs):
+    return env(**kwargs)
+"""
+
+
+@pytest.fixture
+def custom_env(tmp_path, monkeypatch):
+    (tmp_path / "runner_test_env_v0.py").write_text(CUSTOM_ENV)
+    (tmp_path / "runner_test_helpers.py").write_text(HELPERS)
+    # for the spawned workers as well as for this process
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(sys.path))
+    return tmp_path
+
+
+def statuses(results):
+    return {r["test"]: r["status"] for r in results}
+
+
+def test_runner_caches_passes(custom_env):
+    cache = custom_env / "cache.json"
+    kwargs = dict(cycles=10, workers=2, cache_path=str(cache))
+    lines = []
+    results = run_api_tests(["runner_test_env_v0"], report=lines.append, **kwargs)
+    assert statuses(results) == {
+        "api": "passed",
+        "seed": "passed",
+        "parallel_api": "passed",
+        "parallel_seed": "passed",
+        "max_cycles": "passed",
+    }
+
+    results = run_api_tests(["runner_test_env_v0"], report=lines.append, **kwargs)
+    assert set(statuses(results).values()) == {"cached"}
+
+    # a change to an imported module of the environment invalidates its passes
+    (custom_env / "runner_test_helpers.py").write_text(HELPERS + "\n# changed\n")
+    results = run_api_tests(
+        ["runner_test_env_v0"], ["api", "seed"], report=lines.append, **kwargs
+    )
+    assert statuses(results) == {"api": "passed", "seed": "passed"}
+
+    # so does running the tests for another number of cycles
+    kwargs["cycles"] = 20
+    results = run_api_tests(
+        ["runner_test_env_v0"], ["max_cycles"], report=lines.append, **kwargs
+    )
+    assert statuses(results) == {"max_cycles": "passed"}
+
+
+def test_runner_does_not_cache_fast_passes(custom_env):
+    cache = custom_env / "cache.json"
+    kwargs = dict(fast=True, probes=2, cycles=10, workers=2, cache_path=str(cache))
+    lines = []
+    for _ in range(2):
+        results = run_api_tests(
+            ["runner_test_env_v0"], ["api", "seed"], report=lines.append, **kwargs
+        )
+        assert statuses(results) == {"api": "passed", "seed": "passed"}
+        assert all(len(r["seeds"]) == 2 for r in results)
+    assert lines[0].startswith("fast mode, 2 probes of 10 cycles, seed ")
+    assert not cache.exists()
+
+
+def test_runner_reports_failures(custom_env):
+    # a parallel environment where an AEC one is expected
+    (custom_env / "runner_test_broken_v0.py").write_text(
+        "from pettingzoo.classic.rps_v2 import parallel_env as env\n"
+    )
+    args = ["runner_test_broken_v0", "classic/tictactoe_v3", "--tests", "api"]
+    args += ["parallel_api", "--fast", "--seed", "3", "--cycles", "10"]
+    args += ["--cache", str(custom_env / "cache.json")]
+    assert main(args) == 1
+
+    results = run_api_tests(
+        ["runner_test_broken_v0", "pettingzoo.classic.tictactoe_v3"],
+        ["api", "parallel_api"],
+        fast=True,
+        cycles=10,
+        seed=3,
+        cache_path=str(custom_env / "cache.json"),
+        report=lambda line: None,
+    )
+    by_job = {(r["module"], r["test"]): r for r in results}
+    failure = by_job["runner_test_broken_v0", "api"]
+    assert failure["status"] == "failed"
+    assert "Env must be an instance of pettingzoo.AECEnv" in failure["traceback"]
+    assert failure["seed"] is not None
+    assert by_job["runner_test_broken_v0", "parallel_api"]["status"] == "skipped"
+    assert by_job["pettingzoo.classic.tictactoe_v3", "api"]["status"] == "passed"
+
+
+def test_runner_blames_only_the_crashed_job(custom_env):
+    (custom_env / "runner_test_crash_v0.py").write_text(
+        "import os\n\n\ndef env(**kwargs):\n    os._exit(3)\n"
+    )
+    results = run_api_tests(
+        ["runner_test_crash_v0", "runner_test_env_v0"],
+        ["api", "seed"],
+        cycles=10,
+        workers=2,
+        report=lambda line: None,
+    )
+    by_job = {(r["module"], r["test"]): r["status"] for r in results}
+    assert by_job == {
+        ("runner_test_crash_v0", "api"): "error",
+        ("runner_test_crash_v0", "seed"): "error",
+        ("runner_test_env_v0", "api"): "passed",
+        ("runner_test_env_v0", "seed"): "passed",
+    }
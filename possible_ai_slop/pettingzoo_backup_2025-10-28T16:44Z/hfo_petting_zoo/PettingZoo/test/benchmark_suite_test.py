@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import copy
+import json
+
+from pettingzoo.test.benchmark_suite import (
+    benchmark_configs,
+    compare_to_baseline,
+    environment_names,
+    main,
+    run_benchmark_suite,
+)
+
+FAST = dict(trials=2, seconds=0.05, warmup_steps=5, reset_trials=2, alloc_steps=10)
+
+
+def test_environment_discovery():
+    names = environment_names()
+    assert names["classic/go_v5"] == "pettingzoo.classic.go_v5"
+    assert names["mpe2/simple_tag_v3"] == "mpe2.simple_tag_v3"
+    assert all(not name.endswith("_base") for name in names)
+
+
+def test_benchmark_suite_runs_and_skips():
+    configs = benchmark_configs(
+        ["classic/connect_four_v3", "mpe/simple_tag_v3"], agent_counts=True
+    )
+    # connect_four has no parallel API, simple_tag also runs with more agents
+    assert len(configs) == 2 * 1 + 2 * 2
+    results = run_benchmark_suite(configs, isolate=False, verbose=False, **FAST)
+    by_config = {(r["env"], r["api"], bool(r["kwargs"])): r for r in results["results"]}
+
+    skipped = by_config["classic/connect_four_v3", "parallel", False]
+    assert skipped["status"] == "skipped"
+    for key in [
+        ("classic/connect_four_v3", "aec", False),
+        ("mpe/simple_tag_v3", "parallel", False),
+        ("mpe/simple_tag_v3", "parallel", True),
+    ]:
+        result = by_config[key]
+        assert result["status"] == "ok", result
+        assert result["steps_per_s"]["mean"] > 0
+        assert len(result["reset_ms"]["trials"]) == 2
+    more_agents = by_config["mpe/simple_tag_v3", "parallel", True]
+    assert (
+        more_agents["agent_steps_per_s"]["mean"]
+        == 16 * more_agents["steps_per_s"]["mean"]
+    )
+    json.dumps(results)
+
+
+def test_compare_to_baseline():
+    def result(steps_per_s, std=1.0, **config):
+        config = {
+            "env": "classic/go_v5",
+            "api": "aec",
+            "kwargs": {},
+            "render_mode": None,
+            **config,
+        }
+        steps = {"mean": steps_per_s, "std": std}
+        return {**config, "status": "ok", "steps_per_s": steps}
+
+    baseline = {
+        "results": [
+            result(1000),
+            result(500, api="parallel"),
+            result(100, kwargs={"size": 9}),
+        ]
+    }
+    current = copy.deepcopy(baseline)
+    assert compare_to_baseline(current, baseline, threshold=0.1) == []
+
+    current["results"][0]["steps_per_s"]["mean"] = 850
+    # within the threshold
+    current["results"][1]["steps_per_s"]["mean"] = 480
+    # beyond the threshold but within the noise of the trials
+    current["results"][2]["steps_per_s"].update(mean=80, std=30)
+    regressions = compare_to_baseline(current, baseline, threshold=0.1)
+    assert [(r["api"], round(r["change"], 2)) for r in regressions] == [("aec", -0.15)]
+    assert compare_to_baseline(current, baseline, threshold=0.2) == []
+
+
+def test_main_exits_on_regression(tmp_path):
+    args = ["--envs", "classic/rps_v2", "--api", "aec", "--trials", "1"]
+    args += ["--seconds", "0.05", "--no-isolate"]
+    out = tmp_path / "results.json"
+    assert main(args + ["--out", str(out)]) == 0
+
+    baseline = json.loads(out.read_text())
+    baseline["results"][0]["steps_per_s"]["mean"] *= 100
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(baseline))
+    assert main(args + ["--baseline", str(baseline_path)]) == 1
+
+
+def test_isolated_failures_are_reported(tmp_path, monkeypatch):
+    (tmp_path / "benchmark_crash_env_v0.py").write_text(
+        "import os\n\n\ndef env(**kwargs):\n    os._exit(3)\n"
+    )
+    # spawned processes start with the sys.path of this one
+    monkeypatch.syspath_prepend(str(tmp_path))
+    config = {"api": "aec", "kwargs": {}, "render_mode": None}
+    configs = [
+        dict(config, env="sisl/pursuit_v4", module="pettingzoo.sisl.pursuit_v4"),
+        dict(config, env="crash", module="benchmark_crash_env_v0"),
+    ]
+    configs[0]["kwargs"] = {"bogus_kwarg": 1}
+    results = run_benchmark_suite(configs, verbose=False, **FAST)["results"]
+
+    assert [r["status"] for r in results] == ["error", "error"]
+    assert "bogus_kwarg" in results[0]["reason"]
+    assert results[1]["reason"] == "benchmark process exited with code 3"
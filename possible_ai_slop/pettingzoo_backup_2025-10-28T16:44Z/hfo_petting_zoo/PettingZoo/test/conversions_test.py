@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pettingzoo.butterfly import knights_archers_zombies_v10
+from pettingzoo.classic import rps_v2
+from pettingzoo.mpe import simple_tag_v3
+from pettingzoo.sisl import pursuit_v4
+from pettingzoo.test import parallel_api_test
+from pettingzoo.utils.conversions import aec_to_parallel, aec_to_parallel_wrapper
+
+
+def check_buffer(env, obs):
+    for i, agent in enumerate(env.possible_agents):
+        if agent in obs:
+            assert obs[agent].shape == env.observation_space(agent).shape
+            assert np.shares_memory(obs[agent], env.observation_buffer[i])
+        else:
+            assert not env.observation_buffer[i].any()
+
+
+def rollout(env, steps, check=lambda env, obs: None):
+    """Copies of everything the environment returns, over steps with random actions."""
+    rng = np.random.default_rng(0)
+    obs, infos = env.reset(seed=0)
+    history = [({a: np.array(o) for a, o in obs.items()}, dict(infos))]
+    for _ in range(steps):
+        if not env.agents:
+            obs, infos = env.reset()
+            history.append(({a: np.array(o) for a, o in obs.items()}, dict(infos)))
+            continue
+        actions = {a: rng.integers(env.action_space(a).n) for a in env.agents}
+        obs, rewards, terminations, truncations, infos = env.step(actions)
+        check(env, obs)
+        obs = {a: np.array(o) for a, o in obs.items()}
+        history.append((obs, dict(rewards), terminations.copy(), truncations.copy()))
+    return history
+
+
+@pytest.mark.parametrize(
+    "env_fn",
+    [
+        # observation shapes differing between agents
+        lambda: simple_tag_v3.raw_env(max_cycles=20),
+        lambda: pursuit_v4.raw_env(max_cycles=20),
+        # agents dying one at a time
+        lambda: knights_archers_zombies_v10.raw_env(
+            vector_state=True, num_archers=2, num_knights=2, line_death=True
+        ),
+    ],
+)
+def test_zero_copy_matches_copies(env_fn):
+    history = rollout(aec_to_parallel_wrapper(env_fn()), 400)
+    env = aec_to_parallel(env_fn(), zero_copy=True)
+    zero_copy_history = rollout(env, 400, check_buffer)
+
+    for expected, actual in zip(history, zero_copy_history):
+        assert expected[0].keys() == actual[0].keys()
+        for agent in expected[0]:
+            np.testing.assert_array_equal(expected[0][agent], actual[0][agent])
+        assert expected[1:] == actual[1:]
+
+
+def test_zero_copy_reuses_results():
+    env = aec_to_parallel_wrapper(simple_tag_v3.raw_env(), zero_copy=True)
+    obs, infos = env.reset(seed=0)
+    results = env.step({agent: 1 for agent in env.agents})
+    first = [np.array(o) for o in results[0].values()]
+    next_results = env.step({agent: 1 for agent in env.agents})
+    assert all(a is b for a, b in zip(results, next_results))
+    assert next_results[0] is obs
+    # the previous observations were overwritten in place
+    assert not all(np.array_equal(a, b) for a, b in zip(first, obs.values()))
+    # padded rows, as simple_tag's good agents see fewer entities
+    assert env.observation_buffer.shape == (len(env.possible_agents), 16)
+
+    parallel_api_test(aec_to_parallel_wrapper(simple_tag_v3.raw_env(), zero_copy=True))
+
+
+def test_zero_copy_needs_array_observations():
+    with pytest.raises(AssertionError, match="zero_copy"):
+        aec_to_parallel_wrapper(rps_v2.raw_env(), zero_copy=True)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from gymnasium.spaces import Box, Discrete
+
+from pettingzoo.mpe import simple_tag_v3
+from pettingzoo.utils import ParallelEnv, ParallelVecEnv
+
+
+class CountdownEnv(ParallelEnv):
+    """Two agents; `early` leaves after two steps and the episode ends after `length`."""
+
+    metadata = {"name": "countdown_v0"}
+
+    def __init__(self, length: int = 4):
+        self.length = length
+        self.possible_agents = ["early", "late"]
+
+    def observation_space(self, agent):
+        return Box(low=0, high=100, shape=(2,), dtype=np.float32)
+
+    def action_space(self, agent):
+        return Discrete(3)
+
+    def _obs(self):
+        return {
+            agent: np.array([self.t, self.offset + i], dtype=np.float32)
+            for i, agent in enumerate(self.agents)
+        }
+
+    def reset(self, seed=None, options=None):
+        self.agents = self.possible_agents[:]
+        self.offset = 0 if seed is None else seed
+        self.t = 0
+        return self._obs(), {agent: {} for agent in self.agents}
+
+    def step(self, actions):
+        assert set(actions) == set(self.agents)
+        self.t += 1
+        rewards = {agent: float(actions[agent]) for agent in self.agents}
+        terminations = {
+            agent: (agent == "early" and self.t == 2) or self.t == self.length
+            for agent in self.agents
+        }
+        truncations = {agent: False for agent in self.agents}
+        infos = {agent: {"t": self.t} for agent in self.agents}
+        obs = self._obs()
+        self.agents = [a for a in self.agents if not terminations[a]]
+        return obs, rewards, terminations, truncations, infos
+
+
+def run_reference(env_fns, seed, actions_per_step):
+    """Step the sub-environments one by one, resetting them when they run out of agents."""
+    envs = [fn() for fn in env_fns]
+    obs = [env.reset(seed=seed + i)[0] for i, env in enumerate(envs)]
+    history = [obs]
+    for actions in actions_per_step:
+        step_obs = []
+        for i, env in enumerate(envs):
+            o, r, t, tr, _ = env.step({a: actions[a][i] for a in env.agents})
+            if not env.agents:
+                o, _ = env.reset()
+            step_obs.append((o, r, t))
+        history.append(step_obs)
+    return history
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"asynchronous": False},
+        {"asynchronous": True},
+        {"asynchronous": True, "shared_memory": False},
+    ],
+)
+def test_vec_env_matches_individual_envs(kwargs):
+    env_fns = [lambda: simple_tag_v3.parallel_env(max_cycles=5)] * 3
+    rng = np.random.default_rng(0)
+    envs = ParallelVecEnv(env_fns, **kwargs)
+    agents = envs.possible_agents
+    actions_per_step = [
+        {agent: rng.integers(0, 5, size=3) for agent in agents} for _ in range(12)
+    ]
+    reference = run_reference(env_fns, 7, actions_per_step)
+
+    obs, infos = envs.reset(seed=7)
+    assert len(infos) == 3
+    for agent in agents:
+        assert obs[agent].shape == envs.observation_space(agent).shape
+        for i in range(3):
+            np.testing.assert_array_equal(obs[agent][i], reference[0][i][agent])
+
+    for step, actions in enumerate(actions_per_step):
+        obs, rewards, terms, truncs, infos = envs.step(actions)
+        for i, (ref_obs, ref_rew, ref_term) in enumerate(reference[step + 1]):
+            for agent in agents:
+                np.testing.assert_array_equal(obs[agent][i], ref_obs[agent])
+                assert rewards[agent][i] == ref_rew[agent]
+                assert terms[agent][i] == ref_term[agent]
+        # every episode is 5 steps long, so all sub-environments reset together
+        if (step + 1) % 5 == 0:
+            assert all(truncs[agent].all() for agent in agents)
+            assert all("final_observation" in infos[i][agent] for i in range(3))
+    envs.close()
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_vec_env_agent_mask_and_auto_reset(asynchronous):
+    envs = ParallelVecEnv([CountdownEnv, lambda: CountdownEnv(3)], asynchronous)
+    obs, _ = envs.reset(seed=10)
+    np.testing.assert_array_equal(obs["late"], [[0, 11], [0, 12]])
+    ones = {agent: np.ones(2, dtype=np.int64) for agent in envs.possible_agents}
+
+    obs, rewards, terms, _, _ = envs.step(ones)
+    obs, rewards, terms, _, _ = envs.step(ones)
+    # "early" terminated on this step and is gone from both sub-environments
+    assert terms["early"].all() and not envs.agent_mask["early"].any()
+    np.testing.assert_array_equal(obs["early"], [[2, 10], [2, 11]])
+
+    obs, rewards, terms, _, infos = envs.step(ones)
+    assert rewards["early"].tolist() == [0.0, 0.0]
+    assert rewards["late"].tolist() == [1.0, 1.0]
+    # the second sub-environment ended and was reset, its "early" agent is back
+    assert envs.agent_mask["early"].tolist() == [False, True]
+    np.testing.assert_array_equal(obs["early"], [[0, 0], [0, 0]])
+    np.testing.assert_array_equal(obs["late"], [[3, 10], [0, 1]])
+    np.testing.assert_array_equal(
+        infos[1]["late"]["final_observation"], np.array([3, 11], dtype=np.float32)
+    )
+    envs.close()
+
+
+def test_vec_env_reports_worker_errors():
+    envs = ParallelVecEnv([CountdownEnv] * 2, asynchronous=True)
+    envs.reset()
+    with pytest.raises(RuntimeError, match="KeyError"):
+        envs.step({"early": [0, 0]})
+    assert envs.closed
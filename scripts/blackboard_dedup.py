@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Streaming content-hash deduplication for blackboard receipts.
+
+Each receipt is canonicalized (keys sorted, compact separators, `timestamp` and
+`duplicate_of` removed, plus optional field masks such as `agent` or
+`safety_envelope.tripwire_status`) and hashed with xxh3-128. A fixed-size Bloom
+filter answers "definitely new" in memory; only "maybe seen" hashes hit the exact
+on-disk index (SQLite, one row per hash), so memory stays bounded however long
+the blackboard grows and the answer is never a false positive.
+
+Write time: JsonlWriter applies Deduper to files in hfo_blackboard/ when
+BLACKBOARD_DEDUP is set:
+  BLACKBOARD_DEDUP       off (default) | mark (add "duplicate_of": <hash>) | drop
+  BLACKBOARD_DEDUP_MASK  extra comma-separated (dotted) fields to ignore
+The index lives next to the file (X.jsonl.dedup.sqlite). Duplicates are exact
+within a process and across runs; two processes racing on the same new receipt
+may both keep it, which the offline pass below removes.
+
+Offline: one pass over sealed segments + active file into a new JSONL (or .zst),
+constant memory, originals untouched:
+  python scripts/blackboard_dedup.py dedup --out temp/blackboard_dedup.jsonl
+  python scripts/blackboard_dedup.py dedup --path hfo_blackboard/deduplicated_blackboard_backup_20251027.jsonl \
+      --mask agent --mode mark --out temp/backup_marked.jsonl.zst
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import xxhash
+import zstandard
+
+from blackboard_segments import BLACKBOARD_JSONL, iter_lines
+
+ALWAYS_EXCLUDED = ("timestamp", "duplicate_of")
+MODES = ("off", "mark", "drop")
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_FP_RATE = 0.01
+PENDING_MAX = 1024
+
+
+def _mask(obj: Any, path: Tuple[str, ...]) -> Any:
+    if not isinstance(obj, dict) or not path:
+        return obj
+    head, rest = path[0], path[1:]
+    if head not in obj:
+        return obj
+    out = dict(obj)
+    if rest:
+        out[head] = _mask(obj[head], rest)
+    else:
+        del out[head]
+    return out
+
+
+def canonicalize(obj: Any, masks: Iterable[str] = ()) -> bytes:
+    """Canonical bytes of a receipt: excluded/masked fields removed, keys sorted."""
+    if isinstance(obj, dict):
+        obj = {k: v for k, v in obj.items() if k not in ALWAYS_EXCLUDED}
+        for m in masks:
+            obj = _mask(obj, tuple(m.split(".")))
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def receipt_hash(obj: Any, masks: Iterable[str] = ()) -> bytes:
+    """16-byte xxh3-128 digest of the canonical receipt."""
+    return xxhash.xxh3_128_digest(canonicalize(obj, masks))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 128-bit digests (double hashing from two 64-bit halves)."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, fp_rate: float = DEFAULT_FP_RATE) -> None:
+        capacity = max(1, int(capacity))
+        self.nbits = max(64, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.nbits / capacity * math.log(2)))
+        self._bits = bytearray((self.nbits + 7) // 8)
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.nbits for i in range(self.k))
+
+    def add(self, digest: bytes) -> None:
+        for p in self._positions(digest):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+
+class Deduper:
+    """Bloom filter in front of an exact SQLite hash index; thread-safe."""
+
+    def __init__(
+        self,
+        index_path: Union[Path, str],
+        *,
+        masks: Iterable[str] = (),
+        capacity: int = DEFAULT_CAPACITY,
+        fp_rate: float = DEFAULT_FP_RATE,
+    ) -> None:
+        self.index_path = Path(index_path)
+        self.masks = tuple(m for m in masks if m)
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.seen = 0
+        self.duplicates = 0
+        self.index_lookups = 0
+        self._pending: Dict[bytes, str] = {}
+        self._lock = threading.Lock()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.index_path), timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS receipt_hashes (hash BLOB PRIMARY KEY, first_seen TEXT) WITHOUT ROWID")
+        for (h,) in self._db.execute("SELECT hash FROM receipt_hashes"):
+            self.bloom.add(bytes(h))
+
+    def check(self, obj: Any) -> Tuple[bool, str]:
+        """Record ``obj``; returns (is_duplicate, hash_hex)."""
+        digest = receipt_hash(obj, self.masks)
+        with self._lock:
+            self.seen += 1
+            dup = False
+            if digest in self._pending:
+                dup = True
+            elif digest in self.bloom:
+                self.index_lookups += 1
+                dup = self._db.execute("SELECT 1 FROM receipt_hashes WHERE hash = ?", (digest,)).fetchone() is not None
+            if dup:
+                self.duplicates += 1
+            else:
+                self.bloom.add(digest)
+                self._pending[digest] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                if len(self._pending) >= PENDING_MAX:
+                    self._commit()
+        return dup, digest.hex()
+
+    def _commit(self) -> None:
+        if not self._pending:
+            return
+        rows = list(self._pending.items())
+        self._pending.clear()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("INSERT OR IGNORE INTO receipt_hashes VALUES (?, ?)", rows)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seen": self.seen,
+            "duplicates": self.duplicates,
+            "index_lookups": self.index_lookups,
+            "bloom_bits": self.bloom.nbits,
+            "bloom_k": self.bloom.k,
+        }
+
+
+def index_path_for(path: Union[Path, str]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".dedup.sqlite")
+
+
+def _env_masks() -> Tuple[str, ...]:
+    return tuple(m.strip() for m in os.environ.get("BLACKBOARD_DEDUP_MASK", "").split(",") if m.strip())
+
+
+def default_deduper(path: Union[Path, str]) -> Tuple[Optional[Deduper], str]:
+    """(Deduper, mode) for blackboard files when BLACKBOARD_DEDUP is mark/drop, else (None, "off")."""
+    mode = os.environ.get("BLACKBOARD_DEDUP", "off").strip().lower()
+    if mode not in MODES or mode == "off" or Path(path).parent.name != "hfo_blackboard":
+        return None, "off"
+    return Deduper(index_path_for(path), masks=_env_masks()), mode
+
+
+def dedup_stream(
+    path: Union[Path, str],
+    out: Union[Path, str],
+    *,
+    mode: str = "drop",
+    masks: Iterable[str] = (),
+    capacity: int = DEFAULT_CAPACITY,
+    index_path: Optional[Union[Path, str]] = None,
+) -> Dict[str, Any]:
+    """One pass over sealed segments + active file, writing unique (or marked) lines to ``out``.
+
+    Lines that are not valid JSON are passed through unchanged.
+    """
+    if mode not in ("mark", "drop"):
+        raise ValueError("mode must be 'mark' or 'drop'")
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmpdir = None
+    if index_path is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="bb_dedup_")
+        index_path = Path(tmpdir.name) / "index.sqlite"
+    dd = Deduper(index_path, masks=masks, capacity=capacity)
+    lines = invalid = 0
+    raw = out.open("wb")
+    sink = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False) if out.name.endswith(".zst") else raw
+    try:
+        for _, _, line in iter_lines(path):
+            if not line.strip():
+                continue
+            lines += 1
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                invalid += 1
+                sink.write(line)
+                continue
+            dup, h = dd.check(obj)
+            if not dup:
+                sink.write(line)
+            elif mode == "mark" and isinstance(obj, dict):
+                obj["duplicate_of"] = h
+                sink.write(json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n")
+            elif mode == "mark":
+                sink.write(line)
+    finally:
+        if sink is not raw:
+            sink.close()
+        raw.close()
+        stats = dd.stats()
+        dd.close()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    stats.update({"lines": lines, "invalid": invalid, "written_to": str(out), "mode": mode})
+    return stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Blackboard receipt deduplication")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dedup", help="Offline one-pass dedup across segments into a new file")
+    d.add_argument("--path", type=str, default=str(BLACKBOARD_JSONL))
+    d.add_argument("--out", type=str, required=True, help="Output .jsonl or .jsonl.zst")
+    d.add_argument("--mode", type=str, default="drop", choices=["drop", "mark"])
+    d.add_argument("--mask", type=str, default="", help="Comma-separated (dotted) fields to ignore")
+    d.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Bloom filter capacity (bounds memory)")
+    d.add_argument("--index", type=str, default="", help="Persist the exact hash index here (default: temp)")
+    args = ap.parse_args()
+
+    masks = [m.strip() for m in args.mask.split(",") if m.strip()]
+    t0 = time.perf_counter()
+    stats = dedup_stream(
+        args.path,
+        args.out,
+        mode=args.mode,
+        masks=masks,
+        capacity=args.capacity,
+        index_path=args.index or None,
+    )
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
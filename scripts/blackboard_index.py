@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+DuckDB index over the append-only blackboard JSONL, ingested incrementally.
+
+The JSONL files stay the source of truth. This tails each file by byte offset into
+a typed `receipts` table (receipt fields per AGENTS.md: mission_id, phase, summary,
+evidence_refs, safety_envelope, blocked_capabilities, timestamp, ...) with indexes on
+mission_id, phase and timestamp, and records the last complete-line offset per file
+in `ingest_offsets` so the next run resumes where the previous one stopped.
+
+Only newline-terminated lines are ingested; a partially written tail line is left
+for the next run. Lines that are not JSON objects are kept with valid=false so the
+index row count always matches the file.
+
+Sealed segments (blackboard_segments.py) are ingested as their own sources. When the
+active file was rotated since the last run, rows already ingested from it are
+re-keyed to the segment it became and only the segment's remainder is read.
+
+Usage:
+  # ingest (default: the live blackboard); safe to re-run, only new bytes are read
+  python scripts/blackboard_index.py ingest
+  python scripts/blackboard_index.py ingest hfo_blackboard/deduplicated_blackboard_backup_20251027.jsonl
+
+  # all receipts for a mission, oldest first
+  python scripts/blackboard_index.py query --mission arc_challenge_swarm_1761896137841
+
+  # a file was replaced rather than appended to: drop its rows and re-ingest from 0
+  python scripts/blackboard_index.py ingest --rebuild
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import duckdb
+
+from blackboard_segments import load_manifest, open_lines, segment_paths, segments_dir
+
+ROOT = Path(__file__).resolve().parents[1]
+BLACKBOARD_JSONL = ROOT / "hfo_blackboard/obsidian_synapse_blackboard.jsonl"
+INDEX_DB = ROOT / "hfo_blackboard/blackboard_index.duckdb"
+
+# Fingerprint of the first bytes of a file; detects replacement (vs append) between runs
+HEAD_BYTES = 4096
+INSERT_BATCH = 2000
+VALUES_PER_INSERT = 200
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS receipts (
+        source TEXT NOT NULL,
+        byte_offset BIGINT NOT NULL,
+        line_no BIGINT NOT NULL,
+        valid BOOLEAN NOT NULL,
+        mission_id TEXT,
+        phase TEXT,
+        summary TEXT,
+        timestamp TIMESTAMP,
+        evidence_refs TEXT[],
+        safety_envelope JSON,
+        blocked_capabilities TEXT[],
+        regen_flag BOOLEAN,
+        raw TEXT,
+        PRIMARY KEY (source, byte_offset)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS receipts_mission_idx ON receipts (mission_id)",
+    "CREATE INDEX IF NOT EXISTS receipts_phase_idx ON receipts (phase)",
+    "CREATE INDEX IF NOT EXISTS receipts_timestamp_idx ON receipts (timestamp)",
+    """
+    CREATE TABLE IF NOT EXISTS ingest_offsets (
+        source TEXT PRIMARY KEY,
+        byte_offset BIGINT NOT NULL,
+        line_no BIGINT NOT NULL,
+        head_sha256 TEXT,
+        updated_at TIMESTAMP NOT NULL
+    )
+    """,
+]
+
+COLUMNS = (
+    "source", "byte_offset", "line_no", "valid", "mission_id", "phase", "summary", "timestamp",
+    "evidence_refs", "safety_envelope", "blocked_capabilities", "regen_flag", "raw",
+)
+
+
+def connect(db_path: Union[Path, str] = INDEX_DB, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    db_path = Path(db_path)
+    if not read_only:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(db_path), read_only=read_only)
+    if not read_only:
+        for stmt in SCHEMA:
+            con.execute(stmt)
+    return con
+
+
+def _source_key(path: Path) -> str:
+    path = path.resolve()
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def _head_sha(path: Path, nbytes: int) -> str:
+    """sha256 of the first ``nbytes`` (capped at HEAD_BYTES) of a raw or .zst file."""
+    with open_lines(path) as f:
+        return hashlib.sha256(f.read(min(nbytes, HEAD_BYTES))).hexdigest()
+
+
+def _parse_ts(val: Any) -> Optional[datetime]:
+    if isinstance(val, (int, float)) and not isinstance(val, bool):
+        try:
+            return datetime.fromtimestamp(float(val), tz=timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(val, str) and val:
+        try:
+            dt = datetime.fromisoformat(val.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt
+    return None
+
+
+def _str_list(val: Any) -> Optional[List[str]]:
+    if isinstance(val, list):
+        return [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in val]
+    return None
+
+
+def _opt_str(val: Any) -> Optional[str]:
+    if val is None:
+        return None
+    return val if isinstance(val, str) else json.dumps(val, ensure_ascii=False)
+
+
+def receipt_row(source: str, offset: int, line_no: int, raw_line: bytes) -> Tuple[Any, ...]:
+    """Typed row for one JSONL line (valid=false when it is not a JSON object)."""
+    text = raw_line.decode("utf-8", errors="replace").strip()
+    try:
+        obj = json.loads(text)
+    except json.JSONDecodeError:
+        obj = None
+    if not isinstance(obj, dict):
+        raw = json.dumps({"_unparsed": text}, ensure_ascii=False) if obj is None else json.dumps(obj, ensure_ascii=False)
+        return (source, offset, line_no, False, None, None, None, None, None, None, None, None, raw)
+    env = obj.get("safety_envelope")
+    regen = obj.get("regen_flag")
+    return (
+        source,
+        offset,
+        line_no,
+        True,
+        _opt_str(obj.get("mission_id")),
+        _opt_str(obj.get("phase")),
+        _opt_str(obj.get("summary")),
+        _parse_ts(obj.get("timestamp")),
+        _str_list(obj.get("evidence_refs")),
+        json.dumps(env, ensure_ascii=False) if env is not None else None,
+        _str_list(obj.get("blocked_capabilities")),
+        regen if isinstance(regen, bool) else None,
+        json.dumps(obj, ensure_ascii=False),
+    )
+
+
+def iter_complete_lines(path: Path, start: int) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte_offset, line) for newline-terminated lines (blank ones included) from ``start``."""
+    with open_lines(path) as f:
+        if f.seekable():
+            f.seek(start)
+        else:
+            remaining = start
+            while remaining > 0:
+                skipped = len(f.read(min(remaining, 1 << 20)))
+                if not skipped:
+                    return
+                remaining -= skipped
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                return  # partial tail line; picked up next run
+            yield offset, line
+            offset += len(line)
+
+
+def ingest_file(con: duckdb.DuckDBPyConnection, path: Union[Path, str], *, rebuild: bool = False) -> Dict[str, Any]:
+    """Ingest new complete lines of ``path`` and its sealed segments.
+
+    Returns {source, rows, from_offset, to_offset} for the active file plus
+    segment_rows for lines read from sealed segments.
+    """
+    path = Path(path)
+    segments = segment_paths(path)
+    if rebuild:
+        keys = [_source_key(p) for p in segments + [path]]
+        con.execute("DELETE FROM receipts WHERE list_contains(?, source)", [keys])
+        con.execute("DELETE FROM ingest_offsets WHERE list_contains(?, source)", [keys])
+    _adopt_rotated(con, path)
+    segment_rows = sum(_ingest_source(con, seg)["rows"] for seg in segments)
+    if not path.exists():
+        return {"source": _source_key(path), "rows": 0, "from_offset": 0, "to_offset": 0, "segment_rows": segment_rows}
+    result = _ingest_source(con, path)
+    result["segment_rows"] = segment_rows
+    return result
+
+
+def _state(con: duckdb.DuckDBPyConnection, source: str) -> Optional[Tuple[int, int, Optional[str]]]:
+    row = con.execute(
+        "SELECT byte_offset, line_no, head_sha256 FROM ingest_offsets WHERE source = ?", [source]
+    ).fetchone()
+    return (int(row[0]), int(row[1]), row[2]) if row else None
+
+
+def _adopt_rotated(con: duckdb.DuckDBPyConnection, path: Path) -> None:
+    """Re-key rows of a rotated active file to the sealed segment it became."""
+    source = _source_key(path)
+    state = _state(con, source)
+    if state is None or state[0] == 0:
+        return
+    start, _, prev_head = state
+    if path.exists() and path.stat().st_size >= start and _head_sha(path, start) == prev_head:
+        return  # still the same file
+    seg_dir = segments_dir(path)
+    for seg in load_manifest(path)["segments"]:
+        seg_path = seg_dir / seg["file"]
+        seg_source = _source_key(seg_path)
+        if seg["raw_bytes"] < start or _state(con, seg_source) is not None:
+            continue
+        if _head_sha(seg_path, start) != prev_head:
+            continue
+        con.execute("BEGIN TRANSACTION")
+        try:
+            con.execute("UPDATE receipts SET source = ? WHERE source = ?", [seg_source, source])
+            con.execute("UPDATE ingest_offsets SET source = ? WHERE source = ?", [seg_source, source])
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        return
+
+
+def _ingest_source(con: duckdb.DuckDBPyConnection, path: Path) -> Dict[str, Any]:
+    source = _source_key(path)
+    state = _state(con, source)
+    start, line_no, prev_head = state if state else (0, 0, None)
+
+    if state is not None and start > 0 and not path.name.endswith(".zst"):
+        if path.stat().st_size < start or _head_sha(path, start) != prev_head:
+            raise RuntimeError(
+                f"{source}: file shrank or its head changed since offset {start}; it was replaced, not appended. "
+                "Re-run with --rebuild to re-index it from scratch."
+            )
+
+    rows: List[Tuple[Any, ...]] = []
+    inserted = 0
+    end = start
+    con.execute("BEGIN TRANSACTION")
+    try:
+        for offset, line in iter_complete_lines(path, start):
+            end = offset + len(line)
+            if not line.strip():
+                continue
+            line_no += 1
+            rows.append(receipt_row(source, offset, line_no, line))
+            if len(rows) >= INSERT_BATCH:
+                _insert(con, rows)
+                inserted += len(rows)
+                rows = []
+        if rows:
+            _insert(con, rows)
+            inserted += len(rows)
+        con.execute(
+            "INSERT OR REPLACE INTO ingest_offsets VALUES (?, ?, ?, ?, ?)",
+            [source, end, line_no, _head_sha(path, end), datetime.now(timezone.utc).replace(tzinfo=None)],
+        )
+        con.execute("COMMIT")
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    return {"source": source, "rows": inserted, "from_offset": start, "to_offset": end}
+
+
+def _insert(con: duckdb.DuckDBPyConnection, rows: List[Tuple[Any, ...]]) -> None:
+    # Multi-row VALUES is ~10x faster than executemany in DuckDB
+    row_ph = "(" + ", ".join("?" for _ in COLUMNS) + ")"
+    for i in range(0, len(rows), VALUES_PER_INSERT):
+        chunk = rows[i : i + VALUES_PER_INSERT]
+        con.execute(
+            f"INSERT INTO receipts ({', '.join(COLUMNS)}) VALUES {', '.join([row_ph] * len(chunk))}",
+            [v for row in chunk for v in row],
+        )
+
+
+def receipts_for_mission(con: duckdb.DuckDBPyConnection, mission_id: str, phase: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All indexed receipts for ``mission_id`` (optionally one phase), oldest first."""
+    sql = "SELECT source, line_no, raw FROM receipts WHERE mission_id = ?"
+    params: List[Any] = [mission_id]
+    if phase:
+        sql += " AND phase = ?"
+        params.append(phase)
+    sql += " ORDER BY timestamp NULLS LAST, source, byte_offset"
+    return [
+        {"source": src, "line_no": ln, "receipt": json.loads(raw)}
+        for src, ln, raw in con.execute(sql, params).fetchall()
+    ]
+
+
+def ingest_all(paths: Iterable[Union[Path, str]], db_path: Union[Path, str] = INDEX_DB, *, rebuild: bool = False) -> List[Dict[str, Any]]:
+    con = connect(db_path)
+    try:
+        return [ingest_file(con, p, rebuild=rebuild) for p in paths]
+    finally:
+        con.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Incremental DuckDB index over blackboard JSONL")
+    ap.add_argument("--db", type=str, default=str(INDEX_DB), help="DuckDB index path")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="Ingest new lines from JSONL files")
+    ing.add_argument("paths", nargs="*", default=[str(BLACKBOARD_JSONL)])
+    ing.add_argument("--rebuild", action="store_true", help="Drop and re-index the given files from offset 0")
+    q = sub.add_parser("query", help="Receipts for a mission")
+    q.add_argument("--mission", type=str, required=True)
+    q.add_argument("--phase", type=str, default=None)
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        t0 = time.perf_counter()
+        try:
+            results = ingest_all(args.paths, args.db, rebuild=args.rebuild)
+        except RuntimeError as e:
+            print(f"Ingest error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for r in results:
+            seg = f", +{r['segment_rows']} from sealed segments" if r.get("segment_rows") else ""
+            print(f"{r['source']}: +{r['rows']} rows (bytes {r['from_offset']}→{r['to_offset']}){seg}")
+        print(f"Ingest done in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return
+
+    con = connect(args.db, read_only=True)
+    try:
+        t0 = time.perf_counter()
+        rows = receipts_for_mission(con, args.mission, args.phase)
+        dt_ms = (time.perf_counter() - t0) * 1000
+    finally:
+        con.close()
+    for r in rows:
+        print(json.dumps(r["receipt"], ensure_ascii=False))
+    print(f"{len(rows)} receipts for mission={args.mission} in {dt_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Segment rotation and compressed cold storage for blackboard JSONL files.
+
+Layout for an active file ``X.jsonl``:
+  X.jsonl                          active segment; the only file writers append to
+  X.jsonl.segments/00000001.jsonl.zst
+  X.jsonl.segments/00000002.jsonl.zst
+  X.jsonl.segments/manifest.json   sealed segments in order, with line/time ranges
+                                   and sha256 of the raw and compressed bytes
+
+Rotation seals the whole active file: under the manifest lock and the active file's
+exclusive flock (the same lock JsonlWriter takes per batch) it is renamed into the
+segments dir, then compressed, hashed and recorded in the manifest. Writers notice
+the inode change the next time they take the lock and reopen the path, so no line
+is lost or rewritten; sealed segments are never modified. A crash mid-seal leaves a
+``*.jsonl.sealing`` file that the next rotation finishes.
+
+Policy (opt-in; JsonlWriter applies it to files in an hfo_blackboard/ dir once set):
+  BLACKBOARD_ROTATE_MAX_BYTES  seal once the active file reaches this size (default 0 = off)
+  BLACKBOARD_ROTATE_DAILY      seal when the first write of a new UTC day arrives (default 0)
+
+Rotation is off by default because it renames the active file, and the main
+blackboard file is tracked in git. ``rotate --force`` (or an explicit
+RotationPolicy) seals on demand.
+
+Readers: iter_lines(path) streams every line of the sealed segments (decompressing
+on the fly) followed by the active file.
+
+Usage:
+  python scripts/blackboard_segments.py rotate  [--path P] [--force]
+  python scripts/blackboard_segments.py verify  [--path P]
+  python scripts/blackboard_segments.py cat     [--path P]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import zstandard
+
+try:  # POSIX advisory locks, shared with blackboard_logger.JsonlWriter
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+
+BLACKBOARD_JSONL = Path("hfo_blackboard/obsidian_synapse_blackboard.jsonl")
+MANIFEST_NAME = "manifest.json"
+SEGMENT_SUFFIX = ".jsonl.zst"
+SEALING_SUFFIX = ".jsonl.sealing"
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+ZSTD_LEVEL = 10
+_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class RotationPolicy:
+    max_bytes: int = DEFAULT_MAX_BYTES  # 0 disables size-based rotation
+    daily: bool = True
+
+    def due(self, size: int, mtime: float, now: Optional[float] = None) -> bool:
+        """True when a non-empty active file of ``size`` last written at ``mtime`` should be sealed."""
+        if size <= 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        if self.daily:
+            today = datetime.fromtimestamp(now if now is not None else datetime.now(timezone.utc).timestamp(), tz=timezone.utc).date()
+            return datetime.fromtimestamp(mtime, tz=timezone.utc).date() < today
+        return False
+
+
+def default_policy(path: Union[Path, str]) -> Optional[RotationPolicy]:
+    """Env-configured policy for blackboard files (parent dir hfo_blackboard), else None.
+
+    None unless BLACKBOARD_ROTATE_MAX_BYTES or BLACKBOARD_ROTATE_DAILY enables rotation.
+    """
+    if Path(path).parent.name != "hfo_blackboard":
+        return None
+    try:
+        max_bytes = int(os.environ.get("BLACKBOARD_ROTATE_MAX_BYTES", 0))
+    except ValueError:
+        max_bytes = 0
+    daily = os.environ.get("BLACKBOARD_ROTATE_DAILY", "0").strip().lower() in ("1", "true", "yes", "on")
+    if max_bytes <= 0 and not daily:
+        return None
+    return RotationPolicy(max_bytes=max(0, max_bytes), daily=daily)
+
+
+def segments_dir(path: Union[Path, str]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".segments")
+
+
+def load_manifest(path: Union[Path, str]) -> Dict[str, Any]:
+    mpath = segments_dir(path) / MANIFEST_NAME
+    if not mpath.exists():
+        return {"active": Path(path).name, "segments": []}
+    return json.loads(mpath.read_text(encoding="utf-8"))
+
+
+def _write_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    mpath = segments_dir(path) / MANIFEST_NAME
+    tmp = mpath.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, mpath)
+
+
+def _fsync_dir(d: Path) -> None:
+    try:
+        fd = os.open(str(d), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _flock(fd: int) -> Iterator[None]:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _manifest_lock(path: Path) -> Iterator[None]:
+    d = segments_dir(path)
+    d.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(d / ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with _flock(fd):
+            yield
+    finally:
+        os.close(fd)
+
+
+def _line_timestamp(line: bytes) -> Optional[str]:
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    ts = obj.get("timestamp") if isinstance(obj, dict) else None
+    return str(ts) if ts is not None else None
+
+
+def _seal(path: Path, staging: Path, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Compress a staged raw segment, record it in the manifest and drop the raw copy."""
+    seq = int(staging.name.split(".", 1)[0])
+    final = staging.with_name(f"{seq:08d}{SEGMENT_SUFFIX}")
+    tmp = final.with_name(final.name + ".tmp")
+    raw_sha = hashlib.sha256()
+    lines = raw_bytes = 0
+    first_ts = last_ts = None
+    last_line = b""
+    cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, write_checksum=True)
+    with staging.open("rb") as src, tmp.open("wb") as dst:
+        with cctx.stream_writer(dst, closefd=False) as zw:
+            for line in src:
+                zw.write(line)
+                raw_sha.update(line)
+                raw_bytes += len(line)
+                if line.strip():
+                    lines += 1
+                    if first_ts is None:
+                        first_ts = _line_timestamp(line)
+                    last_line = line
+        dst.flush()
+        os.fsync(dst.fileno())
+    last_ts = _line_timestamp(last_line) if last_line else None
+    os.replace(tmp, final)
+    zst_sha = hashlib.sha256()
+    with final.open("rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            zst_sha.update(block)
+    segs = [s for s in manifest["segments"] if s["seq"] != seq]
+    line_start = sum(s["lines"] for s in segs if s["seq"] < seq)
+    entry = {
+        "seq": seq,
+        "file": final.name,
+        "lines": lines,
+        "line_range": [line_start + 1, line_start + lines],
+        "timestamp_range": [first_ts, last_ts],
+        "raw_bytes": raw_bytes,
+        "compressed_bytes": final.stat().st_size,
+        "raw_sha256": raw_sha.hexdigest(),
+        "zst_sha256": zst_sha.hexdigest(),
+        "sealed_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    manifest["segments"] = sorted(segs + [entry], key=lambda s: s["seq"])
+    _write_manifest(path, manifest)
+    staging.unlink()
+    _fsync_dir(final.parent)
+    return entry
+
+
+def rotate(path: Union[Path, str] = BLACKBOARD_JSONL, policy: Optional[RotationPolicy] = None, *, force: bool = False) -> Optional[Dict[str, Any]]:
+    """Seal the active file into a compressed segment if ``policy`` says so (or ``force``).
+
+    Returns the new manifest entry, or None when nothing was sealed. Safe to call
+    concurrently from several processes and while writers are appending.
+    """
+    path = Path(path)
+    policy = policy or RotationPolicy()
+    with _manifest_lock(path):
+        manifest = load_manifest(path)
+        seg_dir = segments_dir(path)
+        for leftover in sorted(seg_dir.glob(f"*{SEALING_SUFFIX}")):
+            _seal(path, leftover, manifest)
+        try:
+            fd = os.open(str(path), os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            with _flock(fd):
+                st = os.fstat(fd)
+                try:
+                    current = os.stat(path)
+                except FileNotFoundError:
+                    return None
+                if (current.st_dev, current.st_ino) != (st.st_dev, st.st_ino):
+                    return None  # rotated by someone else since we opened it
+                if st.st_size == 0 or not (force or policy.due(st.st_size, st.st_mtime)):
+                    return None
+                seq = max([s["seq"] for s in manifest["segments"]] + [0]) + 1
+                staging = seg_dir / f"{seq:08d}{SEALING_SUFFIX}"
+                os.rename(path, staging)
+                _fsync_dir(path.parent)
+        finally:
+            os.close(fd)
+        return _seal(path, staging, manifest)
+
+
+def open_lines(path: Union[Path, str]) -> BinaryIO:
+    """Binary line reader for a raw ``.jsonl`` or compressed ``.jsonl.zst`` file."""
+    path = Path(path)
+    if path.name.endswith(".zst"):
+        raw = path.open("rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.BufferedReader(reader, buffer_size=_CHUNK)  # type: ignore[arg-type]
+    return path.open("rb")
+
+
+def segment_paths(path: Union[Path, str]) -> List[Path]:
+    d = segments_dir(path)
+    return [d / s["file"] for s in load_manifest(path)["segments"]]
+
+
+def iter_lines(path: Union[Path, str] = BLACKBOARD_JSONL, *, include_active: bool = True) -> Iterator[Tuple[Path, int, bytes]]:
+    """Yield (source, line_no, line) across sealed segments, oldest first, then the active file."""
+    sources = segment_paths(path)
+    if include_active and Path(path).exists():
+        sources.append(Path(path))
+    for src in sources:
+        with open_lines(src) as f:
+            for i, line in enumerate(f, start=1):
+                yield src, i, line
+
+
+def iter_records(path: Union[Path, str] = BLACKBOARD_JSONL) -> Iterator[Any]:
+    """Parsed JSON values for every non-empty line across segments (invalid lines skipped)."""
+    for _, _, line in iter_lines(path):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def verify(path: Union[Path, str] = BLACKBOARD_JSONL) -> List[str]:
+    """Check every manifest entry against its segment file; returns error strings."""
+    path = Path(path)
+    errors: List[str] = []
+    for seg in load_manifest(path)["segments"]:
+        fpath = segments_dir(path) / seg["file"]
+        if not fpath.exists():
+            errors.append(f"missing segment: {fpath}")
+            continue
+        zst_sha = hashlib.sha256()
+        with fpath.open("rb") as f:
+            for block in iter(lambda: f.read(_CHUNK), b""):
+                zst_sha.update(block)
+        if zst_sha.hexdigest() != seg["zst_sha256"]:
+            errors.append(f"compressed sha256 mismatch: {fpath}")
+            continue
+        raw_sha = hashlib.sha256()
+        try:
+            with open_lines(fpath) as f:
+                for block in iter(lambda: f.read(_CHUNK), b""):
+                    raw_sha.update(block)
+        except zstandard.ZstdError as e:
+            errors.append(f"decompression failed: {fpath}: {e}")
+            continue
+        if raw_sha.hexdigest() != seg["raw_sha256"]:
+            errors.append(f"raw sha256 mismatch: {fpath}")
+    return errors
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Blackboard JSONL segment rotation")
+    ap.add_argument("cmd", choices=["rotate", "verify", "cat"])
+    ap.add_argument("--path", type=str, default=str(BLACKBOARD_JSONL))
+    ap.add_argument("--force", action="store_true", help="Seal the active file regardless of policy")
+    args = ap.parse_args()
+    path = Path(args.path)
+
+    if args.cmd == "rotate":
+        entry = rotate(path, default_policy(path) or RotationPolicy(), force=args.force)
+        if entry is None:
+            print("No rotation needed")
+        else:
+            print(f"Sealed {entry['file']}: {entry['lines']} lines, {entry['raw_bytes']} -> {entry['compressed_bytes']} bytes")
+        return 0
+    if args.cmd == "verify":
+        errors = verify(path)
+        for e in errors:
+            print(e, file=sys.stderr)
+        print("Segments OK" if not errors else f"{len(errors)} segment error(s)")
+        return 1 if errors else 0
+    out = sys.stdout.buffer
+    for _, _, line in iter_lines(path):
+        out.write(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
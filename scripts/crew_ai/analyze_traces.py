@@ -1,26 +1,50 @@
 #!/usr/bin/env python3
 """
-Analyze OTEL-like JSONL traces written by the Crew AI pilot and report whether
-lanes ran in parallel (i.e., overlapping time windows) or sequentially.
+Analyze OTEL-like JSONL traces written by the Crew AI runners (tracing.py) and
+report where the wall clock went.
 
 Usage:
-  python scripts/crew_ai/analyze_traces.py [trace_file_or_dir]
+  python scripts/crew_ai/analyze_traces.py [trace_file_or_dir] [--json out.json] [--folded out.folded]
 If a directory is passed, analyzes the most recent trace-*.jsonl file.
 
+The file is streamed line by line into a compact span tree (parent_span_id links;
+spans without a known parent hang off a synthetic root), then reports:
+- lane windows / pairwise overlap and a `parallel` verdict (legacy report)
+- critical path: the chain of spans that bounds wall time, walked back from the
+  root's end, with self time attributed per span name
+- concurrency over time: time-weighted active leaf spans per time bucket, peak,
+  and how long the run sat at each concurrency level
+- per-phase latency percentiles (span name with the lane prefix stripped)
+- pool utilization: lane busy time / (workers x wall), stragglers by idle tail
+- folded stacks (self time in microseconds) for flamegraph.pl / speedscope;
+  lane prefixes are folded so 100 lanes merge into one flame unless --by-lane
+
 Outputs a concise report to stdout and exits 0 on success.
 """
 from __future__ import annotations
+import argparse
 import sys
 import json
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
 
 ISO = "%Y-%m-%dT%H:%M:%SZ"
+ROOT_NAME = "(trace)"
 
 
 def parse_time(ts: str) -> datetime:
-    return datetime.strptime(ts, ISO).replace(tzinfo=timezone.utc)
+    # Accepts second (legacy) and microsecond (tracing.py) resolution
+    try:
+        return datetime.strptime(ts, ISO).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
 
 
 def load_spans(path: Path) -> List[Dict]:
@@ -89,25 +113,384 @@ def summarize_overlap(spans: List[Dict]) -> Dict:
     }
 
 
+def _loads(line: bytes) -> Any:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def iter_spans(path: Path) -> Iterator[Dict]:
+    """Stream span dicts from a JSONL file, skipping blank and malformed lines."""
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = _loads(line)
+            except ValueError:
+                continue
+            if isinstance(obj, dict) and "start_time" in obj and "end_time" in obj:
+                yield obj
+
+
+def _to_ns(span: Dict, key: str) -> int:
+    ns = span.get(f"{key}_unix_nano")
+    if isinstance(ns, int):
+        return ns
+    dt = parse_time(span[key])
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+
+def phase_key(name: str, lane: Optional[str]) -> str:
+    """Span name with its lane prefix stripped ("lane_3:engage_llm" -> "engage_llm")."""
+    if lane:
+        if name == lane:
+            return "lane"
+        if name.startswith(lane + ":"):
+            return name[len(lane) + 1:]
+    return name
+
+
+class SpanNode:
+    __slots__ = ("span_id", "parent_id", "name", "lane", "start", "end", "children")
+
+    def __init__(self, span_id: str, parent_id: Optional[str], name: str, lane: Optional[str], start: int, end: int) -> None:
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.lane = lane
+        self.start = start
+        self.end = max(start, end)
+        self.children: List["SpanNode"] = []
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    @property
+    def phase(self) -> str:
+        return phase_key(self.name, self.lane)
+
+
+class TraceTree:
+    """Span tree built in one pass; only compact nodes are kept in memory."""
+
+    def __init__(self, spans: Iterator[Dict]) -> None:
+        self.nodes: Dict[str, SpanNode] = {}
+        for s in spans:
+            try:
+                start, end = _to_ns(s, "start_time"), _to_ns(s, "end_time")
+            except (KeyError, ValueError):
+                continue
+            sid = str(s.get("span_id") or f"span-{len(self.nodes)}")
+            if sid in self.nodes:  # legacy ms-based ids can collide
+                sid = f"{sid}#{len(self.nodes)}"
+            attrs = s.get("attributes") or {}
+            lane = attrs.get("lane")
+            self.nodes[sid] = SpanNode(sid, s.get("parent_span_id"), str(s.get("name", "")), str(lane) if lane else None, start, end)
+        tops: List[SpanNode] = []
+        for n in self.nodes.values():
+            parent = self.nodes.get(n.parent_id) if n.parent_id else None
+            (parent.children if parent is not None else tops).append(n)
+        if len(tops) == 1:
+            self.root = tops[0]
+        else:
+            self.root = SpanNode(ROOT_NAME, None, ROOT_NAME, None, min((n.start for n in tops), default=0), max((n.end for n in tops), default=0))
+            self.root.children = tops
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def walk(self) -> Iterator[Tuple[SpanNode, Tuple[str, ...]]]:
+        """Depth-first (node, ancestor names) pairs, root included."""
+        stack: List[Tuple[SpanNode, Tuple[str, ...]]] = [(self.root, ())]
+        while stack:
+            node, path = stack.pop()
+            yield node, path
+            stack.extend((c, path + (node.name,)) for c in node.children)
+
+
+def _covered(intervals: List[Tuple[int, int]]) -> int:
+    total = 0
+    cur_s = cur_e = None
+    for s, e in sorted(intervals):
+        if cur_e is None or s > cur_e:
+            if cur_e is not None:
+                total += cur_e - cur_s
+            cur_s, cur_e = s, e
+        else:
+            cur_e = max(cur_e, e)
+    if cur_e is not None:
+        total += cur_e - cur_s
+    return total
+
+
+def self_time(node: SpanNode) -> int:
+    """Duration not covered by any child (children clipped to the span)."""
+    clipped = [(max(c.start, node.start), min(c.end, node.end)) for c in node.children]
+    return node.duration - _covered([(s, e) for s, e in clipped if e > s])
+
+
+def critical_path(tree: TraceTree) -> List[Tuple[SpanNode, int, int]]:
+    """Segments (span, seg_start, seg_end) that bound the root's wall time.
+
+    Walks back from the root's end: the last child to finish before the cursor is
+    on the path (recursively), the cursor jumps to that child's start, and gaps
+    with no child running are the parent's own time.
+    """
+    out: List[Tuple[SpanNode, int, int]] = []
+    # Explicit stack of (node, cursor); a node's segments are emitted end -> start
+    stack: List[Tuple[SpanNode, int]] = [(tree.root, tree.root.end)]
+    while stack:
+        node, cursor = stack.pop()
+        pending: List[Tuple[SpanNode, int]] = []
+        for child in sorted(node.children, key=lambda c: c.end, reverse=True):
+            if cursor <= node.start:
+                break
+            if child.start >= cursor:
+                continue
+            child_end = min(child.end, cursor)
+            if cursor > child_end:
+                out.append((node, child_end, cursor))
+            # Recurse before continuing with earlier siblings
+            pending.append((child, child_end))
+            cursor = max(child.start, node.start)
+        if cursor > node.start:
+            out.append((node, node.start, cursor))
+        stack.extend(reversed(pending))
+    out.sort(key=lambda seg: seg[1])
+    return out
+
+
+def concurrency(tree: TraceTree, buckets: int = 20) -> Dict[str, Any]:
+    """Time-weighted count of active leaf spans (the actual work) over the run."""
+    events: List[Tuple[int, int]] = []
+    for node in tree.nodes.values():
+        if not node.children and node.end > node.start:
+            events.append((node.start, 1))
+            events.append((node.end, -1))
+    t0, t1 = tree.root.start, tree.root.end
+    wall = max(1, t1 - t0)
+    buckets = max(1, buckets)
+    width = wall / buckets
+    area = [0.0] * buckets
+    at_level: Dict[int, int] = defaultdict(int)
+    peak = active = 0
+    prev = t0
+    weighted = 0
+    for t, delta in sorted(events, key=lambda e: (e[0], e[1])):
+        if t > prev and active:
+            at_level[active] += t - prev
+            weighted += active * (t - prev)
+            # Spread this constant-level interval over the buckets it covers
+            # (offsets from t0 keep the float bucket edges exact enough)
+            a, end = prev - t0, t - t0
+            while a < end:
+                b = int(a / width)
+                while b < buckets - 1 and (b + 1) * width <= a:  # rounding at a bucket edge
+                    b += 1
+                b = min(b, buckets - 1)
+                edge = end if b == buckets - 1 else min(end, (b + 1) * width)
+                area[b] += active * (edge - a)
+                a = edge
+        elif t > prev:
+            at_level[0] += t - prev
+        prev = max(prev, t)
+        active += delta
+        peak = max(peak, active)
+    if t1 > prev:
+        at_level[0] += t1 - prev
+    return {
+        "leaf_spans": len(events) // 2,
+        "peak": peak,
+        "mean": round(weighted / wall, 3),
+        "bucket_ms": round(width / 1e6, 3),
+        "buckets": [round(a / width, 2) for a in area],
+        "time_at_level_ms": {k: round(v / 1e6, 3) for k, v in sorted(at_level.items())},
+    }
+
+
+def _percentile(sorted_vals: List[int], q: float) -> int:
+    if not sorted_vals:
+        return 0
+    k = max(0, min(len(sorted_vals) - 1, int(round(q * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def phase_latency(tree: TraceTree) -> Dict[str, Dict[str, float]]:
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for node in tree.nodes.values():
+        groups[node.phase].append(node.duration)
+    out: Dict[str, Dict[str, float]] = {}
+    for phase, vals in groups.items():
+        vals.sort()
+        out[phase] = {
+            "count": len(vals),
+            "total_ms": round(sum(vals) / 1e6, 3),
+            "p50_ms": round(_percentile(vals, 0.50) / 1e6, 3),
+            "p95_ms": round(_percentile(vals, 0.95) / 1e6, 3),
+            "p99_ms": round(_percentile(vals, 0.99) / 1e6, 3),
+            "max_ms": round(vals[-1] / 1e6, 3),
+        }
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+
+def utilization(tree: TraceTree, workers: Optional[int] = None, top: int = 5) -> Dict[str, Any]:
+    """Lane busy time against a pool of `workers` threads (default: peak concurrent lanes)."""
+    windows: Dict[str, List[int]] = {}
+    for node in tree.nodes.values():
+        if node.lane:
+            w = windows.setdefault(node.lane, [node.start, node.end])
+            w[0], w[1] = min(w[0], node.start), max(w[1], node.end)
+    if not windows:
+        return {}
+    events = sorted([(s, 1) for s, _ in windows.values()] + [(e, -1) for _, e in windows.values()], key=lambda e: (e[0], e[1]))
+    peak = active = 0
+    for _, delta in events:
+        active += delta
+        peak = max(peak, active)
+    t0, t1 = tree.root.start, tree.root.end
+    wall = max(1, t1 - t0)
+    pool = workers or peak
+    busy = sum(e - s for s, e in windows.values())
+    tails = sorted((t1 - e, lane) for lane, (s, e) in windows.items())
+    last_end = max(e for _, e in windows.values())
+    first_start = min(s for s, _ in windows.values())
+    return {
+        "lanes": len(windows),
+        "workers": pool,
+        "peak_concurrent_lanes": peak,
+        "busy_ms": round(busy / 1e6, 3),
+        "utilization": round(busy / (pool * wall), 4) if pool else 0.0,
+        "startup_ms": round((first_start - t0) / 1e6, 3),
+        "tail_ms": round((t1 - last_end) / 1e6, 3),
+        "lane_spread_ms": round((last_end - min(e for _, e in windows.values())) / 1e6, 3),
+        "stragglers": [{"lane": lane, "idle_after_ms": round(idle / 1e6, 3)} for idle, lane in tails[:top]],
+    }
+
+
+def folded_stacks(tree: TraceTree, by_lane: bool = False) -> Dict[str, int]:
+    """Flamegraph "a;b;c <self-time µs>" stacks, lanes merged unless by_lane."""
+    out: Dict[str, int] = defaultdict(int)
+    stack: List[Tuple[SpanNode, Tuple[str, ...]]] = [(tree.root, ())]
+    while stack:
+        node, path = stack.pop()
+        frame = (node.name if by_lane else node.phase).replace(";", ":") or "?"
+        frames = path + (frame,)
+        us = self_time(node) // 1000
+        if us > 0:
+            out[";".join(frames)] += us
+        stack.extend((c, frames) for c in node.children)
+    return dict(out)
+
+
+def analyze(tree: TraceTree, *, buckets: int = 20, workers: Optional[int] = None, top: int = 10) -> Dict[str, Any]:
+    path = critical_path(tree)
+    by_name: Dict[str, int] = defaultdict(int)
+    for node, s, e in path:
+        by_name[node.phase] += e - s
+    wall = tree.root.duration
+    return {
+        "spans": len(tree),
+        "root": tree.root.name,
+        "wall_ms": round(wall / 1e6, 3),
+        "critical_path": {
+            "segments": [{"span": n.name, "offset_ms": round((s - tree.root.start) / 1e6, 3), "ms": round((e - s) / 1e6, 3)} for n, s, e in path],
+            "by_phase_ms": {k: round(v / 1e6, 3) for k, v in sorted(by_name.items(), key=lambda kv: -kv[1])[:top]},
+            "chain": [n.name for n in _chain(path)],
+        },
+        "concurrency": concurrency(tree, buckets),
+        "phases": phase_latency(tree),
+        "utilization": utilization(tree, workers, top=min(top, 5)),
+    }
+
+
+def _chain(path: List[Tuple[SpanNode, int, int]]) -> List[SpanNode]:
+    """Distinct spans on the critical path in time order (consecutive repeats merged)."""
+    chain: List[SpanNode] = []
+    for node, _, _ in path:
+        if not chain or chain[-1] is not node:
+            chain.append(node)
+    return chain
+
+
+def _spark(values: List[float], peak: float) -> str:
+    bars = " ▁▂▃▄▅▆▇█"
+    if peak <= 0:
+        return " " * len(values)
+    return "".join(bars[min(8, int(round(v / peak * 8)))] for v in values)
+
+
 def main() -> None:
-    arg = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("temp/otel")
+    ap = argparse.ArgumentParser(description="Trace analytics: overlap, critical path, concurrency, percentiles, utilization")
+    ap.add_argument("path", nargs="?", default="temp/otel", help="Trace JSONL file or directory (latest trace-*.jsonl)")
+    ap.add_argument("--json", type=str, default="", help="Write the full report as JSON here")
+    ap.add_argument("--folded", type=str, default="", help="Write folded stacks (flamegraph.pl/speedscope) here")
+    ap.add_argument("--by-lane", action="store_true", help="Keep lane names in folded stacks instead of merging lanes")
+    ap.add_argument("--buckets", type=int, default=20, help="Concurrency timeline buckets")
+    ap.add_argument("--workers", type=int, default=0, help="Pool size for utilization (default: peak concurrent lanes)")
+    ap.add_argument("--top", type=int, default=10, help="Rows per section")
+    args = ap.parse_args()
+
+    arg = Path(args.path)
     trace_file = arg
     if arg.is_dir():
         trace_file = pick_latest_trace_file(arg)
-    spans = load_spans(trace_file)
-    report = summarize_overlap(spans)
+    tree = TraceTree(iter_spans(trace_file))
+    report = summarize_overlap(
+        [{"name": n.name, "attributes": {"lane": n.lane}, "start_time": _ns_iso(n.start), "end_time": _ns_iso(n.end)} for n in tree.nodes.values() if n.lane]
+    )
+    stats = analyze(tree, buckets=args.buckets, workers=args.workers or None, top=args.top)
 
     print("Trace:", trace_file)
-    print("Lane windows:")
-    for lane, (s, e) in report["lane_windows"].items():
-        print(f"  - {lane}: {s} → {e}")
-    print("Overlaps (seconds):")
     lanes = sorted(report["lane_windows"].keys())
-    for a in lanes:
-        row = [f"{report['overlaps_seconds'].get(a, {}).get(b, 0):.2f}" for b in lanes]
-        print(f"  {a}: [" + ", ".join(row) + "]")
+    if len(lanes) <= 12:
+        print("Lane windows:")
+        for lane, (s, e) in report["lane_windows"].items():
+            print(f"  - {lane}: {s} → {e}")
+        print("Overlaps (seconds):")
+        for a in lanes:
+            row = [f"{report['overlaps_seconds'].get(a, {}).get(b, 0):.2f}" for b in lanes]
+            print(f"  {a}: [" + ", ".join(row) + "]")
+    else:
+        pairs = sum(1 for a in lanes for v in report["overlaps_seconds"][a].values() if v > 0) // 2
+        print(f"Lanes: {len(lanes)} ({pairs} of {len(lanes) * (len(lanes) - 1) // 2} pairs overlap)")
     print("Parallel detected:", report["parallel"])
 
+    print(f"Spans: {stats['spans']}  root: {stats['root']}  wall: {stats['wall_ms']:.1f} ms")
+    cp = stats["critical_path"]
+    print("Critical path (time on path by phase):")
+    for phase, ms in cp["by_phase_ms"].items():
+        print(f"  {phase:<32} {ms:>10.1f} ms  {ms / stats['wall_ms'] * 100 if stats['wall_ms'] else 0:5.1f}%")
+    print("  chain: " + " → ".join(cp["chain"][: args.top * 2]))
+    cc = stats["concurrency"]
+    print(f"Concurrency (active leaf spans): peak {cc['peak']}, mean {cc['mean']}, {cc['bucket_ms']:.0f} ms/bucket")
+    print(f"  |{_spark(cc['buckets'], max(cc['buckets'] or [0]))}|")
+    print("Phase latency (ms):")
+    print(f"  {'phase':<32} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'total':>10}")
+    for phase, p in list(stats["phases"].items())[: args.top]:
+        print(f"  {phase:<32} {p['count']:>6} {p['p50_ms']:>9.1f} {p['p95_ms']:>9.1f} {p['p99_ms']:>9.1f} {p['max_ms']:>9.1f} {p['total_ms']:>10.1f}")
+    ut = stats["utilization"]
+    if ut:
+        print(
+            f"Utilization: {ut['utilization']:.1%} of {ut['workers']} workers "
+            f"(lanes={ut['lanes']}, startup {ut['startup_ms']:.0f} ms, lane end spread {ut['lane_spread_ms']:.0f} ms, tail {ut['tail_ms']:.0f} ms)"
+        )
+        print("  stragglers: " + ", ".join(f"{s['lane']} (+{s['idle_after_ms']:.0f} ms idle after)" for s in ut["stragglers"]))
+
+    if args.json:
+        stats["overlap"] = report
+        Path(args.json).write_text(json.dumps(stats, indent=2), encoding="utf-8")
+        print("JSON report:", args.json)
+    if args.folded:
+        stacks = folded_stacks(tree, by_lane=args.by_lane)
+        with open(args.folded, "w", encoding="utf-8") as f:
+            for stack in sorted(stacks):
+                f.write(f"{stack} {stacks[stack]}\n")
+        print("Folded stacks:", args.folded)
+
+
+def _ns_iso(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
 
 if __name__ == "__main__":
     main()
@@ -15,14 +15,26 @@ Usage examples:
 
   # write JSON results
   python3 scripts/crew_ai/arc_challenge_eval.py --limit 200 --output temp/evals/arc_challenge_results.json
+
+  # keep up to 8 questions in flight for this run
+  python3 scripts/crew_ai/arc_challenge_eval.py --limit 200 --concurrency 8
+
+Concurrency:
+- ARC_EVAL_CONCURRENCY: per-run in-flight window (default 4; 1 = serial)
+- ARC_EVAL_MAX_IN_FLIGHT: process-wide cap on concurrent provider calls, shared by
+  every run_eval/ask_question in the process (default 16); arc_swarm_runner also
+  uses it as its scheduler's worker count
 """
 from __future__ import annotations
 import argparse
 import json
+import math
 import os
 import re
 from dataclasses import dataclass
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -41,6 +53,38 @@ llm_client = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(llm_client)  # type: ignore[arg-type]
 call_openrouter = getattr(llm_client, "call_openrouter")
 
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# Process-wide gate on concurrent provider calls. Lanes each run their own window,
+# but all of them draw from this one semaphore so N lanes x window never exceeds it.
+_GATE_LOCK = threading.Lock()
+_GATE: Optional[threading.BoundedSemaphore] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except Exception:
+        return default
+
+
+def _provider_gate() -> threading.BoundedSemaphore:
+    global _GATE
+    with _GATE_LOCK:
+        if _GATE is None:
+            _GATE = threading.BoundedSemaphore(_env_int("ARC_EVAL_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT))
+        return _GATE
+
+
+def _percentile(values: List[int], q: float) -> float:
+    """Nearest-rank percentile (q in [0, 100]); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return float(ordered[min(rank, len(ordered)) - 1])
+
 
 def _extract_letter(s: str) -> Optional[str]:
     t = (s or "").strip()
@@ -59,6 +103,54 @@ def _format_prompt(question: str, choices: List[Tuple[str, str]]) -> str:
     return "\n".join(lines)
 
 
+@dataclass(frozen=True)
+class ARCSplit:
+    """One ARC split, loaded once per process and shared read-only by every lane.
+
+    ``dataset`` stays a memory-mapped Arrow table (HF datasets cache); lanes only
+    hold index windows into the pre-formatted ``prompts``/``answer_keys``/``ids``.
+    """
+    split: str
+    dataset: Any
+    ids: Tuple[Any, ...]
+    prompts: Tuple[str, ...]
+    answer_keys: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+
+_SPLITS: Dict[str, ARCSplit] = {}
+_SPLITS_LOCK = threading.Lock()
+
+
+def load_split(split: str = "validation") -> ARCSplit:
+    """Return the cached ARCSplit for ``split``, loading and formatting it on first use."""
+    with _SPLITS_LOCK:
+        cached = _SPLITS.get(split)
+        if cached is not None:
+            return cached
+        ds = load_dataset("ai2_arc", "ARC-Challenge", split=split, keep_in_memory=False)
+        prompts: List[str] = []
+        # Column reads come straight off the Arrow table; no per-row dict materialization
+        for q, ch in zip(ds["question"], ds["choices"]):
+            # choices: {'text': [...], 'label': [...]}
+            ch = ch or {}
+            labels = list(ch.get("label") or [])
+            texts = list(ch.get("text") or [])
+            pairs: List[Tuple[str, str]] = [(str(l).upper(), str(t)) for l, t in zip(labels, texts)]
+            prompts.append(_format_prompt(q, pairs))
+        loaded = ARCSplit(
+            split=split,
+            dataset=ds,
+            ids=tuple(ds["id"]),
+            prompts=tuple(prompts),
+            answer_keys=tuple(str(a).strip().upper() for a in ds["answerKey"]),
+        )
+        _SPLITS[split] = loaded
+        return loaded
+
+
 @dataclass
 class ARCResult:
     model: str
@@ -69,51 +161,38 @@ class ARCResult:
     details: List[Dict[str, Any]]
     total_tokens: int
     empty_content: int
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
 
 
-def run_eval(
-    *,
-    model_hint: Optional[str],
-    split: str = "validation",
-    limit: int = 0,
-    offset: int = 0,
-    seed: Optional[int] = None,
-    max_tokens: int = 400,
-    temperature: float = 0.0,
-    timeout_seconds: int = 25,
-) -> ARCResult:
-    ds = load_dataset("ai2_arc", "ARC-Challenge", split=split)
-    records = list(ds)
+def select_indices(data: ARCSplit, *, limit: int = 0, offset: int = 0, seed: Optional[int] = None) -> List[int]:
+    """Record indices a run scores: seeded shuffle, then the [offset, offset + limit) window."""
+    # Shuffle an index permutation (same RNG draws as shuffling the records themselves)
+    indices = list(range(len(data)))
     if seed is not None:
         rnd = random.Random(int(seed))
-        rnd.shuffle(records)
+        rnd.shuffle(indices)
     if offset and offset > 0:
-        records = records[offset:]
+        indices = indices[offset:]
     if limit and limit > 0:
-        records = records[: limit]
+        indices = indices[: limit]
+    return indices
 
-    total = 0
-    correct = 0
-    format_fails = 0
-    latencies: List[int] = []
-    details: List[Dict[str, Any]] = []
-    total_tokens = 0
-    empty_content = 0
-    model_used: Optional[str] = None
 
-    for rec in records:
-        total += 1
-        q = rec.get("question")
-        ans_key = str(rec.get("answerKey")).strip().upper()
-        # choices: {'text': [...], 'label': [...]}
-        ch = rec.get("choices") or {}
-        labels = list(ch.get("label") or [])
-        texts = list(ch.get("text") or [])
-        pairs: List[Tuple[str, str]] = [(str(l).upper(), str(t)) for l, t in zip(labels, texts)]
-        prompt = _format_prompt(q, pairs)
-
-        res = call_openrouter(
-            prompt,
+def ask_question(
+    data: ARCSplit,
+    idx: int,
+    *,
+    model_hint: Optional[str],
+    max_tokens: int = 400,
+    temperature: float = 0.0,
+    timeout_seconds: int = 25,
+) -> Dict[str, Any]:
+    """One provider call for record ``idx``, under the process-wide in-flight gate."""
+    with _provider_gate():
+        return call_openrouter(
+            data.prompts[idx],
             model_hint=model_hint,
             max_tokens=max_tokens,
             temperature=temperature,
@@ -124,6 +203,22 @@ def run_eval(
             retry_max=1,
             retry_alt_format=True,
         )
+
+
+def score_responses(data: ARCSplit, indices: List[int], responses: List[Dict[str, Any]], model_hint: Optional[str]) -> ARCResult:
+    """Score responses (aligned with ``indices``) into an ARCResult, in record order."""
+    total = 0
+    correct = 0
+    format_fails = 0
+    latencies: List[int] = []
+    details: List[Dict[str, Any]] = []
+    total_tokens = 0
+    empty_content = 0
+    model_used: Optional[str] = None
+
+    for idx, res in zip(indices, responses):
+        total += 1
+        ans_key = data.answer_keys[idx]
         model_used = model_used or res.get("model")
         content = res.get("content") if res.get("ok") else None
         if content is None or str(content).strip() == "":
@@ -139,11 +234,12 @@ def run_eval(
         except Exception:
             pass
         details.append({
-            "id": rec.get("id"),
+            "id": data.ids[idx],
             "ok": ok,
             "got": got_letter,
             "expect": ans_key,
             "latency_ms": res.get("latency_ms"),
+            "hedged": res.get("hedged"),
             "raw": res.get("content"),
             "usage_total_tokens": (usage or {}).get("total_tokens"),
         })
@@ -158,9 +254,48 @@ def run_eval(
         details=details,
         total_tokens=total_tokens,
         empty_content=empty_content,
+        p50_latency_ms=_percentile(latencies, 50),
+        p95_latency_ms=_percentile(latencies, 95),
+        p99_latency_ms=_percentile(latencies, 99),
     )
 
 
+def run_eval(
+    *,
+    model_hint: Optional[str],
+    split: str = "validation",
+    limit: int = 0,
+    offset: int = 0,
+    seed: Optional[int] = None,
+    max_tokens: int = 400,
+    temperature: float = 0.0,
+    timeout_seconds: int = 25,
+    concurrency: Optional[int] = None,
+) -> ARCResult:
+    """Score a window of ARC records, keeping up to ``concurrency`` questions in flight.
+
+    Results (details, model, counters) are assembled in record order regardless of
+    completion order, so output is identical to a serial run for the same inputs.
+    """
+    data = load_split(split)
+    indices = select_indices(data, limit=limit, offset=offset, seed=seed)
+
+    window = int(concurrency) if concurrency is not None else _env_int("ARC_EVAL_CONCURRENCY", DEFAULT_CONCURRENCY)
+    window = max(1, min(window, len(indices) or 1))
+
+    def ask(idx: int) -> Dict[str, Any]:
+        return ask_question(data, idx, model_hint=model_hint, max_tokens=max_tokens, temperature=temperature, timeout_seconds=timeout_seconds)
+
+    if window == 1:
+        responses = [ask(i) for i in indices]
+    else:
+        # map() yields in submission order, which keeps details deterministic
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix="arc-q") as ex:
+            responses = list(ex.map(ask, indices))
+
+    return score_responses(data, indices, responses, model_hint)
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="ARC-Challenge (validation) evaluation")
     ap.add_argument("--limit", type=int, default=200, help="Limit number of items (0 = all; requires --allow-full or ALLOW_FULL_ARC=1)")
@@ -168,6 +303,7 @@ def main() -> None:
     ap.add_argument("--max-tokens", type=int, default=400)
     ap.add_argument("--temperature", type=float, default=0.0)
     ap.add_argument("--timeout-seconds", type=int, default=25)
+    ap.add_argument("--concurrency", type=int, default=None, help="Questions in flight for this run (default: ARC_EVAL_CONCURRENCY or 4)")
     ap.add_argument("--output", type=str, default="", help="Optional JSON output path")
     ap.add_argument("--allow-full", action="store_true", help="Explicitly allow full-dataset run when --limit 0 is set")
     args = ap.parse_args()
@@ -200,10 +336,11 @@ def main() -> None:
         max_tokens=args.max_tokens,
         temperature=args.temperature,
         timeout_seconds=args.timeout_seconds,
+        concurrency=args.concurrency,
     )
     acc = (result.correct / result.total) if result.total else 0.0
     print(f"Model: {result.model}")
-    print(f"ARC-Challenge[{args.split}] limit={args.limit or 'ALL'} -> Accuracy: {result.correct}/{result.total} = {acc:.2%}; avg_latency={result.avg_latency_ms:.0f} ms; empty_content={result.empty_content}; tokens={result.total_tokens}")
+    print(f"ARC-Challenge[{args.split}] limit={args.limit or 'ALL'} -> Accuracy: {result.correct}/{result.total} = {acc:.2%}; avg_latency={result.avg_latency_ms:.0f} ms; p50/p95/p99={result.p50_latency_ms:.0f}/{result.p95_latency_ms:.0f}/{result.p99_latency_ms:.0f} ms; empty_content={result.empty_content}; tokens={result.total_tokens}")
 
     if args.output:
         outp = Path(args.output)
@@ -218,6 +355,9 @@ def main() -> None:
                 "accuracy": acc,
                 "format_fails": result.format_fails,
                 "avg_latency_ms": result.avg_latency_ms,
+                "p50_latency_ms": result.p50_latency_ms,
+                "p95_latency_ms": result.p95_latency_ms,
+                "p99_latency_ms": result.p99_latency_ms,
                 "details": result.details,
             }, f, indent=2)
         print(f"Wrote: {outp}")
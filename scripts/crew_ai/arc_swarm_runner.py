@@ -3,6 +3,9 @@
 ARC-Challenge swarm runner:
 - Runs ARC-Challenge (validation) in parallel across all allowlisted models
 - Writes a Swarmlord-style digest summarizing per-model accuracy and latency
+- Emits run → lane → phase spans to temp/otel/ (see analyze_traces.py)
+- Questions from every lane share one work-stealing queue (lane_scheduler.py) with a
+  per-model in-flight cap, so fast lanes' workers pick up slow lanes' leftovers
 
 Usage:
   python3 scripts/crew_ai/arc_swarm_runner.py --limit 200
@@ -15,20 +18,31 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 import re
-import yaml
 
 import importlib.util
 
+# Shared batched JSONL writer (scripts/blackboard_logger.py)
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+from blackboard_logger import get_writer  # noqa: E402
+from tracing import Span, get_tracer  # noqa: E402
+from artifact_store import LaneArtifactStore, Schema  # noqa: E402
+from lane_scheduler import TaskResult, WorkStealingScheduler  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[2]
 RESULTS_ROOT = ROOT / "hfo_crew_ai_swarm_results"
+OTEL_DIR = ROOT / "temp/otel"
 BLACKBOARD = ROOT / "hfo_blackboard/obsidian_synapse_blackboard.jsonl"
 
 
@@ -37,9 +51,7 @@ def now_z() -> str:
 
 
 def append_blackboard(entry: Dict[str, Any]) -> None:
-    BLACKBOARD.parent.mkdir(parents=True, exist_ok=True)
-    with BLACKBOARD.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    get_writer(BLACKBOARD).append(entry)
 
 
 def _sanitize_name(name: str) -> str:
@@ -47,29 +59,13 @@ def _sanitize_name(name: str) -> str:
     return re.sub(r"[^A-Za-z0-9_-]+", "_", str(name)).strip("_")[:80]
 
 
-def _validate_lane_artifacts(lane_out: Path) -> Dict[str, Any]:
-    """Validate presence and minimal shape of PREY artifacts for a lane."""
-    required = {
-        "perception_snapshot.yml": ["mission_id", "lane", "timestamp", "dataset", "split", "limit"],
-        "react_plan.yml": ["mission_id", "lane", "timestamp", "approach"],
-        "engage_report.yml": ["mission_id", "lane", "timestamp", "metrics"],
-        "yield_summary.yml": ["mission_id", "lane", "timestamp", "evidence_refs"],
-    }
-    errors: List[str] = []
-    for fname, keys in required.items():
-        fp = lane_out / fname
-        if not fp.exists():
-            errors.append(f"missing_file:{fname}")
-            continue
-        try:
-            with fp.open("r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-        except Exception:
-            data = {}
-        for k in keys:
-            if k not in data:
-                errors.append(f"missing_key:{fname}:{k}")
-    return {"ok": len(errors) == 0, "errors": errors}
+# Lane artifacts and the keys each must carry (checked in memory by LaneArtifactStore)
+REQUIRED_ARTIFACTS: Schema = {
+    "perception_snapshot.yml": [(k, None) for k in ("mission_id", "lane", "timestamp", "dataset", "split", "limit")],
+    "react_plan.yml": [(k, None) for k in ("mission_id", "lane", "timestamp", "approach")],
+    "engage_report.yml": [(k, None) for k in ("mission_id", "lane", "timestamp", "metrics")],
+    "yield_summary.yml": [(k, None) for k in ("mission_id", "lane", "timestamp", "evidence_refs")],
+}
 
 
 # Load sibling modules
@@ -89,37 +85,36 @@ _sys.modules[spec_eval.name] = arc_eval  # ensure visible during exec
 spec_eval.loader.exec_module(arc_eval)  # type: ignore[arg-type]
 
 
-def _sanitize_model_env_key(model: str) -> str:
-    # OPENROUTER_PRICE_<SANITIZED>_PER_1K
-    key = re.sub(r"[^A-Za-z0-9]+", "_", str(model)).upper().strip("_")
-    return f"OPENROUTER_PRICE_{key}_PER_1K"
+# Env-based pricing lives in llm_client so batch sweeps and the swarm share it
+_price_per_1k = llm_client._price_per_1k
 
 
-def _price_per_1k(model: str) -> float | None:
-    # Env-based pricing; avoids inventing numbers. Use OPENROUTER_PRICE_DEFAULT_PER_1K for fallback.
-    specific = os.environ.get(_sanitize_model_env_key(model))
-    if specific:
-        try:
-            return float(specific)
-        except Exception:
-            pass
-    default = os.environ.get("OPENROUTER_PRICE_DEFAULT_PER_1K")
-    if default:
-        try:
-            return float(default)
-        except Exception:
-            pass
-    return None
+@dataclass
+class LaneRun:
+    """State a lane carries from Perceive/React (start_lane) to Engage/Yield (finish_lane)."""
+    model_hint: str
+    lane_index: int
+    lane_name: str
+    lane_out: Path
+    store: LaneArtifactStore
+    tracer: Any
+    lane_span: Any
+    engage_span: Any
 
 
-def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temperature: float, timeout_seconds: int, *, lane_index: int = 0, seed_base: int = 1234, run_dir: Optional[Path] = None) -> Dict[str, Any]:
+def start_lane(model_hint: str, limit: int, split: str, max_tokens: int, temperature: float, timeout_seconds: int, *, lane_index: int = 0, run_dir: Optional[Path] = None, trace_id: Optional[str] = None, parent_span: Optional[Span] = None) -> LaneRun:
+    """Perceive + React artifacts for one lane; leaves its engage span open."""
     # Set env to propagate hint (client also accepts direct hint)
     os.environ["OPENROUTER_MODEL_HINT"] = model_hint
     # Prepare lane output folder and PREY artifacts
     lane_name = f"{_sanitize_name(model_hint)}_lane_{lane_index}"
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    lane_span = tracer.start_span(lane_name, parent=parent_span, attributes={"lane": lane_name, "model_hint": model_hint})
+    phase_span = tracer.start_span(f"{lane_name}:perceive", parent=lane_span, attributes={"lane": lane_name, "phase": "perceive"})
     base_dir = (run_dir or (RESULTS_ROOT / datetime.now(timezone.utc).strftime("%Y-%m-%d") / f"run-{int(time.time()*1000)}"))
     lane_out = base_dir / lane_name / "attempt_1"
     lane_out.mkdir(parents=True, exist_ok=True)
+    store = LaneArtifactStore(lane_out, REQUIRED_ARTIFACTS)
 
     # Perceive: write perception_snapshot.yml
     try:
@@ -143,9 +138,7 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
                 "lane_dir": str(lane_out.relative_to(ROOT)),
             },
         }
-        ps = lane_out / "perception_snapshot.yml"
-        with ps.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(snap, f, sort_keys=False)
+        ps = store.put("perception_snapshot.yml", snap)
         append_blackboard({
             "mission_id": snap["mission_id"],
             "phase": "perceive",
@@ -162,8 +155,10 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
             "timestamp": now_z(),
             "regen_flag": True,
         })
+    phase_span.end()
 
     # React: write react_plan.yml
+    phase_span = tracer.start_span(f"{lane_name}:react", parent=lane_span, attributes={"lane": lane_name, "phase": "react"})
     try:
         plan = {
             "mission_id": os.environ.get("ARC_SWARM_MISSION_ID", "arc_swarm"),
@@ -180,9 +175,7 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
                 "receipts": True,
             },
         }
-        rp = lane_out / "react_plan.yml"
-        with rp.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(plan, f, sort_keys=False)
+        rp = store.put("react_plan.yml", plan)
         append_blackboard({
             "mission_id": plan["mission_id"],
             "phase": "react",
@@ -199,16 +192,18 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
             "timestamp": now_z(),
             "regen_flag": True,
         })
-    res = arc_eval.run_eval(
-        model_hint=model_hint,
-        split=split,
-        limit=limit,
-        offset=limit * lane_index if limit > 0 else 0,
-        seed=seed_base + lane_index,
-        max_tokens=max_tokens,
-        temperature=temperature,
-        timeout_seconds=timeout_seconds,
-    )
+    phase_span.end()
+    engage_span = tracer.start_span(f"{lane_name}:engage_llm", parent=lane_span, attributes={"lane": lane_name, "phase": "engage"})
+    return LaneRun(model_hint, lane_index, lane_name, lane_out, store, tracer, lane_span, engage_span)
+
+
+def finish_lane(lane: LaneRun, res: Any, limit: int, max_tokens: int, temperature: float, timeout_seconds: int) -> Dict[str, Any]:
+    """Engage report + Yield summary and validation for a scored lane; returns its results row."""
+    lane_name, lane_out, store, tracer, lane_span, lane_index = lane.lane_name, lane.lane_out, lane.store, lane.tracer, lane.lane_span, lane.lane_index
+    phase_span = lane.engage_span
+    phase_span.set_attributes({"model": res.model, "total": res.total, "correct": res.correct, "p95_latency_ms": res.p95_latency_ms})
+    phase_span.end()
+    phase_span = tracer.start_span(f"{lane_name}:yield", parent=lane_span, attributes={"lane": lane_name, "phase": "yield"})
     acc = (res.correct / res.total) if res.total else 0.0
     price = _price_per_1k(res.model)
     est_cost = None
@@ -226,15 +221,16 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
                 "accuracy": acc,
                 "format_fails": res.format_fails,
                 "avg_latency_ms": res.avg_latency_ms,
+                "p50_latency_ms": res.p50_latency_ms,
+                "p95_latency_ms": res.p95_latency_ms,
+                "p99_latency_ms": res.p99_latency_ms,
                 "empty_content": res.empty_content,
                 "total_tokens": res.total_tokens,
             },
             "model": res.model,
             "llm": {"max_tokens": int(max_tokens), "temperature": float(temperature), "timeout_seconds": int(timeout_seconds)},
         }
-        erp = lane_out / "engage_report.yml"
-        with erp.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(er, f, sort_keys=False)
+        erp = store.put("engage_report.yml", er)
         append_blackboard({
             "mission_id": er["mission_id"],
             "phase": "engage",
@@ -259,7 +255,7 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
                 "perception_snapshot.yml",
                 "react_plan.yml",
                 "engage_report.yml",
-            ) if (lane_out / n).exists()
+            ) if store.has(n)
         ]
         ys = {
             "mission_id": os.environ.get("ARC_SWARM_MISSION_ID", "arc_swarm"),
@@ -268,9 +264,7 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
             "evidence_refs": evidence_refs,
             "verify_expected": "artifact_validation",
         }
-        ysp = lane_out / "yield_summary.yml"
-        with ysp.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(ys, f, sort_keys=False)
+        ysp = store.put("yield_summary.yml", ys)
         append_blackboard({
             "mission_id": ys["mission_id"],
             "phase": "yield",
@@ -278,7 +272,7 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
             "evidence_refs": [str(ysp.relative_to(ROOT))],
             "timestamp": now_z(),
         })
-        val = _validate_lane_artifacts(lane_out)
+        val = store.validate()
         append_blackboard({
             "mission_id": ys["mission_id"],
             "phase": "verify",
@@ -289,6 +283,21 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
         })
     except Exception:
         pass
+    # Artifact writes ran in the background; make sure they landed before the lane reports done
+    write_errors = store.flush()
+    if write_errors:
+        append_blackboard({
+            "mission_id": os.environ.get("ARC_SWARM_MISSION_ID", "arc_swarm"),
+            "phase": "verify",
+            "summary": f"lane={lane_name}: artifact write failed",
+            "evidence_refs": [f"lane:{lane_name}", "phase:verify"],
+            "timestamp": now_z(),
+            "regen_flag": True,
+            "validator": {"ok": False, "errors": write_errors},
+        })
+    phase_span.end()
+    lane_span.set_attribute("accuracy", acc)
+    lane_span.end()
 
     return {
         "model": res.model,
@@ -298,6 +307,9 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
         "accuracy": acc,
         "format_fails": res.format_fails,
         "avg_latency_ms": res.avg_latency_ms,
+        "p50_latency_ms": res.p50_latency_ms,
+        "p95_latency_ms": res.p95_latency_ms,
+        "p99_latency_ms": res.p99_latency_ms,
         "empty_content": res.empty_content,
         "total_tokens": res.total_tokens,
         "price_per_1k": price,
@@ -306,6 +318,23 @@ def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temp
     }
 
 
+def run_for_model(model_hint: str, limit: int, split: str, max_tokens: int, temperature: float, timeout_seconds: int, *, lane_index: int = 0, seed_base: int = 1234, run_dir: Optional[Path] = None, concurrency: Optional[int] = None, trace_id: Optional[str] = None, parent_span: Optional[Span] = None) -> Dict[str, Any]:
+    """One lane end to end with its own question window (no shared scheduler)."""
+    lane = start_lane(model_hint, limit, split, max_tokens, temperature, timeout_seconds, lane_index=lane_index, run_dir=run_dir, trace_id=trace_id, parent_span=parent_span)
+    res = arc_eval.run_eval(
+        model_hint=model_hint,
+        split=split,
+        limit=limit,
+        offset=limit * lane_index if limit > 0 else 0,
+        seed=seed_base + lane_index,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        timeout_seconds=timeout_seconds,
+        concurrency=concurrency,
+    )
+    return finish_lane(lane, res, limit, max_tokens, temperature, timeout_seconds)
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="ARC-Challenge swarm runner across allowlisted models")
     ap.add_argument("--limit", type=int, default=200, help="Limit items per lane (0 = all; requires --allow-full)")
@@ -314,6 +343,9 @@ def main() -> None:
     ap.add_argument("--max-tokens", type=int, default=400)
     ap.add_argument("--temperature", type=float, default=0.0)
     ap.add_argument("--timeout-seconds", type=int, default=25)
+    ap.add_argument("--concurrency", type=int, default=None, help="Questions in flight per lane's share of its model cap (default: ARC_EVAL_CONCURRENCY or 4); ARC_EVAL_MAX_IN_FLIGHT sets the worker count")
+    ap.add_argument("--model-concurrency", type=int, default=0, help="In-flight cap per model (default: concurrency x lanes-per-model)")
+    ap.add_argument("--task-retries", type=int, default=0, help="Re-enqueue a question whose call failed (not ok) up to N times")
     ap.add_argument("--models", type=str, default="", help="Comma-separated substrings to filter allowlisted models (e.g., 'gpt-oss,deepseek')")
     ap.add_argument("--allow-full", action="store_true", help="Explicitly allow full-dataset run when --limit 0 is set")
     args = ap.parse_args()
@@ -370,6 +402,8 @@ def main() -> None:
                 "max_tokens": int(args.max_tokens),
                 "temperature": float(args.temperature),
                 "timeout_seconds": int(args.timeout_seconds),
+                "concurrency_per_lane": args.concurrency,
+                "max_in_flight": os.environ.get("ARC_EVAL_MAX_IN_FLIGHT"),
                 "api_key_present": bool(os.environ.get("OPENROUTER_API_KEY")),
             },
             "paths": {
@@ -398,38 +432,91 @@ def main() -> None:
             "regen_flag": True,
         })
 
+    trace_id = f"trace-{mission_id}"
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    run_span = tracer.start_span("run", attributes={"mission_id": mission_id, "models": len(allowlist), "limit": args.limit})
+
+    # Load and pre-format the split once; every lane slices the shared copy by index
+    with tracer.span("load_split", parent=run_span, attributes={"split": args.split}):
+        data = arc_eval.load_split(args.split)
+
     results: List[Dict[str, Any]] = []
     lanes = []
     for m in allowlist:
         for ln in range(max(1, args.lanes_per_model)):
             lanes.append((m, ln))
 
-    with ThreadPoolExecutor(max_workers=len(lanes)) as ex:
-        futs = {
-            ex.submit(
-                run_for_model,
-                m,
-                args.limit,
-                args.split,
-                args.max_tokens,
-                args.temperature,
-                args.timeout_seconds,
-                lane_index=ln,
-                run_dir=run_dir,
-            ): (m, ln)
-            for (m, ln) in lanes
-        }
-        for fut in as_completed(futs):
-            r = fut.result()
+    lane_runs = [
+        start_lane(m, args.limit, args.split, args.max_tokens, args.temperature, args.timeout_seconds, lane_index=ln, run_dir=run_dir, trace_id=trace_id, parent_span=run_span)
+        for (m, ln) in lanes
+    ]
+
+    # Every question is a task in one queue; lanes finish (engage/yield) as their last answer lands
+    window = args.concurrency if args.concurrency is not None else arc_eval._env_int("ARC_EVAL_CONCURRENCY", arc_eval.DEFAULT_CONCURRENCY)
+    model_cap = args.model_concurrency or max(1, window) * max(1, args.lanes_per_model)
+    sched = WorkStealingScheduler(
+        arc_eval._env_int("ARC_EVAL_MAX_IN_FLIGHT", arc_eval.DEFAULT_MAX_IN_FLIGHT),
+        default_cap=model_cap,
+        name="arc-q",
+    )
+    lane_indices: Dict[str, List[int]] = {}
+    answers: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    answers_lock = threading.Lock()
+
+    def ask(lane: LaneRun, idx: int) -> Dict[str, Any]:
+        with lane.tracer.span(f"{lane.lane_name}:llm_call", parent=lane.engage_span, attributes={"lane": lane.lane_name, "idx": idx}) as sp:
+            res = arc_eval.ask_question(data, idx, model_hint=lane.model_hint, max_tokens=args.max_tokens, temperature=args.temperature, timeout_seconds=args.timeout_seconds)
+            sp.set_attributes({"ok": bool(res.get("ok")), "latency_ms": res.get("latency_ms")})
+        return res
+
+    def lane_done(lane: LaneRun) -> None:
+        idxs = lane_indices[lane.lane_name]
+        got = answers.pop(lane.lane_name, {})
+        res = arc_eval.score_responses(data, idxs, [got[i] for i in idxs], lane.model_hint)
+        r = finish_lane(lane, res, args.limit, args.max_tokens, args.temperature, args.timeout_seconds)
+        with answers_lock:
             results.append(r)
-            append_blackboard({
-                "mission_id": mission_id,
-                "phase": "engage",
-                "summary": f"Lane done: {r['model']} lane={r['lane_index']} acc={r['accuracy']:.3f} limit={r['limit']}",
-                "evidence_refs": ["dataset:ai2_arc:ARC-Challenge", f"model:{r['model']}", f"lane:{r['lane_index']}"]
-                ,
-                "timestamp": now_z(),
-            })
+        append_blackboard({
+            "mission_id": mission_id,
+            "phase": "engage",
+            "summary": f"Lane done: {r['model']} lane={r['lane_index']} acc={r['accuracy']:.3f} limit={r['limit']}",
+            "evidence_refs": ["dataset:ai2_arc:ARC-Challenge", f"model:{r['model']}", f"lane:{r['lane_index']}"]
+            ,
+            "timestamp": now_z(),
+        })
+
+    def on_answer(lane: LaneRun):
+        def cb(tr: TaskResult) -> None:
+            value = tr.value if tr.error is None else {"ok": False, "error": str(tr.error), "model": lane.model_hint}
+            with answers_lock:
+                got = answers[lane.lane_name]
+                got[tr.key] = value
+                last = len(got) == len(lane_indices[lane.lane_name])
+            if last:
+                lane_done(lane)
+        return cb
+
+    for lane in lane_runs:
+        offset = args.limit * lane.lane_index if args.limit > 0 else 0
+        idxs = arc_eval.select_indices(data, limit=args.limit, offset=offset, seed=1234 + lane.lane_index)
+        lane_indices[lane.lane_name] = idxs
+        answers[lane.lane_name] = {}
+        cb = on_answer(lane)
+        for idx in idxs:
+            sched.submit(
+                lane.lane_name, idx, ask, lane, idx,
+                model=lane.model_hint,
+                retry=lambda r: not r.get("ok"),
+                max_attempts=1 + max(0, args.task_retries),
+                callback=cb,
+            )
+    for lane in lane_runs:
+        if not lane_indices[lane.lane_name]:
+            lane_done(lane)
+    sched.run()
+    run_span.set_attributes(sched.stats())
+    run_span.end()
+    tracer.flush()
 
     # Sort by accuracy desc, then avg_latency asc
     # Aggregate lanes per model
@@ -521,6 +608,7 @@ def main() -> None:
 
     print(f"Wrote: {md_path}")
     print(f"Wrote: {json_path}")
+    print(f"Spans: {OTEL_DIR / f'{trace_id}.jsonl'}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+In-memory-first store for per-lane PREY artifacts (perception_snapshot.yml,
+react_plan.yml, engage_report.yml, yield_summary.yml).
+
+put() serializes the document with the libyaml C dumper (pure-Python fallback)
+in the calling thread, so later mutation of the dict cannot change what lands on
+disk, and hands the bytes to a small shared I/O pool that writes them atomically
+(tmp file + os.replace) off the lane's critical path. validate() checks the
+in-memory documents against the runner's schema, so there is no read-back.
+flush() waits for the lane's writes and reports any that failed; call it before
+handing the lane directory to anything that reads it.
+
+  store = LaneArtifactStore(lane_out, REQUIRED_ARTIFACTS)
+  path = store.put("react_plan.yml", plan)
+  ...
+  validation = store.validate()          # {"ok": bool, "errors": [...]}
+  write_errors = store.flush()
+"""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+IO_WORKERS = int(os.environ.get("ARTIFACT_IO_WORKERS", "4") or 4)
+
+# Schema: file name -> [(key, required type or None for presence only)]
+Schema = Dict[str, Sequence[Tuple[str, Optional[type]]]]
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def dump_yaml(data: Any) -> bytes:
+    return yaml.dump(data, Dumper=YAML_DUMPER, sort_keys=False).encode("utf-8")
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=max(1, IO_WORKERS), thread_name_prefix="artifact-io")
+        return _POOL
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class LaneArtifactStore:
+    """Authoritative in-memory copies of one lane's artifacts, persisted asynchronously."""
+
+    def __init__(self, lane_out: Path, schema: Schema) -> None:
+        self.lane_out = Path(lane_out)
+        self.schema = schema
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Future] = {}
+
+    def put(self, fname: str, data: Dict[str, Any]) -> Path:
+        """Record ``data`` as ``fname`` and queue the write; returns the target path.
+
+        Serialization errors propagate to the caller (nothing is recorded).
+        """
+        payload = dump_yaml(data)
+        path = self.lane_out / fname
+        self.docs[fname] = data
+        prev = self._pending.get(fname)
+        if prev is not None:
+            prev.result()  # keep writes of the same file ordered
+        self._pending[fname] = _pool().submit(_write_atomic, path, payload)
+        return path
+
+    def get(self, fname: str) -> Dict[str, Any]:
+        return self.docs.get(fname, {})
+
+    def has(self, fname: str) -> bool:
+        return fname in self.docs
+
+    def validate(self) -> Dict[str, Any]:
+        """Schema check of the in-memory documents. Returns { ok: bool, errors: [str] }."""
+        errors: List[str] = []
+        for fname, fields in self.schema.items():
+            if fname not in self.docs:
+                errors.append(f"missing_file:{fname}")
+                continue
+            data = self.docs[fname]
+            for key, typ in fields:
+                val = data.get(key)
+                if typ is None:
+                    if key not in data:
+                        errors.append(f"missing_key:{fname}:{key}")
+                elif val is None or not isinstance(val, typ):
+                    errors.append(f"missing_or_type:{fname}:{key}")
+        return {"ok": not errors, "errors": errors}
+
+    def flush(self) -> List[str]:
+        """Wait for queued writes; returns ``write_failed:<file>:<error>`` entries."""
+        errors: List[str] = []
+        for fname, fut in list(self._pending.items()):
+            try:
+                fut.result()
+            except Exception as e:
+                errors.append(f"write_failed:{fname}:{e}")
+        self._pending.clear()
+        return errors
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """
 Deterministic parallelism benchmark that simulates per-lane work without any LLM calls.
-It writes OTEL-like spans compatible with analyze_traces.py by emitting
-"{lane}:engage_llm" spans so the existing analyzer can detect overlap.
+It writes spans (via tracing.py) compatible with analyze_traces.py by emitting
+"{lane}:engage_llm" spans under one "run" span so the analyzer can detect overlap.
 
 Usage:
   python scripts/crew_ai/deterministic_bench.py --lanes 10 --work-ms 800
@@ -15,32 +15,26 @@ Args:
 Outputs:
   - temp/otel/trace-dbench-<ts>.jsonl: spans with start/end per lane
   - Prints a short summary and hints to run the analyzer
+
+For the real llm_client HTTP/retry paths without network access, see stub_bench.py.
 """
 from __future__ import annotations
 import argparse
-import json
 import os
+import sys
 import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+from tracing import Span, get_tracer, iso_ns  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[2]
 OTEL_DIR = ROOT / "temp/otel"
-ISO = "%Y-%m-%dT%H:%M:%SZ"
-
-
-def now_z() -> str:
-    return datetime.now(timezone.utc).strftime(ISO)
-
-
-def write_span(trace_id: str, span: Dict) -> None:
-    OTEL_DIR.mkdir(parents=True, exist_ok=True)
-    out = OTEL_DIR / f"{trace_id}.jsonl"
-    with out.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(span, ensure_ascii=False) + "\n")
 
 
 @dataclass
@@ -61,37 +55,16 @@ def cpu_burn(ms: int) -> None:
         print("never")
 
 
-def lane_job(lane_name: str, trace_id: str, cfg: BenchCfg) -> Dict[str, str]:
+def lane_job(lane_name: str, trace_id: str, cfg: BenchCfg, parent: Span) -> Dict[str, str]:
     # Optional jitter
     jitter = int((cfg.jitter_ms or 0) * (0.5 - (hash(lane_name) % 100) / 100.0))
     work_ms = max(1, cfg.work_ms + jitter)
 
-    start_ts = now_z()
-    # Emit a start span with engage_llm name to be analyzer-compatible
-    span_id = f"{lane_name}-engage-llm-{int(time.time()*1000)}"
-    # Start span entry (we'll write full record after work with updated end_time)
-    # Do the work
-    cpu_burn(work_ms)
-    end_ts = now_z()
-
-    write_span(
-        trace_id,
-        {
-            "trace_id": trace_id,
-            "span_id": span_id,
-            "name": f"{lane_name}:engage_llm",
-            "start_time": start_ts,
-            "end_time": end_ts,
-            "attributes": {
-                "lane": lane_name,
-                "mission_id": "dbench",
-                "ok": True,
-                "model": None,
-                "latency_ms": work_ms,
-            },
-        },
-    )
-    return {"lane": lane_name, "start": start_ts, "end": end_ts}
+    # Span named engage_llm to be analyzer-compatible
+    attrs = {"lane": lane_name, "mission_id": "dbench", "ok": True, "model": None, "latency_ms": work_ms}
+    with get_tracer(trace_id, OTEL_DIR).span(f"{lane_name}:engage_llm", parent=parent, attributes=attrs) as span:
+        cpu_burn(work_ms)
+    return {"lane": lane_name, "start": iso_ns(span.start_ns), "end": iso_ns(span.end_ns)}
 
 
 def main() -> None:
@@ -103,12 +76,15 @@ def main() -> None:
 
     cfg = BenchCfg(lanes=max(1, args.lanes), work_ms=max(10, args.work_ms), jitter_ms=max(0, args.jitter_ms))
     trace_id = f"trace-dbench-{int(time.time()*1000)}"
+    tracer = get_tracer(trace_id, OTEL_DIR)
 
     results: List[Dict[str, str]] = []
-    with ThreadPoolExecutor(max_workers=cfg.lanes) as ex:
-        futs = {ex.submit(lane_job, f"lane_{i+1}", trace_id, cfg): i for i in range(cfg.lanes)}
-        for fut in as_completed(futs):
-            results.append(fut.result())
+    with tracer.span("run", attributes={"mission_id": "dbench", "lanes": cfg.lanes}) as root:
+        with ThreadPoolExecutor(max_workers=cfg.lanes) as ex:
+            futs = {ex.submit(lane_job, f"lane_{i+1}", trace_id, cfg, root): i for i in range(cfg.lanes)}
+            for fut in as_completed(futs):
+                results.append(fut.result())
+    tracer.flush()
 
     print(f"Deterministic bench complete: lanes={cfg.lanes}, work_ms≈{cfg.work_ms} (±{cfg.jitter_ms})")
     print(f"Trace written: temp/otel/{trace_id}.jsonl")
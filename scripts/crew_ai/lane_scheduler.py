@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Shared work-stealing scheduler for the swarm runners.
+
+Lanes no longer own a worker each. Every unit of work (one ARC question, one math
+problem) is a Task in one global queue, bucketed by model. A fixed pool of workers
+pulls the oldest task whose model is under its concurrency cap (round-robin across
+models), so a worker that finished its own lane's share simply picks up whatever
+is left: a slow model or a retrying lane no longer leaves the rest of the pool idle
+at the tail of a run.
+
+Retries are new tasks: when `retry(value)` says so, the task is re-enqueued at the
+back of its model's queue with attempt + 1 instead of blocking a worker. Completion
+callbacks run on the worker that finished the task and may submit follow-up work
+(e.g. the next lane attempt). run() returns the final TaskResult of every task
+grouped per lane, in submission order, which is what the digests expect.
+
+  sched = WorkStealingScheduler(workers=16, model_caps={"openai/gpt-oss-20b": 4})
+  for i in indices:
+      sched.submit(lane, i, ask, i, model=model_hint, retry=lambda r: not r.get("ok"), max_attempts=2)
+  by_lane = sched.run()          # {lane: [TaskResult, ...]}
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class Task:
+    lane: str
+    key: Hashable
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    model: Optional[str] = None
+    attempt: int = 1
+    max_attempts: int = 1
+    retry: Optional[Callable[[Any], bool]] = None
+    callback: Optional[Callable[["TaskResult"], None]] = None
+    seq: int = 0
+
+
+@dataclass
+class TaskResult:
+    lane: str
+    key: Hashable
+    model: Optional[str]
+    attempt: int
+    value: Any = None
+    error: Optional[BaseException] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    worker: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class WorkStealingScheduler:
+    """Global task queue with per-model concurrency caps and retry-as-new-task."""
+
+    def __init__(
+        self,
+        workers: int,
+        *,
+        model_caps: Optional[Dict[Optional[str], int]] = None,
+        default_cap: Optional[int] = None,
+        name: str = "lane-sched",
+    ) -> None:
+        self.workers = max(1, int(workers))
+        self.model_caps = dict(model_caps or {})
+        self.default_cap = default_cap if default_cap and default_cap > 0 else None
+        self.name = name
+        self._queues: Dict[Optional[str], Deque[Task]] = {}
+        self._order: List[Optional[str]] = []  # round-robin over models
+        self._rr = 0
+        self._in_flight: Dict[Optional[str], int] = {}
+        self._busy = 0
+        self._queued = 0
+        self._seq = itertools.count()
+        self._results: Dict[Tuple[str, Hashable], TaskResult] = {}
+        self._lane_order: Dict[str, List[Tuple[int, Hashable]]] = {}
+        self._cond = threading.Condition()
+        self._error: Optional[BaseException] = None
+        self.retries = 0
+
+    def _cap(self, model: Optional[str]) -> Optional[int]:
+        cap = self.model_caps.get(model, self.default_cap)
+        return cap if cap and cap > 0 else None
+
+    def submit(
+        self,
+        lane: str,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args: Any,
+        model: Optional[str] = None,
+        retry: Optional[Callable[[Any], bool]] = None,
+        max_attempts: int = 1,
+        callback: Optional[Callable[[TaskResult], None]] = None,
+    ) -> None:
+        """Queue ``fn(*args)`` for ``lane``; safe to call from callbacks while running."""
+        task = Task(lane, key, fn, args, model, 1, max(1, max_attempts), retry, callback, next(self._seq))
+        with self._cond:
+            self._lane_order.setdefault(lane, []).append((task.seq, key))
+            self._enqueue(task)
+
+    def _enqueue(self, task: Task) -> None:
+        q = self._queues.get(task.model)
+        if q is None:
+            q = self._queues[task.model] = deque()
+            self._order.append(task.model)
+            self._in_flight.setdefault(task.model, 0)
+        q.append(task)
+        self._queued += 1
+        self._cond.notify()
+
+    def _next_task(self) -> Optional[Task]:
+        """Oldest runnable task, scanning models round-robin from the last pick (lock held)."""
+        n = len(self._order)
+        for i in range(n):
+            model = self._order[(self._rr + i) % n]
+            q = self._queues[model]
+            if not q:
+                continue
+            cap = self._cap(model)
+            if cap is not None and self._in_flight[model] >= cap:
+                continue
+            self._rr = (self._rr + i + 1) % n
+            self._queued -= 1
+            self._in_flight[model] += 1
+            self._busy += 1
+            return q.popleft()
+        return None
+
+    def _worker(self) -> None:
+        me = threading.current_thread().name
+        while True:
+            with self._cond:
+                while True:
+                    if self._error is not None:
+                        return
+                    task = self._next_task()
+                    if task is not None:
+                        break
+                    if self._queued == 0 and self._busy == 0:
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait()
+            res = TaskResult(task.lane, task.key, task.model, task.attempt, worker=me)
+            res.start_ns = time.monotonic_ns()
+            try:
+                res.value = task.fn(*task.args)
+            except Exception as e:  # recorded on the result; callers decide
+                res.error = e
+            res.end_ns = time.monotonic_ns()
+            again = False
+            if task.attempt < task.max_attempts:
+                try:
+                    again = res.error is not None or bool(task.retry and task.retry(res.value))
+                except Exception:
+                    again = False
+            run_callback = not again and task.callback is not None
+            with self._cond:
+                self._in_flight[task.model] -= 1
+                if not run_callback:
+                    self._busy -= 1  # otherwise stays busy: the callback may submit more work
+                if again:
+                    self.retries += 1
+                    task.attempt += 1
+                    self._enqueue(task)
+                else:
+                    self._results[(task.lane, task.key)] = res
+                self._cond.notify_all()
+            if run_callback:
+                try:
+                    task.callback(res)
+                except BaseException as e:
+                    with self._cond:
+                        self._error = self._error or e
+                finally:
+                    with self._cond:
+                        self._busy -= 1
+                        self._cond.notify_all()
+
+    def run(self) -> Dict[str, List[TaskResult]]:
+        """Drain the queue (including work submitted by callbacks); results grouped per lane."""
+        threads = [
+            threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self._error is not None:
+            raise self._error
+        out: Dict[str, List[TaskResult]] = {}
+        for lane, keys in self._lane_order.items():
+            out[lane] = [self._results[(lane, key)] for _, key in sorted(keys, key=lambda sk: sk[0]) if (lane, key) in self._results]
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "retries": self.retries, "tasks": len(self._results)}
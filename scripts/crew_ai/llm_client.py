@@ -15,11 +15,21 @@ Environment variables:
 - OPENROUTER_MAX_TOKENS: optional int, overrides max_tokens if set
 - OPENROUTER_TEMPERATURE: optional float, overrides temperature if set
 - OPENROUTER_TIMEOUT_SECONDS: optional int, overrides timeout if set
+- OPENROUTER_ADAPTIVE_TIMEOUT: optional bool, derive per-attempt timeout from the model's observed p99
+- OPENROUTER_HEDGE: optional bool, send a duplicate request once the model's p95 deadline passes
+- OPENROUTER_HEDGE_MAX_RATE: optional float, cap on hedged/total requests per model (default 0.05)
+- OPENROUTER_BATCH_MODE: optional, "pipelined" (default) or "multi_prompt" for call_openrouter_batch
+- OPENROUTER_BATCH_MAX_IN_FLIGHT: optional int, concurrent requests for call_openrouter_batch (default 8)
+- OPENROUTER_PRICE_DEFAULT_PER_1K / OPENROUTER_PRICE_<MODEL>_PER_1K: optional USD pricing for cost estimates
 """
 from __future__ import annotations
 import os
+import re
+import threading
 import time
-from typing import Any, Dict, Optional, List
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional, List, Sequence, Tuple, Union
 
 import requests
 
@@ -73,6 +83,189 @@ def _should_force_no_response_format(model: str) -> bool:
     return any(f in m for f in filters)
 
 
+def _sanitize_model_env_key(model: str) -> str:
+    # OPENROUTER_PRICE_<SANITIZED>_PER_1K
+    key = re.sub(r"[^A-Za-z0-9]+", "_", str(model)).upper().strip("_")
+    return f"OPENROUTER_PRICE_{key}_PER_1K"
+
+
+def _price_per_1k(model: str) -> float | None:
+    # Env-based pricing; avoids inventing numbers. Use OPENROUTER_PRICE_DEFAULT_PER_1K for fallback.
+    specific = os.environ.get(_sanitize_model_env_key(model))
+    if specific:
+        try:
+            return float(specific)
+        except Exception:
+            pass
+    default = os.environ.get("OPENROUTER_PRICE_DEFAULT_PER_1K")
+    if default:
+        try:
+            return float(default)
+        except Exception:
+            pass
+    return None
+
+
+# --- Tail-latency controls: per-model latency histograms, adaptive timeouts, hedging ---
+
+LATENCY_WINDOW = 512          # recent successful latencies kept per model
+LATENCY_MIN_SAMPLES = 20      # below this, fall back to the fixed timeout and never hedge
+ADAPTIVE_TIMEOUT_FACTOR = 1.5  # timeout = p99 * factor, clamped to [floor, fixed timeout]
+ADAPTIVE_TIMEOUT_FLOOR_S = 2.0
+
+
+class LatencyHistogram:
+    """Thread-safe rolling window of one model's successful request latencies (ms)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+
+    def record(self, latency_ms: int) -> None:
+        with self._lock:
+            self._samples.append(int(latency_ms))
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if len(ordered) < LATENCY_MIN_SAMPLES:
+            return None
+        rank = max(1, -(-int(q) * len(ordered) // 100))
+        return float(ordered[min(rank, len(ordered)) - 1])
+
+    def hedge_rate(self) -> float:
+        with self._lock:
+            return (self.hedges / self.requests) if self.requests else 0.0
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_take_hedge(self, max_rate: float) -> bool:
+        # Hedges are budgeted against requests seen so far, so the rate never exceeds max_rate
+        with self._lock:
+            if self.hedges + 1 > max_rate * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+
+_HISTOGRAMS: Dict[str, LatencyHistogram] = {}
+_HISTOGRAMS_LOCK = threading.Lock()
+
+
+def latency_histogram(model: str) -> LatencyHistogram:
+    with _HISTOGRAMS_LOCK:
+        h = _HISTOGRAMS.get(model)
+        if h is None:
+            h = _HISTOGRAMS[model] = LatencyHistogram()
+        return h
+
+
+def _start_post(url: str, body: Dict[str, Any], headers: Dict[str, str], timeout: float) -> Future:
+    """
+    Run one POST on a thread of its own. A shared pool would queue requests once the
+    callers outnumber its workers, and time spent queued would count against the p95
+    hedge deadline. The future's result is (response, latency_ms).
+    """
+    fut: Future = Future()
+
+    def run() -> None:
+        t0 = time.time()
+        try:
+            resp = requests.post(url, json=body, headers=headers, timeout=timeout)
+        except BaseException as e:
+            fut.set_exception(e)
+        else:
+            fut.set_result((resp, int((time.time() - t0) * 1000)))
+
+    threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+    return fut
+
+
+def _record_loser(hist: LatencyHistogram, fut: Future) -> None:
+    # The slower request of a hedge still measures the provider's tail; dropping it
+    # would bias p95 (and so the hedge deadline) low
+    def done(f: Future) -> None:
+        if f.exception() is None:
+            resp, latency_ms = f.result()
+            if resp.status_code == 200:
+                hist.record(latency_ms)
+
+    fut.add_done_callback(done)
+
+
+def _env_flag(name: str) -> Optional[bool]:
+    raw = os.environ.get(name)
+    if raw is None:
+        return None
+    return str(raw).lower() in {"1", "true", "yes"}
+
+
+def _adaptive_timeout(hist: LatencyHistogram, fixed_timeout: float) -> float:
+    p99 = hist.percentile(99)
+    if p99 is None:
+        return float(fixed_timeout)
+    return max(ADAPTIVE_TIMEOUT_FLOOR_S, min(float(fixed_timeout), p99 * ADAPTIVE_TIMEOUT_FACTOR / 1000.0))
+
+
+def _post(
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+    timeout: float,
+    hist: LatencyHistogram,
+    hedge: bool,
+    hedge_max_rate: float,
+) -> Tuple[Any, bool]:
+    """
+    POST once, or hedge: if no response by the model's p95 (and the hedge budget
+    allows), fire a duplicate and return whichever completes first. The loser is
+    left to finish on its own timeout and its latency is recorded in hist.
+    Returns (response, hedged).
+    """
+    hist.count_request()
+    p95 = hist.percentile(95) if hedge else None
+    if p95 is None or p95 / 1000.0 >= timeout:
+        return requests.post(url, json=payload, headers=headers, timeout=timeout), False
+
+    body = dict(payload)  # snapshot: retries mutate payload after we return
+    primary = _start_post(url, body, headers, timeout)
+    done, _ = wait([primary], timeout=p95 / 1000.0)
+    if done or not hist.try_take_hedge(hedge_max_rate):
+        return primary.result()[0], False
+    backup = _start_post(url, body, headers, timeout)
+    pending = {primary, backup}
+    last_exc: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            exc = fut.exception()
+            if exc is None:
+                for loser in pending:
+                    _record_loser(hist, loser)
+                return fut.result()[0], True
+            last_exc = exc
+    assert last_exc is not None
+    raise last_exc
+
+
+def _headers(api_key: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        # Identify this client conservatively (optional but helpful)
+        "HTTP-Referer": "https://github.com/tommytai3/HiveFleetObsidian",
+        "X-Title": "HFO Crew AI Pilot",
+    }
+
+
 def _diag_write(event: dict) -> None:
     if not DIAG_DIR:
         return
@@ -160,6 +353,9 @@ def call_openrouter(
     retry_on_empty: bool = False,
     retry_max: int = 1,
     retry_alt_format: bool = True,
+    # Tail latency (None = read OPENROUTER_ADAPTIVE_TIMEOUT / OPENROUTER_HEDGE)
+    adaptive_timeout: Optional[bool] = None,
+    hedge: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
     Make a single, bounded LLM call. Returns a result dict with shape:
@@ -170,7 +366,12 @@ def call_openrouter(
       "content": str | None,
       "error": str | None,
       "status_code": int | None,
+      "timeout_seconds": float,   # last per-attempt timeout applied
+      "hedged": bool,             # a duplicate request was fired for some attempt
+      "hedge_rate": float,        # hedged/total requests for this model in-process
     }
+    timeout_seconds is the upper bound; with adaptive_timeout the per-attempt
+    timeout shrinks toward the model's observed p99 once enough samples exist.
     """
     api_key = os.environ.get("OPENROUTER_API_KEY")
     if not api_key:
@@ -191,13 +392,7 @@ def call_openrouter(
     temperature = _coerce_float(os.environ.get("OPENROUTER_TEMPERATURE"), temperature)
     timeout_seconds = _coerce_int(os.environ.get("OPENROUTER_TIMEOUT_SECONDS"), timeout_seconds)
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        # Identify this client conservatively (optional but helpful)
-        "HTTP-Referer": "https://github.com/tommytai3/HiveFleetObsidian",
-        "X-Title": "HFO Crew AI Pilot",
-    }
+    headers = _headers(api_key)
     payload: Dict[str, Any] = {
         "model": model,
         "messages": [
@@ -231,15 +426,26 @@ def call_openrouter(
     if enable_reasoning and any(m in model for m in REASONING_MODELS):
         payload["reasoning"] = {"effort": reasoning_effort}
 
+    if adaptive_timeout is None:
+        adaptive_timeout = bool(_env_flag("OPENROUTER_ADAPTIVE_TIMEOUT"))
+    if hedge is None:
+        hedge = bool(_env_flag("OPENROUTER_HEDGE"))
+    hedge_max_rate = _coerce_float(os.environ.get("OPENROUTER_HEDGE_MAX_RATE"), 0.05)
+    hist = latency_histogram(model)
+
     attempts = 0
     last_error: Optional[str] = None
     total_latency = 0
     reasoning_removed_on_retry = False
+    hedged_any = False
+    attempt_timeout: float = float(timeout_seconds)
     while True:
         attempts += 1
+        attempt_timeout = _adaptive_timeout(hist, timeout_seconds) if adaptive_timeout else float(timeout_seconds)
         t0 = time.time()
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=timeout_seconds)
+            resp, hedged_now = _post(url, payload, headers, attempt_timeout, hist, hedge, hedge_max_rate)
+            hedged_any = hedged_any or hedged_now
             latency_ms = int((time.time() - t0) * 1000)
             total_latency += latency_ms
         except requests.RequestException as e:
@@ -263,6 +469,9 @@ def call_openrouter(
                 "reasoning_enabled": False,
                 "reasoning_effort": None,
                 "reasoning_removed_on_retry": reasoning_removed_on_retry,
+                "timeout_seconds": attempt_timeout,
+                "hedged": hedged_any,
+                "hedge_rate": hist.hedge_rate(),
             }
 
         if resp.status_code != 200:
@@ -285,8 +494,12 @@ def call_openrouter(
                 "reasoning_enabled": False,
                 "reasoning_effort": None,
                 "reasoning_removed_on_retry": reasoning_removed_on_retry,
+                "timeout_seconds": attempt_timeout,
+                "hedged": hedged_any,
+                "hedge_rate": hist.hedge_rate(),
             }
 
+        hist.record(latency_ms)
         usage = None
         raw_len = None
         try:
@@ -344,4 +557,235 @@ def call_openrouter(
             "reasoning_enabled": reasoning_enabled_flag,
             "reasoning_effort": reasoning_effort_used,
             "reasoning_removed_on_retry": reasoning_removed_on_retry,
+            "timeout_seconds": attempt_timeout,
+            "hedged": hedged_any,
+            "hedge_rate": hist.hedge_rate(),
+        }
+
+
+# Per-item keys accepted by call_openrouter_batch (everything else is ignored)
+_BATCH_ITEM_KEYS = (
+    "model_hint",
+    "max_tokens",
+    "temperature",
+    "timeout_seconds",
+    "response_format_type",
+    "system_prompt",
+    "enable_reasoning",
+    "reasoning_effort",
+    "retry_on_empty",
+    "retry_max",
+    "retry_alt_format",
+)
+
+
+# call_openrouter behaviour the packed /completions path cannot reproduce; items that
+# set any of these are always sent pipelined
+_UNPACKABLE_ITEM_KEYS = (
+    "response_format_type",
+    "enable_reasoning",
+    "reasoning_effort",
+    "retry_on_empty",
+    "retry_max",
+    "retry_alt_format",
+)
+
+
+def _packable(params: Dict[str, Any]) -> bool:
+    return not any(k in params for k in _UNPACKABLE_ITEM_KEYS)
+
+
+def _usage_tokens(usage: Any) -> int:
+    try:
+        return int((usage or {}).get("total_tokens") or 0)
+    except Exception:
+        return 0
+
+
+def _multi_prompt_call(
+    prompts: List[str],
+    params: Dict[str, Any],
+    api_key: str,
+) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """
+    Pack prompts into one OpenAI-compatible /completions request (prompt as a list).
+    Returns (per-prompt results, request total_tokens) or None when the provider
+    rejects the shape or leaves any prompt unanswered or empty, so callers can fall back.
+    """
+    model = _select_model(params.get("model_hint"))
+    system = params.get("system_prompt")
+    payload: Dict[str, Any] = {
+        "model": model,
+        "prompt": [f"{system}\n\n{p}" if system else p for p in prompts],
+        "max_tokens": _coerce_int(os.environ.get("OPENROUTER_MAX_TOKENS"), int(params.get("max_tokens", 96))),
+        "temperature": _coerce_float(os.environ.get("OPENROUTER_TEMPERATURE"), float(params.get("temperature", 0.2))),
+    }
+    timeout_seconds = _coerce_int(os.environ.get("OPENROUTER_TIMEOUT_SECONDS"), int(params.get("timeout_seconds", 25)))
+    url = f"{DEFAULT_BASE_URL.rstrip('/')}/completions"
+    t0 = time.time()
+    try:
+        resp = requests.post(url, json=payload, headers=_headers(api_key), timeout=timeout_seconds)
+    except requests.RequestException:
+        return None
+    latency_ms = int((time.time() - t0) * 1000)
+    if resp.status_code != 200:
+        return None
+    try:
+        data = resp.json()
+    except Exception:
+        return None
+    by_index: Dict[int, str] = {}
+    for pos, ch in enumerate(data.get("choices") or []):
+        if not isinstance(ch, dict):
+            continue
+        idx = ch.get("index", pos)
+        txt = ch.get("text")
+        if isinstance(idx, int) and isinstance(txt, str) and txt.strip():
+            by_index[idx] = txt.strip()
+    if set(by_index) != set(range(len(prompts))):
+        return None
+    results = [
+        {
+            "ok": True,
+            "model": model,
+            "latency_ms": latency_ms,
+            "content": by_index[i],
+            "error": None,
+            "status_code": resp.status_code,
+            "usage": None,  # usage is reported once per request; see batch total_tokens
+            "reasoning_enabled": False,
+            "reasoning_effort": None,
+            "reasoning_removed_on_retry": False,
+            "timeout_seconds": float(timeout_seconds),
+            "hedged": False,
+            "batched": True,
         }
+        for i in range(len(prompts))
+    ]
+    return results, _usage_tokens(data.get("usage"))
+
+
+def call_openrouter_batch(
+    items: Sequence[Union[str, Dict[str, Any]]],
+    *,
+    mode: Optional[str] = None,
+    max_in_flight: Optional[int] = None,
+    chunk_size: int = 16,
+    **defaults: Any,
+) -> Dict[str, Any]:
+    """
+    Submit many independent prompts with as few round-trips as the provider allows.
+
+    items: prompt strings, or dicts {"prompt": str, **call_openrouter kwargs} for
+    per-item overrides (e.g. a sweep over max_tokens/temperature). ``defaults``
+    are call_openrouter kwargs applied to every item.
+
+    mode "multi_prompt" packs items that share a model and parameters into
+    /completions requests of up to ``chunk_size`` prompts; any chunk the provider
+    does not answer in full is re-sent pipelined. Items that set response_format_type,
+    reasoning or retry options are always sent pipelined, as a packed request cannot
+    honour them. mode "pipelined" (default) runs call_openrouter concurrently; either
+    way at most ``max_in_flight`` requests are open at once.
+
+    Returns:
+    {
+      "ok": bool,                 # every item ok
+      "mode": str,
+      "results": [ {call_openrouter result..., "index": int, "batched": bool} ],
+      "requests": int,            # HTTP round-trips issued (excluding client retries)
+      "latency_ms": int,          # wall clock for the whole batch
+      "total_tokens": int,
+      "est_cost": float | None,   # via _price_per_1k env pricing
+    }
+    """
+    mode = (mode or os.environ.get("OPENROUTER_BATCH_MODE") or "pipelined").strip().lower()
+    max_in_flight = max(1, int(max_in_flight or _coerce_int(os.environ.get("OPENROUTER_BATCH_MAX_IN_FLIGHT"), 8)))
+    chunk_size = max(1, int(chunk_size))
+
+    norm: List[Tuple[str, Dict[str, Any]]] = []
+    for it in items:
+        if isinstance(it, str):
+            norm.append((it, dict(defaults)))
+        else:
+            params = dict(defaults)
+            params.update({k: v for k, v in it.items() if k in _BATCH_ITEM_KEYS})
+            norm.append((str(it.get("prompt", "")), params))
+
+    t0 = time.time()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(norm)
+    tokens_by_model: Dict[str, int] = {}
+    requests_made = 0
+    pending: List[int] = list(range(len(norm)))
+    chunks: List[List[int]] = []
+
+    api_key = os.environ.get("OPENROUTER_API_KEY")
+    if mode == "multi_prompt" and api_key:
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        pending = []
+        for i, (_, params) in enumerate(norm):
+            if not _packable(params):
+                pending.append(i)
+                continue
+            key = (_select_model(params.get("model_hint")),) + tuple(repr(params.get(k)) for k in _BATCH_ITEM_KEYS[1:])
+            groups.setdefault(key, []).append(i)
+        for idxs in groups.values():
+            chunks.extend(idxs[start:start + chunk_size] for start in range(0, len(idxs), chunk_size))
+
+    def one(i: int) -> Dict[str, Any]:
+        prompt, params = norm[i]
+        r = call_openrouter(prompt, **params)
+        r["batched"] = False
+        return r
+
+    if chunks or pending:
+        # Packed chunks and single calls share one bounded pool; a chunk that comes back
+        # unanswered is re-sent item by item through the same pool
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks) + len(pending))) as ex:
+            futures: Dict[Any, Tuple[str, Any]] = {}
+            for chunk in chunks:
+                prompts = [norm[i][0] for i in chunk]
+                futures[ex.submit(_multi_prompt_call, prompts, norm[chunk[0]][1], api_key)] = ("chunk", chunk)
+            for i in pending:
+                futures[ex.submit(one, i)] = ("one", i)
+            requests_made += len(futures)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    kind, target = futures.pop(fut)
+                    if kind == "one":
+                        results[target] = fut.result()
+                        continue
+                    packed = fut.result()
+                    if packed is None:
+                        for i in target:
+                            futures[ex.submit(one, i)] = ("one", i)
+                        requests_made += len(target)
+                        continue
+                    chunk_results, chunk_tokens = packed
+                    m = chunk_results[0]["model"]
+                    tokens_by_model[m] = tokens_by_model.get(m, 0) + chunk_tokens
+                    for i, r in zip(target, chunk_results):
+                        results[i] = r
+
+    final: List[Dict[str, Any]] = []
+    for i, r in enumerate(results):
+        r = dict(r or {})
+        r["index"] = i
+        m = r.get("model") or ""
+        tokens_by_model[m] = tokens_by_model.get(m, 0) + _usage_tokens(r.get("usage"))
+        final.append(r)
+    est_cost: Optional[float] = None
+    for m, toks in tokens_by_model.items():
+        price = _price_per_1k(m)
+        if price is not None and toks:
+            est_cost = (est_cost or 0.0) + (toks / 1000.0) * price
+
+    return {
+        "ok": bool(final) and all(bool(r.get("ok")) for r in final),
+        "mode": mode,
+        "results": final,
+        "requests": requests_made,
+        "latency_ms": int((time.time() - t0) * 1000),
+        "total_tokens": sum(tokens_by_model.values()),
+        "est_cost": est_cost,
+    }
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Local, deterministic OpenAI-compatible stub server for offline LLM benchmarks.
+
+Serves POST /v1/chat/completions and POST /v1/completions (prompt string or list)
+on 127.0.0.1 with injected latency, HTTP errors, empty content and optional SSE
+streaming, so llm_client's transport, retry, empty-content and response_format
+paths can be exercised without network access or an API key.
+
+Usage:
+  # foreground server on a fixed port
+  python scripts/crew_ai/llm_stub_server.py --port 8799 --latency lognormal --latency-ms 200 --error-rate 0.02
+
+  # point any runner at it
+  OPENROUTER_API_KEY=stub OPENROUTER_BASE_URL=http://127.0.0.1:8799/v1 \
+    python scripts/crew_ai/swarm_math_runner.py --use-llm
+
+  # in-process (see stub_bench.py)
+  with StubServer(StubConfig(error_rate=0.05)) as srv:
+      os.environ["OPENROUTER_BASE_URL"] = srv.base_url
+
+Determinism: request N (in arrival order) draws from random.Random(f"{seed}:{N}"),
+so a given seed yields the same latency/error/empty sequence on every run.
+Replies are derived from the prompt (letter prompts -> a letter, arithmetic ->
+its value, JSON-answer prompts -> {"answer": <int>}).
+"""
+from __future__ import annotations
+import argparse
+import ast
+import json
+import math
+import operator
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+LATENCY_KINDS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class StubConfig:
+    latency: str = "lognormal"       # one of LATENCY_KINDS
+    latency_ms: float = 150.0        # fixed value / uniform mid / exponential mean / lognormal median
+    jitter: float = 0.5              # uniform half-width fraction or lognormal sigma
+    error_rate: float = 0.0          # fraction of requests answered with HTTP 503
+    empty_rate: float = 0.0          # fraction of 200s with empty content
+    seed: int = 0
+    reply: Optional[str] = None      # fixed reply text (overrides prompt-derived replies)
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    errors: int = 0
+    empty: int = 0
+    streamed: int = 0
+    prompts: int = 0                 # prompts answered (multi-prompt requests count each)
+    by_path: Dict[str, int] = field(default_factory=dict)
+    service_ms: List[float] = field(default_factory=list)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "empty": self.empty,
+            "streamed": self.streamed,
+            "prompts": self.prompts,
+            "by_path": dict(self.by_path),
+            "service_ms": list(self.service_ms),
+        }
+
+
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+
+
+def _safe_eval(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+        return _safe_eval(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_safe_eval(node.operand)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        left, right = _safe_eval(node.left), _safe_eval(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > 16:
+            raise ValueError("exponent too large")
+        return _BINOPS[type(node.op)](left, right)
+    raise ValueError("unsupported expression")
+
+
+def _arith(prompt: str) -> Optional[int]:
+    # Candidate expressions must not start inside a word (skips ids like mi_2025-10-30)
+    for m in re.finditer(r"(?<![\w.-])[-(\d][-+*/^().\d\s]*", prompt):
+        expr = m.group(0).replace("^", "**").strip().rstrip(".")
+        if not re.search(r"[\d)]\s*[-+*/]+\s*[\d(]", expr):
+            continue
+        try:
+            val = _safe_eval(ast.parse(expr, mode="eval"))
+        except Exception:
+            continue
+        if math.isfinite(val):
+            return int(val)
+    return None
+
+
+def stub_reply(prompt: str) -> str:
+    """Deterministic reply derived from the prompt text."""
+    p = prompt or ""
+    if re.search(r"letter only", p, re.IGNORECASE):
+        labels = re.findall(r"^([A-Z])\)", p, re.MULTILINE)
+        return labels[0] if labels else "A"
+    val = _arith(p)
+    if val is not None:
+        return json.dumps({"answer": val}) if "json" in p.lower() else str(val)
+    return "Stub reply: mission restated; safety posture acknowledged."
+
+
+class StubServer:
+    """Threaded stub server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        if config is not None and config.latency not in LATENCY_KINDS:
+            raise ValueError(f"latency must be one of {LATENCY_KINDS}")
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.stats.snapshot()
+
+    # --- request handling ---
+
+    def _next_rng(self, path: str) -> random.Random:
+        with self._lock:
+            n = self.stats.requests
+            self.stats.requests += 1
+            self.stats.by_path[path] = self.stats.by_path.get(path, 0) + 1
+        return random.Random(f"{self.config.seed}:{n}")
+
+    def _latency_s(self, rnd: random.Random) -> float:
+        c = self.config
+        base = max(0.0, c.latency_ms)
+        if c.latency == "fixed":
+            ms = base
+        elif c.latency == "uniform":
+            ms = rnd.uniform(base * (1 - c.jitter), base * (1 + c.jitter))
+        elif c.latency == "exponential":
+            ms = rnd.expovariate(1.0 / base) if base > 0 else 0.0
+        else:
+            ms = rnd.lognormvariate(math.log(base), c.jitter) if base > 0 else 0.0
+        return max(0.0, ms) / 1000.0
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt: str, *args: Any) -> None:  # keep benchmarks quiet
+                return
+
+            def _send_json(self, code: int, body: Dict[str, Any]) -> None:
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self) -> None:  # noqa: N802 (http.server naming)
+                t0 = time.perf_counter()
+                path = self.path.split("?", 1)[0].rstrip("/")
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except Exception:
+                    payload = {}
+                if path not in ("/v1/chat/completions", "/v1/completions"):
+                    self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+                    return
+                rnd = server._next_rng(path)
+                time.sleep(server._latency_s(rnd))
+                cfg = server.config
+                if rnd.random() < cfg.error_rate:
+                    with server._lock:
+                        server.stats.errors += 1
+                        server.stats.service_ms.append((time.perf_counter() - t0) * 1000.0)
+                    self._send_json(503, {"error": {"message": "stub: injected provider error"}})
+                    return
+                empty = rnd.random() < cfg.empty_rate
+                model = str(payload.get("model") or "stub/model")
+                if path == "/v1/completions":
+                    prompts = payload.get("prompt")
+                    prompts = prompts if isinstance(prompts, list) else [prompts or ""]
+                    texts = ["" if empty else (cfg.reply or stub_reply(str(p))) for p in prompts]
+                    choices = [{"index": i, "text": t, "finish_reason": "stop"} for i, t in enumerate(texts)]
+                else:
+                    messages = payload.get("messages") or []
+                    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+                    texts = ["" if empty else (cfg.reply or stub_reply(str(user)))]
+                    choices = [{"index": 0, "message": {"role": "assistant", "content": texts[0]}, "finish_reason": "stop"}]
+                tokens = sum(max(1, len(t) // 4) for t in texts)
+                with server._lock:
+                    server.stats.prompts += len(texts)
+                    server.stats.empty += len(texts) if empty else 0
+                    server.stats.streamed += 1 if payload.get("stream") else 0
+                    server.stats.service_ms.append((time.perf_counter() - t0) * 1000.0)
+                if payload.get("stream") and path == "/v1/chat/completions":
+                    self._stream(model, texts[0])
+                    return
+                self._send_json(200, {
+                    "id": f"stub-{int(time.time() * 1000)}",
+                    "object": "chat.completion" if path.endswith("chat/completions") else "text_completion",
+                    "model": model,
+                    "choices": choices,
+                    "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+                })
+
+            def _stream(self, model: str, text: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                words = text.split(" ") if text else [""]
+                for i, w in enumerate(words):
+                    piece = w if i == 0 else " " + w
+                    chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                done = {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Deterministic OpenAI-compatible LLM stub server (offline)")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8799)
+    ap.add_argument("--latency", type=str, default="lognormal", choices=list(LATENCY_KINDS))
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    ap.add_argument("--jitter", type=float, default=0.5, help="Uniform half-width fraction or lognormal sigma")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--empty-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--reply", type=str, default=None, help="Fixed reply text instead of prompt-derived replies")
+    args = ap.parse_args()
+
+    cfg = StubConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        empty_rate=args.empty_rate,
+        seed=args.seed,
+        reply=args.reply,
+    )
+    srv = StubServer(cfg, host=args.host, port=args.port)
+    print(f"LLM stub listening on {srv.base_url} (latency={cfg.latency}:{cfg.latency_ms}ms error_rate={cfg.error_rate} empty_rate={cfg.empty_rate})")
+    try:
+        srv._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
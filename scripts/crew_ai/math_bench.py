@@ -5,6 +5,9 @@ Keeps token/cost low and produces a simple accuracy summary.
 
 Usage:
   OPENROUTER_MODEL_HINT=openai/gpt-oss-120b python scripts/crew_ai/math_bench.py
+
+All problems are submitted in one call_openrouter_batch; set OPENROUTER_BATCH_MODE=multi_prompt
+to pack them into a single provider request where supported.
 """
 from __future__ import annotations
 import re
@@ -14,9 +17,9 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 try:
-    from .llm_client import call_openrouter
+    from .llm_client import call_openrouter_batch
 except Exception:  # pragma: no cover - fallback for direct run
-    from llm_client import call_openrouter  # type: ignore
+    from llm_client import call_openrouter_batch  # type: ignore
 
 PROBLEMS: List[Tuple[str, int]] = [
     ("12 + 7 = ?", 19),
@@ -49,13 +52,13 @@ def main() -> None:
     correct = 0
     total = len(PROBLEMS)
     model_hint = os.environ.get("OPENROUTER_MODEL_HINT")
-    for q, ans in PROBLEMS:
-        res = call_openrouter(
-            f"Answer with just the integer. {q}",
-            model_hint=model_hint,
-            max_tokens=12,
-            temperature=0.0,
-        )
+    batch = call_openrouter_batch(
+        [f"Answer with just the integer. {q}" for q, _ in PROBLEMS],
+        model_hint=model_hint,
+        max_tokens=12,
+        temperature=0.0,
+    )
+    for (q, ans), res in zip(PROBLEMS, batch["results"]):
         got = None
         if res.get("ok") and res.get("content"):
             got = extract_int(res["content"])  # type: ignore[index]
@@ -65,6 +68,8 @@ def main() -> None:
         print(f"Q: {q} -> model={res.get('model')} got={got} expected={ans} ok={is_ok}")
     acc = correct / total if total else 0.0
     print(f"Accuracy: {correct}/{total} = {acc:.2%}")
+    cost = f"${batch['est_cost']:.4f}" if batch.get("est_cost") is not None else "n/a"
+    print(f"Batch: mode={batch['mode']} requests={batch['requests']} wall={batch['latency_ms']} ms tokens={batch['total_tokens']} est_cost={cost}")
 
 
 if __name__ == "__main__":
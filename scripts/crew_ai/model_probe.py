@@ -60,14 +60,14 @@ def probe_model(model_hint: str) -> Dict[str, Any]:
     ]
     results = []
     passes = 0
-    for q, expect in questions:
-        r = llm_client.call_openrouter(
-            q,
-            model_hint=model_hint,
-            max_tokens=16,
-            temperature=0.1,
-            timeout_seconds=20,
-        )
+    batch = llm_client.call_openrouter_batch(
+        [q for q, _ in questions],
+        model_hint=model_hint,
+        max_tokens=16,
+        temperature=0.1,
+        timeout_seconds=20,
+    )
+    for (q, expect), r in zip(questions, batch["results"]):
         ok_http = r.get("ok") and r.get("status_code") == 200
         raw = r.get("content")
         ok_parse, val = _parse_int(raw or "")
@@ -84,7 +84,16 @@ def probe_model(model_hint: str) -> Dict[str, Any]:
             "expect": expect,
         })
     status = "ok" if passes == 2 else ("partial" if passes == 1 else "fail")
-    return {"model": r.get("model"), "hint": model_hint, "status": status, "passes": passes, "probes": results}
+    return {
+        "model": r.get("model"),
+        "hint": model_hint,
+        "status": status,
+        "passes": passes,
+        "probes": results,
+        "requests": batch["requests"],
+        "total_tokens": batch["total_tokens"],
+        "est_cost": batch["est_cost"],
+    }
 
 
 def main() -> None:
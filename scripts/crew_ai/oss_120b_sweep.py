@@ -78,20 +78,27 @@ def parse_int(s: str) -> Tuple[bool, int | None]:
     return True, -val if neg else val
 
 
-def run_config(llm_client, prompt_kind: str, resp_fmt: str | None, max_tokens: int, temperature: float) -> Dict[str, Any]:
+def config_items(prompt_kind: str, resp_fmt: str | None, max_tokens: int, temperature: float) -> List[Dict[str, Any]]:
+    """Batch items (prompt + per-item call overrides) for one config's two probes."""
     q1, e1 = make_prompt(prompt_kind, 7, 5, "+")
     q2, e2 = make_prompt(prompt_kind, 81, 39, "-")
+    return [
+        {
+            "prompt": q,
+            "expect": exp,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format_type": resp_fmt,
+        }
+        for q, exp in [(q1, e1), (q2, e2)]
+    ]
+
+
+def run_config(prompt_kind: str, resp_fmt: str | None, max_tokens: int, temperature: float, items: List[Dict[str, Any]], responses: List[Dict[str, Any]]) -> Dict[str, Any]:
     results: List[Dict[str, Any]] = []
     passes = 0
-    for q, exp in [(q1, e1), (q2, e2)]:
-        r = llm_client.call_openrouter(
-            q,
-            model_hint="openai/gpt-oss-120b",
-            max_tokens=max_tokens,
-            temperature=temperature,
-            timeout_seconds=20,
-            response_format_type=resp_fmt,
-        )
+    for item, r in zip(items, responses):
+        exp = item["expect"]
         http_ok = bool(r.get("ok") and r.get("status_code") == 200)
         raw = r.get("content") or ""
         ok_parse, val = parse_int(raw)
@@ -129,12 +136,20 @@ def main() -> None:
     max_tokens_list = [16, 64]
     temps = [0.0, 0.2]
 
+    grid = [(pk, rf, mt, t) for pk in prompt_kinds for rf in resp_formats for mt in max_tokens_list for t in temps]
+    grid_items = [config_items(*g) for g in grid]
+    # One batch for the whole grid; per-item overrides carry each config's params
+    batch = llm_client.call_openrouter_batch(
+        [it for items in grid_items for it in items],
+        model_hint="openai/gpt-oss-120b",
+        timeout_seconds=20,
+    )
+    responses = batch["results"]
     configs: List[Dict[str, Any]] = []
-    for pk in prompt_kinds:
-        for rf in resp_formats:
-            for mt in max_tokens_list:
-                for t in temps:
-                    configs.append(run_config(llm_client, pk, rf, mt, t))
+    pos = 0
+    for g, items in zip(grid, grid_items):
+        configs.append(run_config(*g, items, responses[pos:pos + len(items)]))
+        pos += len(items)
 
     date_str = datetime.utcnow().strftime("%Y-%m-%d")
     ts = int(time.time() * 1000)
@@ -150,6 +165,8 @@ def main() -> None:
     lines.append(f"# OSS-120B Sweep — {date_str} ({ts})")
     lines.append("")
     lines.append("Prompt × response_format × max_tokens × temperature; each row runs 2 probes.")
+    cost = f"${batch['est_cost']:.4f}" if batch.get("est_cost") is not None else "n/a"
+    lines.append(f"Batch: mode={batch['mode']} requests={batch['requests']} wall={batch['latency_ms']} ms tokens={batch['total_tokens']} est_cost={cost}")
     lines.append("")
     lines.append("| prompt | resp_format | max_tokens | temp | status | passes | notes |")
     lines.append("|---|---|---:|---:|---|---:|---|")
@@ -5,14 +5,13 @@ Minimal Crew AI runner (pilot):
 - Runs 2 lanes (from intent) with PREY steps (Perceive→React→Engage→Yield)
 - Executes lane agents (Observer, Bridger, Shaper, Assimilator); then Immunizer + Disruptor
 - Appends receipts to blackboard JSONL
-- Writes simple OpenTelemetry-like spans (JSON) to temp/otel/
+- Writes nanosecond-resolution spans (run → lane → phase → agent/LLM) to temp/otel/ via tracing.py
 - Runs Verify with immunizer + disruptor, aggregate to PASS/FAIL
 
 Dependencies: PyYAML and python-dotenv. Optional: requests for OpenRouter LLM path.
 """
 from __future__ import annotations
 import argparse
-import json
 import os
 import sys
 import time
@@ -30,6 +29,11 @@ if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 from llm_client import call_openrouter, ALLOWLIST as MODEL_ALLOWLIST
 from agents import REGISTRY as AGENTS
+from tracing import Span, get_tracer
+from artifact_store import LaneArtifactStore, Schema
+if str(SCRIPT_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR.parent))
+from blackboard_logger import get_writer  # shared batched JSONL writer
 
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_INTENT = ROOT / "hfo_mission_intent/2025-10-30/mission_intent_daily_2025-10-30.v5.yml"
@@ -44,16 +48,7 @@ def now_z() -> str:
 
 
 def append_blackboard(entry: Dict[str, Any]) -> None:
-    BLACKBOARD.parent.mkdir(parents=True, exist_ok=True)
-    with BLACKBOARD.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-
-
-def write_span(trace_id: str, span: Dict[str, Any]) -> None:
-    OTEL_DIR.mkdir(parents=True, exist_ok=True)
-    out = OTEL_DIR / f"{trace_id}.jsonl"
-    with out.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(span, ensure_ascii=False) + "\n")
+    get_writer(BLACKBOARD).append(entry)
 
 
 def load_intent(path: Path) -> Dict[str, Any]:
@@ -61,77 +56,55 @@ def load_intent(path: Path) -> Dict[str, Any]:
         return yaml.safe_load(f)
 
 
-def _read_yaml(path: Path) -> Dict[str, Any]:
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-            return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
-
-
-def _validate_lane_artifacts(lane_out: Path) -> Dict[str, Any]:
-    """Validate that a lane has the four artifacts and minimal fields.
+# Lane artifacts and the minimal fields each must carry (checked in memory by LaneArtifactStore)
+REQUIRED_ARTIFACTS: Schema = {
+    "perception_snapshot.yml": [
+        ("mission_id", str),
+        ("lane", str),
+        ("timestamp", str),
+        ("trace_id", str),
+        ("safety", dict),
+        ("llm", dict),
+        ("paths", dict),
+    ],
+    "react_plan.yml": [
+        ("mission_id", str),
+        ("lane", str),
+        ("timestamp", str),
+        ("cynefin", dict),
+        ("approach", dict),
+    ],
+    "engage_report.yml": [
+        ("mission_id", str),
+        ("lane", str),
+        ("timestamp", str),
+        ("safety", dict),
+        ("llm", dict),
+    ],
+    "yield_summary.yml": [
+        ("mission_id", str),
+        ("lane", str),
+        ("timestamp", str),
+        ("collected_agents", list),
+        ("evidence_refs", list),
+    ],
+}
+
+
+def _validate_lane_artifacts(store: LaneArtifactStore) -> Dict[str, Any]:
+    """Validate that a lane has the four artifacts and minimal fields (in memory, no read-back).
     Returns { ok: bool, errors: [str] }.
     """
-    errors: List[str] = []
-    required = {
-        "perception_snapshot.yml": [
-            ("mission_id", str),
-            ("lane", str),
-            ("timestamp", str),
-            ("trace_id", str),
-            ("safety", dict),
-            ("llm", dict),
-            ("paths", dict),
-        ],
-        "react_plan.yml": [
-            ("mission_id", str),
-            ("lane", str),
-            ("timestamp", str),
-            ("cynefin", dict),
-            ("approach", dict),
-        ],
-        "engage_report.yml": [
-            ("mission_id", str),
-            ("lane", str),
-            ("timestamp", str),
-            ("safety", dict),
-            ("llm", dict),
-        ],
-        "yield_summary.yml": [
-            ("mission_id", str),
-            ("lane", str),
-            ("timestamp", str),
-            ("collected_agents", list),
-            ("evidence_refs", list),
-        ],
-    }
-
-    found_files: Dict[str, Dict[str, Any]] = {}
-    for fname, req_fields in required.items():
-        fp = lane_out / fname
-        if not fp.exists():
-            errors.append(f"missing_file:{fname}")
-            continue
-        data = _read_yaml(fp)
-        found_files[fname] = data
-        for key, typ in req_fields:
-            val = data.get(key)
-            if val is None or (typ is list and not isinstance(val, list)) or (typ is dict and not isinstance(val, dict)) or (typ is str and not isinstance(val, str)):
-                errors.append(f"missing_or_type:{fname}:{key}")
+    result = store.validate()
+    errors: List[str] = result["errors"]
 
     # Cross-check evidence_refs include core artifacts
-    ys = found_files.get("yield_summary.yml", {})
-    e_refs = ys.get("evidence_refs") or []
-    core_refs_ok = True
+    e_refs = store.get("yield_summary.yml").get("evidence_refs") or []
     for core in ("perception_snapshot.yml", "react_plan.yml", "engage_report.yml"):
         if not any(core in str(x) for x in e_refs):
-            core_refs_ok = False
             errors.append(f"evidence_missing:{core}")
 
-    ok = len(errors) == 0 and core_refs_ok
-    return {"ok": ok, "errors": errors}
+    return {"ok": len(errors) == 0, "errors": errors}
 
 
 def lane_prey_cycle(
@@ -140,10 +113,13 @@ def lane_prey_cycle(
     trace_id: str,
     model_hint: Optional[str] = None,
     run_dir: Optional[Path] = None,
+    parent_span: Optional[Span] = None,
 ) -> Dict[str, Any]:
     mission_id = mission.get("mission_id", f"mi_{now_z()}")
     safety = mission.get("safety", {})
     telemetry = mission.get("telemetry", {})
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    lane_span = tracer.start_span(lane_name, parent=parent_span, attributes={"lane": lane_name, "mission_id": mission_id, "model_hint": model_hint})
 
     phases = [
         ("perceive", "Perception snapshot collected"),
@@ -158,6 +134,7 @@ def lane_prey_cycle(
     base_dir = run_dir if run_dir is not None else (ROOT / "temp" / "crew_ai_runs")
     lane_out = base_dir / str(lane_name) / "attempt_1"
     lane_out.mkdir(parents=True, exist_ok=True)
+    store = LaneArtifactStore(lane_out, REQUIRED_ARTIFACTS)
 
     for phase, summary in phases:
         ts = now_z()
@@ -175,20 +152,16 @@ def lane_prey_cycle(
             "chunk_id": {"index": 1, "total": 1},
         }
         append_blackboard(entry)
-        span = {
-            "trace_id": trace_id,
-            "span_id": f"{lane_name}-{phase}-{int(time.time()*1000)}",
-            "name": f"{lane_name}:{phase}",
-            "start_time": ts,
-            "end_time": ts,
-            "attributes": {
+        phase_span = tracer.start_span(
+            f"{lane_name}:{phase}",
+            parent=lane_span,
+            attributes={
                 "lane": lane_name,
                 "phase": phase,
                 "mission_id": mission_id,
                 "otel": telemetry.get("emit_opentelemetry", True),
             },
-        }
-        write_span(trace_id, span)
+        )
         evidence.append(f"lane={lane_name}:{phase}")
         phases_seen.append(phase)
 
@@ -225,9 +198,7 @@ def lane_prey_cycle(
                         "lane_dir": str(lane_out.relative_to(ROOT)) if lane_out.is_relative_to(ROOT) else str(lane_out),
                     },
                 }
-                snap_path = lane_out / "perception_snapshot.yml"
-                with snap_path.open("w", encoding="utf-8") as f:
-                    yaml.safe_dump(snapshot, f, sort_keys=False)
+                snap_path = store.put("perception_snapshot.yml", snapshot)
                 # Log a focused receipt referencing the snapshot
                 append_blackboard({
                     "mission_id": mission_id,
@@ -259,23 +230,11 @@ def lane_prey_cycle(
             if not agent:
                 continue
             ctx = {"mission": mission, "lane": lane_name, "phase": phase, "evidence": evidence, "flags": {"phases_seen": phases_seen}, "collected": collected, "model_hint": model_hint}
-            res = agent.run(ctx)
-            collected[role] = {"ok": res.ok, "summary": res.summary, "data": res.data, "llm_used": res.llm_used}
             # Span per agent
-            write_span(trace_id, {
-                "trace_id": trace_id,
-                "span_id": f"{lane_name}-{phase}-{role}-{int(time.time()*1000)}",
-                "name": f"{lane_name}:{phase}:{role}",
-                "start_time": ts,
-                "end_time": now_z(),
-                "attributes": {
-                    "lane": lane_name,
-                    "phase": phase,
-                    "role": role,
-                    "ok": res.ok,
-                    "llm_used": res.llm_used,
-                },
-            })
+            with tracer.span(f"{lane_name}:{phase}:{role}", parent=phase_span, attributes={"lane": lane_name, "phase": phase, "role": role}) as agent_span:
+                res = agent.run(ctx)
+                agent_span.set_attributes({"ok": res.ok, "llm_used": res.llm_used})
+            collected[role] = {"ok": res.ok, "summary": res.summary, "data": res.data, "llm_used": res.llm_used}
             append_blackboard({
                 "mission_id": mission_id,
                 "phase": phase,
@@ -323,9 +282,7 @@ def lane_prey_cycle(
                         "tools": ["observer", "bridger", "shaper", "assimilator"],
                     },
                 }
-                out = lane_out / "react_plan.yml"
-                with out.open("w", encoding="utf-8") as f:
-                    yaml.safe_dump(plan, f, sort_keys=False)
+                out = store.put("react_plan.yml", plan)
                 append_blackboard({
                     "mission_id": mission_id,
                     "phase": "react",
@@ -352,42 +309,30 @@ def lane_prey_cycle(
                 "Restate the mission's intent and safety posture briefly but completely: "
                 f"mission_id={mission_id}, safety={safety.get('tripwires', [])}."
             )
-            llm_result = call_openrouter(
-                prompt,
-                model_hint=model_hint_eff,
-                max_tokens=int(llm_cfg.get("max_tokens", 72)),
-                temperature=float(llm_cfg.get("temperature", 0.2)),
-                timeout_seconds=int(llm_cfg.get("timeout_seconds", 25)),
-                response_format_type=llm_cfg.get("response_format_type", "text"),
-                system_prompt=llm_cfg.get("system_prompt"),
-                # Pass-through; None allows client to auto-enable reasoning for supported models
-                enable_reasoning=llm_cfg.get("reasoning"),
-                reasoning_effort=llm_cfg.get("reasoning_effort"),
-            )
-
-            # Emit span for the LLM action (content not stored here to limit size)
-            write_span(
-                trace_id,
-                {
-                    "trace_id": trace_id,
-                    "span_id": f"{lane_name}-engage-llm-{int(time.time()*1000)}",
-                    "name": f"{lane_name}:engage_llm",
-                    "start_time": ts,
-                    "end_time": now_z(),
-                    "attributes": {
-                        "lane": lane_name,
-                        "mission_id": mission_id,
-                        "ok": llm_result.get("ok"),
-                        "model": llm_result.get("model"),
-                        "latency_ms": llm_result.get("latency_ms"),
-                        "status_code": llm_result.get("status_code"),
-                        "error": llm_result.get("error"),
-                        "reasoning_enabled": llm_result.get("reasoning_enabled"),
-                        "reasoning_effort": llm_result.get("reasoning_effort"),
-                        "reasoning_removed_on_retry": llm_result.get("reasoning_removed_on_retry"),
-                    },
-                },
-            )
+            # Span for the LLM action (content not stored here to limit size)
+            with tracer.span(f"{lane_name}:engage_llm", parent=phase_span, attributes={"lane": lane_name, "mission_id": mission_id}) as llm_span:
+                llm_result = call_openrouter(
+                    prompt,
+                    model_hint=model_hint_eff,
+                    max_tokens=int(llm_cfg.get("max_tokens", 72)),
+                    temperature=float(llm_cfg.get("temperature", 0.2)),
+                    timeout_seconds=int(llm_cfg.get("timeout_seconds", 25)),
+                    response_format_type=llm_cfg.get("response_format_type", "text"),
+                    system_prompt=llm_cfg.get("system_prompt"),
+                    # Pass-through; None allows client to auto-enable reasoning for supported models
+                    enable_reasoning=llm_cfg.get("reasoning"),
+                    reasoning_effort=llm_cfg.get("reasoning_effort"),
+                )
+                llm_span.set_attributes({
+                    "ok": llm_result.get("ok"),
+                    "model": llm_result.get("model"),
+                    "latency_ms": llm_result.get("latency_ms"),
+                    "status_code": llm_result.get("status_code"),
+                    "error": llm_result.get("error"),
+                    "reasoning_enabled": llm_result.get("reasoning_enabled"),
+                    "reasoning_effort": llm_result.get("reasoning_effort"),
+                    "reasoning_removed_on_retry": llm_result.get("reasoning_removed_on_retry"),
+                })
 
             # Append a concise blackboard receipt noting success/failure and a tiny preview
             content_preview = None
@@ -443,9 +388,7 @@ def lane_prey_cycle(
                         "reasoning_removed_on_retry": llm_result.get("reasoning_removed_on_retry"),
                     },
                 }
-                out = lane_out / "engage_report.yml"
-                with out.open("w", encoding="utf-8") as f:
-                    yaml.safe_dump(engage_report, f, sort_keys=False)
+                out = store.put("engage_report.yml", engage_report)
                 append_blackboard({
                     "mission_id": mission_id,
                     "phase": "engage",
@@ -463,6 +406,7 @@ def lane_prey_cycle(
                     "timestamp": now_z(),
                     "regen_flag": True,
                 })
+        phase_span.end()
     # Before post-verify, write a Yield summary artifact for the lane
     try:
         yield_summary = {
@@ -470,12 +414,10 @@ def lane_prey_cycle(
             "lane": lane_name,
             "timestamp": now_z(),
             "collected_agents": list(collected.keys()),
-            "evidence_refs": evidence,
+            "evidence_refs": list(evidence),
             "verify_expected": "quorum_after_yield",
         }
-        out = lane_out / "yield_summary.yml"
-        with out.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(yield_summary, f, sort_keys=False)
+        out = store.put("yield_summary.yml", yield_summary)
         append_blackboard({
             "mission_id": mission_id,
             "phase": "yield",
@@ -494,12 +436,12 @@ def lane_prey_cycle(
         })
 
     # Lane artifact validator: ensure four artifacts and minimal fields before handoff
-    validation = _validate_lane_artifacts(lane_out)
+    validation = _validate_lane_artifacts(store)
     append_blackboard({
         "mission_id": mission_id,
         "phase": "verify",
         "summary": f"lane={lane_name}: artifact validation {'PASS' if validation['ok'] else 'FAIL'}",
-        "evidence_refs": [str((lane_out / n).relative_to(ROOT)) for n in ("perception_snapshot.yml", "react_plan.yml", "engage_report.yml", "yield_summary.yml") if (lane_out / n).exists()],
+        "evidence_refs": [str((lane_out / n).relative_to(ROOT)) if lane_out.is_relative_to(ROOT) else str(lane_out / n) for n in REQUIRED_ARTIFACTS if store.has(n)],
         "timestamp": now_z(),
         "validator": {"ok": validation["ok"], "errors": validation.get("errors", [])},
     })
@@ -509,15 +451,9 @@ def lane_prey_cycle(
         agent = AGENTS.get(role)
         if not agent:
             continue
-        res = agent.run({"mission": mission, "lane": lane_name, "evidence": evidence, "flags": {"phases_seen": phases_seen}, "collected": collected})
-        write_span(trace_id, {
-            "trace_id": trace_id,
-            "span_id": f"{lane_name}-post-{role}-{int(time.time()*1000)}",
-            "name": f"{lane_name}:post:{role}",
-            "start_time": now_z(),
-            "end_time": now_z(),
-            "attributes": {"lane": lane_name, "role": role, "ok": res.ok},
-        })
+        with tracer.span(f"{lane_name}:post:{role}", parent=lane_span, attributes={"lane": lane_name, "role": role}) as post_span:
+            res = agent.run({"mission": mission, "lane": lane_name, "evidence": evidence, "flags": {"phases_seen": phases_seen}, "collected": collected})
+            post_span.set_attribute("ok", res.ok)
         append_blackboard({
             "mission_id": mission_id,
             "phase": "verify",
@@ -529,10 +465,27 @@ def lane_prey_cycle(
             "agent": {"role": role, "summary": res.summary},
         })
 
+    # Artifact writes overlapped with the checks above; make sure they landed before handoff
+    write_errors = store.flush()
+    if write_errors:
+        validation = {"ok": False, "errors": validation.get("errors", []) + write_errors}
+        append_blackboard({
+            "mission_id": mission_id,
+            "phase": "verify",
+            "summary": f"lane={lane_name}: artifact write failed",
+            "evidence_refs": [f"lane:{lane_name}", "phase:verify"],
+            "timestamp": now_z(),
+            "regen_flag": True,
+            "validator": {"ok": False, "errors": write_errors},
+        })
+
+    lane_span.set_attribute("lane_valid", bool(validation.get("ok")))
+    lane_span.end()
     return {"lane": lane_name, "evidence": evidence, "phases_seen": phases_seen, "lane_valid": bool(validation.get("ok"))}
 
 
-def verify_quorum(mission: Dict[str, Any], lane_results: List[Dict[str, Any]], trace_id: str) -> Dict[str, Any]:
+def verify_quorum(mission: Dict[str, Any], lane_results: List[Dict[str, Any]], trace_id: str, parent_span: Optional[Span] = None) -> Dict[str, Any]:
+    verify_span = get_tracer(trace_id, OTEL_DIR).start_span("verify_quorum", parent=parent_span)
     mission_id = mission.get("mission_id", f"mi_{now_z()}")
     validators = mission.get("quorum", {}).get("validators", ["immunizer", "disruptor", "verifier_aux"]) 
     threshold = mission.get("quorum", {}).get("threshold", 2)
@@ -559,9 +512,10 @@ def verify_quorum(mission: Dict[str, Any], lane_results: List[Dict[str, Any]], t
     pass_count = sum(1 for v in votes if v)
     passed = pass_count >= threshold
 
-    # Record verify spans
+    # Record verify span
     ts = now_z()
-    write_span(trace_id, {"trace_id": trace_id, "span_id": f"verify-{int(time.time()*1000)}", "name": "verify_quorum", "start_time": ts, "end_time": ts, "attributes": {"votes": votes, "threshold": threshold}})
+    verify_span.set_attributes({"votes": votes, "threshold": threshold, "passed": passed})
+    verify_span.end()
 
     append_blackboard({
         "mission_id": mission_id,
@@ -624,6 +578,8 @@ def run(intent_path: Path) -> int:
     run_dir.mkdir(parents=True, exist_ok=True)
 
     trace_id = f"trace-{mission_id}-{run_ts}"
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    run_span = tracer.start_span("run", attributes={"mission_id": mission_id, "lanes": len(names)})
 
     # Write a mission pointer for this run (swarmlord-level intent pointer)
     try:
@@ -659,11 +615,14 @@ def run(intent_path: Path) -> int:
     lane_results: List[Dict[str, Any]] = []
     max_workers = int(lanes.get("max_workers", 0)) or len(names)
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(lane_prey_cycle, mission, name, trace_id, lane_to_model.get(name), run_dir): name for name in names}
+        futures = {executor.submit(lane_prey_cycle, mission, name, trace_id, lane_to_model.get(name), run_dir, run_span): name for name in names}
         for fut in as_completed(futures):
             lane_results.append(fut.result())
 
-    verify_result = verify_quorum(mission, lane_results, trace_id)
+    verify_result = verify_quorum(mission, lane_results, trace_id, run_span)
+    run_span.set_attribute("verify_pass", bool(verify_result.get("passed")))
+    run_span.end()
+    tracer.flush()
 
     # Record presence (not value) of OpenRouter key for audit without leaking secret
     llm_present = bool(os.environ.get("OPENROUTER_API_KEY"))
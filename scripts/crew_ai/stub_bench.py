@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end throughput benchmark for the crew AI runners.
+
+Starts llm_stub_server in-process, points llm_client at it (no network, no API key)
+and runs arc_swarm_runner, swarm_math_runner and runner.py (pilot) end to end.
+All blackboard receipts, spans and run artifacts go to a scratch directory, not the
+repo. ARC uses a synthetic split injected into arc_challenge_eval's split cache.
+
+Per runner it reports:
+- throughput: logical LLM calls/s and HTTP requests/s over the runner's wall time
+- tail latency: client-observed p50/p95/p99 per logical call (retries included)
+- retry amplification: HTTP requests received by the stub / logical calls issued
+
+Usage:
+  python scripts/crew_ai/stub_bench.py
+  python scripts/crew_ai/stub_bench.py --runners arc,math --latency lognormal --latency-ms 200 \
+    --error-rate 0.05 --empty-rate 0.05 --arc-lanes 4 --arc-limit 50 --output temp/stub_bench.json
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+THIS = Path(__file__).resolve()
+SCRIPT_DIR = THIS.parent
+ROOT = THIS.parents[2]
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from llm_stub_server import LATENCY_KINDS, StubConfig, StubServer  # noqa: E402
+
+DEFAULT_MATH_INTENT = ROOT / "hfo_mission_intent/2025-10-30/mission_intent_parallel_10lanes_2025-10-30.v1.yml"
+DEFAULT_PILOT_INTENT = ROOT / "hfo_mission_intent/2025-10-30/mission_intent_daily_2025-10-30.v5.yml"
+RUNNERS = ("arc", "math", "pilot")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-int(q) * len(ordered) // 100))
+    return float(ordered[min(rank, len(ordered)) - 1])
+
+
+class CallMeter:
+    """Wraps call_openrouter references to count logical calls and their latency."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies_ms: List[float] = []
+
+    def wrap(self, fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        if getattr(fn, "_stub_bench_wrapped", False):
+            return fn
+
+        def metered(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        metered._stub_bench_wrapped = True  # type: ignore[attr-defined]
+        return metered
+
+    def take(self) -> List[float]:
+        with self._lock:
+            out, self.latencies_ms = self.latencies_ms, []
+        return out
+
+
+def _load(name: str, path: Path) -> Any:
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load {name}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)  # type: ignore[arg-type]
+    return mod
+
+
+def _redirect(mod: Any, scratch: Path) -> None:
+    """Point a runner's module-level paths at the scratch dir (keeps relative_to(ROOT) valid)."""
+    if hasattr(mod, "ROOT"):
+        mod.ROOT = scratch
+    if hasattr(mod, "RESULTS_ROOT"):
+        mod.RESULTS_ROOT = scratch / "hfo_crew_ai_swarm_results"
+    if hasattr(mod, "BLACKBOARD"):
+        mod.BLACKBOARD = scratch / "hfo_blackboard/obsidian_synapse_blackboard.jsonl"
+    if hasattr(mod, "OTEL_DIR"):
+        mod.OTEL_DIR = scratch / "temp/otel"
+
+
+def _synthetic_arc_split(arc_eval: Any, split: str, n: int) -> None:
+    ids, prompts, keys = [], [], []
+    for i in range(n):
+        pairs = [(lbl, f"option {lbl.lower()} for item {i}") for lbl in "ABCD"]
+        ids.append(f"stub-arc-{i}")
+        prompts.append(arc_eval._format_prompt(f"Synthetic ARC question {i}?", pairs))
+        keys.append("ABCD"[i % 4])
+    arc_eval._SPLITS[split] = arc_eval.ARCSplit(
+        split=split,
+        dataset=None,
+        ids=tuple(ids),
+        prompts=tuple(prompts),
+        answer_keys=tuple(keys),
+    )
+
+
+def _with_argv(argv: List[str], fn: Callable[[], Any]) -> Any:
+    saved = sys.argv
+    sys.argv = argv
+    try:
+        return fn()
+    except SystemExit as e:  # runners exit non-zero on verify FAIL; that is a result, not a crash
+        return e.code
+    finally:
+        sys.argv = saved
+
+
+def run_bench(args: argparse.Namespace) -> Dict[str, Any]:
+    cfg = StubConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        empty_rate=args.empty_rate,
+        seed=args.seed,
+    )
+    scratch = Path(args.out_dir).resolve() if args.out_dir else Path(tempfile.mkdtemp(prefix="stub_bench_"))
+    scratch.mkdir(parents=True, exist_ok=True)
+    wanted = [r.strip() for r in args.runners.split(",") if r.strip()]
+    meter = CallMeter()
+    report: Dict[str, Any] = {"stub": vars(cfg), "scratch_dir": str(scratch), "runners": {}}
+
+    with StubServer(cfg) as srv:
+        # Must be set before llm_client is imported: it reads the base URL at import time
+        os.environ["OPENROUTER_API_KEY"] = "stub"
+        os.environ["OPENROUTER_BASE_URL"] = srv.base_url
+        os.environ.pop("OPENROUTER_DIAG_DIR", None)
+
+        def measure(name: str, fn: Callable[[], Any]) -> None:
+            before = srv.snapshot()
+            meter.take()
+            t0 = time.perf_counter()
+            rc = fn()
+            wall_s = time.perf_counter() - t0
+            after = srv.snapshot()
+            lat = meter.take()
+            http = after["requests"] - before["requests"]
+            calls = len(lat)
+            report["runners"][name] = {
+                "exit": rc,
+                "wall_s": round(wall_s, 3),
+                "logical_calls": calls,
+                "http_requests": http,
+                "http_errors": after["errors"] - before["errors"],
+                "empty_responses": after["empty"] - before["empty"],
+                "retry_amplification": round(http / calls, 3) if calls else None,
+                "calls_per_s": round(calls / wall_s, 2) if wall_s > 0 else None,
+                "requests_per_s": round(http / wall_s, 2) if wall_s > 0 else None,
+                "latency_ms": {
+                    "p50": round(_percentile(lat, 50), 1),
+                    "p95": round(_percentile(lat, 95), 1),
+                    "p99": round(_percentile(lat, 99), 1),
+                    "max": round(max(lat), 1) if lat else 0.0,
+                },
+            }
+
+        if "arc" in wanted:
+            arc = _load("arc_swarm_runner", SCRIPT_DIR / "arc_swarm_runner.py")
+            _redirect(arc, scratch)
+            _synthetic_arc_split(arc.arc_eval, "validation", max(1, args.arc_limit) * max(1, args.arc_lanes))
+            arc.arc_eval.call_openrouter = meter.wrap(arc.arc_eval.call_openrouter)
+            argv = [
+                "arc_swarm_runner.py",
+                "--limit", str(args.arc_limit),
+                "--lanes-per-model", str(args.arc_lanes),
+                "--models", args.arc_models,
+            ]
+            measure("arc_swarm_runner", lambda: _with_argv(argv, arc.main))
+
+        if "math" in wanted:
+            sm = _load("swarm_math_runner", SCRIPT_DIR / "swarm_math_runner.py")
+            _redirect(sm, scratch)
+            sm.call_openrouter = meter.wrap(sm.call_openrouter)
+            argv = ["swarm_math_runner.py", "--use-llm", "--intent", str(args.math_intent)]
+            measure("swarm_math_runner", lambda: _with_argv(argv, sm.main))
+
+        if "pilot" in wanted:
+            pilot = _load("runner", SCRIPT_DIR / "runner.py")
+            _redirect(pilot, scratch)
+            pilot.call_openrouter = meter.wrap(pilot.call_openrouter)
+            agents = sys.modules.get("agents")
+            if agents is not None:
+                agents._llm = meter.wrap(agents._llm)
+            measure("runner", lambda: pilot.run(Path(args.pilot_intent)))
+
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Offline end-to-end runner benchmark against a local LLM stub")
+    ap.add_argument("--runners", type=str, default=",".join(RUNNERS), help=f"Comma-separated subset of {RUNNERS}")
+    ap.add_argument("--latency", type=str, default="lognormal", choices=list(LATENCY_KINDS))
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--jitter", type=float, default=0.5)
+    ap.add_argument("--error-rate", type=float, default=0.02)
+    ap.add_argument("--empty-rate", type=float, default=0.02)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--arc-limit", type=int, default=20, help="Questions per ARC lane")
+    ap.add_argument("--arc-lanes", type=int, default=2, help="ARC lanes per model")
+    ap.add_argument("--arc-models", type=str, default="gpt-oss", help="--models filter passed to arc_swarm_runner")
+    ap.add_argument("--math-intent", type=str, default=str(DEFAULT_MATH_INTENT))
+    ap.add_argument("--pilot-intent", type=str, default=str(DEFAULT_PILOT_INTENT))
+    ap.add_argument("--out-dir", type=str, default="", help="Scratch dir for artifacts (default: a new temp dir)")
+    ap.add_argument("--output", type=str, default="", help="Optional JSON report path")
+    args = ap.parse_args()
+
+    report = run_bench(args)
+
+    print(f"Stub bench (latency={args.latency}:{args.latency_ms}ms error_rate={args.error_rate} empty_rate={args.empty_rate} seed={args.seed})")
+    print(f"Artifacts: {report['scratch_dir']}")
+    print("| Runner | Wall (s) | Calls | HTTP | Amplification | Calls/s | p50 | p95 | p99 (ms) |")
+    print("|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for name, r in report["runners"].items():
+        lat = r["latency_ms"]
+        print(f"| {name} | {r['wall_s']} | {r['logical_calls']} | {r['http_requests']} | {r['retry_amplification']} | {r['calls_per_s']} | {lat['p50']} | {lat['p95']} | {lat['p99']} |")
+
+    if args.output:
+        outp = Path(args.output)
+        outp.parent.mkdir(parents=True, exist_ok=True)
+        outp.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote: {outp}")
+
+
+if __name__ == "__main__":
+    main()
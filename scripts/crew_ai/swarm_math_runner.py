@@ -27,8 +27,8 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 from dotenv import load_dotenv
@@ -53,6 +53,13 @@ except Exception:  # pragma: no cover
         "openai/gpt-oss-20b",
     ]
 
+try:
+    from .tracing import Span, get_tracer
+    from .lane_scheduler import TaskResult, WorkStealingScheduler
+except Exception:  # pragma: no cover
+    from tracing import Span, get_tracer  # type: ignore
+    from lane_scheduler import TaskResult, WorkStealingScheduler  # type: ignore
+
 ROOT = Path(__file__).resolve().parents[2]
 RESULTS_ROOT = ROOT / "hfo_crew_ai_swarm_results"
 OTEL_DIR = ROOT / "temp/otel"
@@ -77,13 +84,6 @@ def now_z() -> str:
     return datetime.now(timezone.utc).strftime(ISO)
 
 
-def write_span(trace_id: str, span: Dict[str, object]) -> None:
-    OTEL_DIR.mkdir(parents=True, exist_ok=True)
-    out = OTEL_DIR / f"{trace_id}.jsonl"
-    with out.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(span, ensure_ascii=False) + "\n")
-
-
 @dataclass
 class LanePolicy:
     auto_retries_max: int = 2
@@ -239,57 +239,80 @@ def solve_locally(q: str, expected: int) -> Tuple[bool, int, str, Optional[str]]
     return True, expected, "local/deterministic", None
 
 
-def run_lane_once(cfg: RunCfg, lane: str, attempt: int, out_dir: Path, trace_id: Optional[str], model_hint: Optional[str]) -> LaneAttemptResult:
+def solve_problem(
+    cfg: RunCfg,
+    lane: str,
+    q: str,
+    ans: int,
+    model_hint: Optional[str],
+    tracer: Any,
+    parent_span: Optional[Span] = None,
+) -> Dict[str, object]:
+    """Answer one problem; returns its detail row (latency_ms is this call's own latency)."""
+    if cfg.use_llm:
+        t0 = time.time()
+        with tracer.span(f"{lane}:llm_call", parent=parent_span, attributes={"lane": lane, "q": q}) as call_span:
+            ok, got, model, err, raw = ask_llm(q, model_hint)
+            call_span.set_attributes({"ok": ok, "model": model, "error": err})
+        latency_ms = int((time.time() - t0) * 1000)
+    else:
+        ok, got, model, err = solve_locally(q, ans)
+        raw = str(got)
+    return {
+        "q": q,
+        "expected": ans,
+        "got": got,
+        "ok": ok,
+        "correct": got == ans,
+        "error": err,
+        "raw": raw if cfg.use_llm else None,
+        "latency_ms": latency_ms if cfg.use_llm else None,
+        "model_hint": model_hint if cfg.use_llm else None,
+    }
+
+
+def run_lane_once(
+    cfg: RunCfg,
+    lane: str,
+    attempt: int,
+    out_dir: Path,
+    trace_id: Optional[str],
+    model_hint: Optional[str],
+    parent_span: Optional[Span] = None,
+) -> LaneAttemptResult:
     # Choose subset for this attempt (shrink if retries)
     subset = PROBLEMS[: cfg.problems_per_lane]
 
-    details: List[Dict[str, object]] = []
-    correct = 0
-    start_ts = now_z()
-    lane_latency_ms_total = 0
-    for q, ans in subset:
-        if cfg.use_llm:
-            t0 = time.time()
-            ok, got, model, err, raw = ask_llm(q, model_hint)
-            lane_latency_ms_total += int((time.time() - t0) * 1000)
-        else:
-            ok, got, model, err = solve_locally(q, ans)
-            raw = str(got)
-            lane_latency_ms_total += 0
-        is_correct = (got == ans)
-        correct += 1 if is_correct else 0
-        details.append({
-            "q": q,
-            "expected": ans,
-            "got": got,
-            "ok": ok,
-            "correct": is_correct,
-            "error": err,
-            "raw": raw if cfg.use_llm else None,
-            "latency_ms": None if not cfg.use_llm else lane_latency_ms_total,
-            "model_hint": model_hint if cfg.use_llm else None,
-        })
-    total = len(subset)
+    # One analyzer-compatible span per lane attempt, with a child span per LLM call
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    attempt_span = tracer.start_span(f"{lane}:engage_llm", parent=parent_span, attributes={"lane": lane, "mission_id": cfg.mission_id, "attempt": attempt})
+    details = [solve_problem(cfg, lane, q, ans, model_hint, tracer, attempt_span) for q, ans in subset]
+    return finish_attempt(cfg, lane, attempt, out_dir, model_hint, details, attempt_span)
+
+
+def finish_attempt(
+    cfg: RunCfg,
+    lane: str,
+    attempt: int,
+    out_dir: Path,
+    model_hint: Optional[str],
+    details: List[Dict[str, object]],
+    attempt_span: Any,
+) -> LaneAttemptResult:
+    """Score an attempt's detail rows, end its span and write yield/verify artifacts."""
+    correct = sum(1 for d in details if d["correct"])
+    lane_latency_ms_total = sum(int(d["latency_ms"] or 0) for d in details)
+    total = len(details)
     accuracy = (correct / total) if total else 0.0
     passed = accuracy >= cfg.verify_cfg.accuracy_threshold
-    end_ts = now_z()
-
-    # Emit one analyzer-compatible span per lane attempt
-    if trace_id:
-        write_span(trace_id, {
-            "trace_id": trace_id,
-            "span_id": f"{lane}-engage-llm-{int(time.time()*1000)}",
-            "name": f"{lane}:engage_llm",
-            "start_time": start_ts,
-            "end_time": end_ts,
-            "attributes": {
-                "lane": lane,
-                "mission_id": cfg.mission_id,
-                "ok": True,
-                "model": (model_hint or "allowlist-default") if cfg.use_llm else "deterministic",
-                "latency_ms": lane_latency_ms_total if cfg.use_llm else 0,
-            },
-        })
+    attempt_span.set_attributes({
+        "ok": True,
+        "model": (model_hint or "allowlist-default") if cfg.use_llm else "deterministic",
+        "latency_ms": lane_latency_ms_total if cfg.use_llm else 0,
+        "accuracy": accuracy,
+        "passed": passed,
+    })
+    attempt_span.end()
 
     # Write yield artifact (JSON) and yield.md
     lane_dir = out_dir / lane / f"attempt_{attempt}"
@@ -429,6 +452,7 @@ def main() -> None:
     ap.add_argument("--per-model", action="store_true", help="Spawn one lane per allowlisted model (concurrent)")
     ap.add_argument("--models", type=str, default="", help="Comma-separated subset of model names to use; 'all' for the full allowlist")
     ap.add_argument("--max-workers", type=int, default=0, help="Override thread pool size (0 = lanes count)")
+    ap.add_argument("--model-concurrency", type=int, default=0, help="In-flight problems per model (0 = no cap beyond --max-workers)")
     args = ap.parse_args()
 
     load_dotenv(dotenv_path=ROOT / ".env", override=False)
@@ -485,37 +509,65 @@ def main() -> None:
 
     _, run_dir = plan_run_dirs()
     trace_id = f"trace-swarm_math-{int(time.time()*1000)}"
+    tracer = get_tracer(trace_id, OTEL_DIR)
+    run_span = tracer.start_span("run", attributes={"mission_id": mission_id, "lanes": len(names), "use_llm": cfg.use_llm})
 
-    def lane_flow(lane: str) -> LaneAttemptResult:
-        problems = cfg.problems_per_lane
-        model_hint = lane_to_model.get(lane)
-        for attempt in range(1, cfg.lane_policy.auto_retries_max + 2):  # initial + retries
-            attempt_cfg = RunCfg(
-                mission_id=cfg.mission_id,
-                lane_names=[lane],
-                lane_policy=cfg.lane_policy,
-                verify_cfg=cfg.verify_cfg,
-                use_llm=cfg.use_llm,
-                problems_per_lane=problems,
-            )
-            r = run_lane_once(attempt_cfg, lane, attempt, run_dir, trace_id, model_hint)
-            if r.passed:
-                return r
-            # Prepare next attempt
-            if attempt <= cfg.lane_policy.auto_retries_max:
-                if cfg.lane_policy.shrink_scope_on_retry and problems > 1:
-                    problems = max(1, problems // 2)
-            else:
-                return r  # final failure
-        return r  # unreachable
-
+    # Problems from every lane share one queue; a failed lane attempt re-enqueues its
+    # (possibly shrunk) next attempt as new tasks instead of holding a worker
     results: Dict[str, LaneAttemptResult] = {}
+    results_lock = threading.Lock()
     max_workers = int(args.max_workers) if int(args.max_workers) > 0 else len(cfg.lane_names)
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = {ex.submit(lambda ln=lane: lane_flow(ln), lane): lane for lane in cfg.lane_names}
-        for fut in as_completed(futs):
-            r = fut.result()
-            results[r.lane] = r
+    sched = WorkStealingScheduler(max_workers, default_cap=int(args.model_concurrency), name="math-q")
+    lane_spans = {lane: tracer.start_span(lane, parent=run_span, attributes={"lane": lane}) for lane in cfg.lane_names}
+
+    def submit_attempt(lane: str, attempt: int, problems: int) -> None:
+        model_hint = lane_to_model.get(lane)
+        attempt_cfg = RunCfg(
+            mission_id=cfg.mission_id,
+            lane_names=[lane],
+            lane_policy=cfg.lane_policy,
+            verify_cfg=cfg.verify_cfg,
+            use_llm=cfg.use_llm,
+            problems_per_lane=problems,
+        )
+        subset = PROBLEMS[:problems]
+        attempt_span = tracer.start_span(f"{lane}:engage_llm", parent=lane_spans[lane], attributes={"lane": lane, "mission_id": cfg.mission_id, "attempt": attempt})
+        rows: List[Optional[Dict[str, object]]] = [None] * len(subset)
+        left = [len(subset)]
+
+        def on_solved(tr: TaskResult) -> None:
+            i = tr.key[1]
+            row = tr.value
+            if tr.error is not None:
+                q, ans = subset[i]
+                row = {"q": q, "expected": ans, "got": None, "ok": False, "correct": False, "error": str(tr.error), "raw": None, "latency_ms": None, "model_hint": model_hint if cfg.use_llm else None}
+            with results_lock:
+                rows[i] = row
+                left[0] -= 1
+                if left[0]:
+                    return
+            r = finish_attempt(attempt_cfg, lane, attempt, run_dir, model_hint, rows, attempt_span)  # type: ignore[arg-type]
+            if r.passed or attempt > cfg.lane_policy.auto_retries_max:
+                with results_lock:
+                    results[lane] = r
+                lane_spans[lane].set_attributes({"attempts": r.attempt, "passed": r.passed})
+                lane_spans[lane].end()
+                return
+            # Prepare next attempt
+            nxt = problems
+            if cfg.lane_policy.shrink_scope_on_retry and problems > 1:
+                nxt = max(1, problems // 2)
+            submit_attempt(lane, attempt + 1, nxt)
+
+        for i, (q, ans) in enumerate(subset):
+            sched.submit(lane, (attempt, i), solve_problem, attempt_cfg, lane, q, ans, model_hint, tracer, attempt_span, model=model_hint, callback=on_solved)
+
+    for lane in cfg.lane_names:
+        submit_attempt(lane, 1, cfg.problems_per_lane)
+    sched.run()
+    run_span.set_attributes(sched.stats())
+    run_span.end()
+    tracer.flush()
 
     digest_path = generate_digest(cfg, run_dir, results)
 
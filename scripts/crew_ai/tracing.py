@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+High-resolution span tracing for the Crew AI runners.
+
+Spans are timed with time.monotonic_ns() (anchored to the wall clock once per
+process, so start/end are comparable across threads and never go backwards),
+carry parent span IDs, and are context-managed:
+
+  tracer = get_tracer(trace_id, OTEL_DIR)          # one per run/trace file
+  run_span = tracer.start_span("run", attributes={"mission_id": mid})
+  with tracer.span("lane_1:engage_llm", parent=run_span, attributes={"lane": "lane_1"}) as sp:
+      result = call_openrouter(...)
+      sp.set_attributes({"ok": result["ok"], "latency_ms": result["latency_ms"]})
+  run_span.end()
+  tracer.flush()
+
+Inside a `with tracer.span(...)` block, new spans default to it as parent (per
+thread/context). Worker threads start without a current span, so lane work
+submitted to a pool passes parent= explicitly. get_tracer(None) returns a no-op
+tracer.
+
+Export (finished spans are queued; a background thread batches them):
+- <out_dir>/<trace_id>.jsonl: one line per span for analyze_traces/validate_run
+  (trace_id, span_id, parent_span_id, name, start_time/end_time as ISO-8601 with
+  microseconds, start/end_time_unix_nano, duration_ms, attributes, status),
+  appended through blackboard_logger's shared writer.
+- <out_dir>/otlp/<trace_id>-NNNNN.json: OTLP/JSON ExportTraceServiceRequest
+  batches (up to OTEL_BATCH_MAX_SPANS spans or every OTEL_BATCH_INTERVAL_S).
+- OTEL_EXPORTER_OTLP_ENDPOINT (e.g. http://127.0.0.1:4318): each batch is also
+  POSTed to <endpoint>/v1/traces. A minimal local collector that stores what it
+  receives is built in:
+    python scripts/crew_ai/tracing.py collect --port 4318 --out temp/otel/collector
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR.parent))
+from blackboard_logger import get_writer  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+OTEL_DIR = ROOT / "temp/otel"
+SCOPE_NAME = "hfo.crew_ai"
+SERVICE_NAME = "hfo-crew-ai"
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL = 1
+
+# Wall-clock anchor for the monotonic clock, fixed once per process
+_ANCHOR_NS = time.time_ns() - time.monotonic_ns()
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("hfo_current_span", default=None)
+
+
+def now_ns() -> int:
+    """Monotonic nanoseconds mapped onto Unix epoch nanoseconds."""
+    return time.monotonic_ns() + _ANCHOR_NS
+
+
+def iso_ns(ns: int) -> str:
+    """ISO-8601 UTC with microseconds, e.g. 2025-10-30T12:00:00.123456Z."""
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except Exception:
+        return default
+
+
+class Span:
+    """One timed operation. End it with end() or by leaving its `with` block."""
+
+    __slots__ = ("tracer", "name", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "status", "status_message", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Optional[Dict[str, Any]], start_ns: Optional[int] = None) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent is not None else None
+        self.start_ns = start_ns if start_ns is not None else now_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> "Span":
+        self.attributes[key] = value
+        return self
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> "Span":
+        self.attributes.update(attributes)
+        return self
+
+    def set_status(self, ok: bool, message: Optional[str] = None) -> "Span":
+        self.status = STATUS_OK if ok else STATUS_ERROR
+        self.status_message = message
+        return self
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else now_ns()
+        self.tracer._export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc is not None and self.status == STATUS_UNSET:
+            self.set_status(False, f"{exc_type.__name__}: {exc}")
+        if self._token is not None:
+            _CURRENT.reset(self._token)
+            self._token = None
+        self.end()
+
+    def to_record(self) -> Dict[str, Any]:
+        """Flat JSONL record (analyze_traces / validate_run format)."""
+        end_ns = self.end_ns if self.end_ns is not None else self.start_ns
+        rec: Dict[str, Any] = {
+            "trace_id": self.tracer.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time": iso_ns(self.start_ns),
+            "end_time": iso_ns(end_ns),
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": end_ns,
+            "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+        }
+        if self.status != STATUS_UNSET:
+            rec["status"] = {"code": "OK" if self.status == STATUS_OK else "ERROR", "message": self.status_message}
+        return rec
+
+    def to_otlp(self) -> Dict[str, Any]:
+        end_ns = self.end_ns if self.end_ns is not None else self.start_ns
+        out: Dict[str, Any] = {
+            "traceId": self.tracer.otlp_trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _kv_list(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            out["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            out["status"]["message"] = self.status_message
+        return out
+
+
+def _any_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    if isinstance(v, str):
+        return {"stringValue": v}
+    if v is None:
+        return {}
+    if isinstance(v, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(x) for x in v]}}
+    if isinstance(v, dict):
+        return {"kvlistValue": {"values": _kv_list(v)}}
+    return {"stringValue": str(v)}
+
+
+def _kv_list(attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": str(k), "value": _any_value(v)} for k, v in attrs.items()]
+
+
+class OtlpJsonExporter:
+    """Background batcher: JSONL lines via the shared writer, OTLP/JSON batch files, optional POST."""
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, tracer: "Tracer", out_dir: Path, endpoint: Optional[str] = None) -> None:
+        self.tracer = tracer
+        self.out_dir = Path(out_dir)
+        self.endpoint = endpoint.rstrip("/") if endpoint else None
+        self.max_batch = max(1, int(_env_float("OTEL_BATCH_MAX_SPANS", 512)))
+        self.interval_s = max(0.05, _env_float("OTEL_BATCH_INTERVAL_S", 2.0))
+        self.batches = 0
+        self.spans = 0
+        self.post_errors = 0
+        self.last_error: Optional[str] = None
+        self._jsonl = get_writer(self.out_dir / f"{tracer.trace_id}.jsonl")
+        self._q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"otlp-export:{tracer.trace_id}", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        self._q.put(span)
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        done = threading.Event()
+        self._q.put((self._FLUSH, done))
+        ok = done.wait(timeout)
+        self._jsonl.flush(timeout)
+        return ok
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> None:
+        self._q.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        pending: List[Span] = []
+        deadline = time.monotonic() + self.interval_s
+        stop = False
+        while not stop:
+            try:
+                item = self._q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            waiters: List[threading.Event] = []
+            while item is not None:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, tuple) and item and item[0] is self._FLUSH:
+                    waiters.append(item[1])
+                else:
+                    pending.append(item)
+                    self._jsonl.append(item.to_record())
+                if len(pending) >= self.max_batch:
+                    self._write_batch(pending)
+                    pending = []
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    item = None
+            if pending and (waiters or stop or time.monotonic() >= deadline):
+                self._write_batch(pending)
+                pending = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.interval_s
+            for w in waiters:
+                w.set()
+
+    def _write_batch(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": _kv_list({
+                    "service.name": SERVICE_NAME,
+                    "hfo.trace_name": self.tracer.trace_id,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [s.to_otlp() for s in spans]}],
+            }]
+        }
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.batches += 1
+        self.spans += len(spans)
+        try:
+            otlp_dir = self.out_dir / "otlp"
+            otlp_dir.mkdir(parents=True, exist_ok=True)
+            path = otlp_dir / f"{self.tracer.trace_id}-{os.getpid()}-{self.batches:05d}.json"
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_bytes(raw)
+            os.replace(tmp, path)
+        except OSError as e:
+            self.last_error = f"write: {e}"
+        if self.endpoint:
+            req = urllib.request.Request(
+                f"{self.endpoint}/v1/traces", data=raw, headers={"Content-Type": "application/json"}, method="POST"
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=5) as resp:
+                    resp.read()
+            except Exception as e:  # collector down must never break a run
+                self.post_errors += 1
+                self.last_error = f"post: {e}"
+
+
+class Tracer:
+    """Creates spans for one trace and exports them in batches."""
+
+    def __init__(self, trace_id: str, out_dir: Union[Path, str] = OTEL_DIR, endpoint: Optional[str] = None) -> None:
+        self.trace_id = trace_id
+        # OTLP wants 16 random-looking bytes; derive them from the run's trace name
+        self.otlp_trace_id = hashlib.sha256(trace_id.encode("utf-8")).hexdigest()[:32]
+        self.out_dir = Path(out_dir)
+        self._exporter = OtlpJsonExporter(self, self.out_dir, endpoint if endpoint is not None else os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"))
+
+    def start_span(self, name: str, *, parent: Optional[Span] = None, attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None) -> Span:
+        """Start a span without making it current; call end() on it."""
+        if parent is None:
+            cur = _CURRENT.get()
+            parent = cur if cur is not None and cur.tracer is self else None
+        return Span(self, name, parent, attributes, start_ns)
+
+    def span(self, name: str, *, parent: Optional[Span] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Context-managed span: current within the block, ended on exit."""
+        return self.start_span(name, parent=parent, attributes=attributes)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, *, parent: Optional[Span] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Export a span whose timing was measured elsewhere (now_ns() clock)."""
+        sp = self.start_span(name, parent=parent, attributes=attributes, start_ns=start_ns)
+        sp.end(end_ns)
+        return sp
+
+    def _export(self, span: Span) -> None:
+        self._exporter.submit(span)
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        return self._exporter.flush(timeout)
+
+    def shutdown(self) -> None:
+        self._exporter.flush()
+        self._exporter.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        e = self._exporter
+        return {"spans": e.spans, "batches": e.batches, "post_errors": e.post_errors, "last_error": e.last_error}
+
+
+class _NoopSpan(Span):
+    def __init__(self) -> None:  # noqa: D401 - intentionally skips Span.__init__
+        self.tracer = None  # type: ignore[assignment]
+        self.name = ""
+        self.span_id = ""
+        self.parent_span_id = None
+        self.start_ns = 0
+        self.end_ns = None
+        self.attributes = {}
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> "Span":
+        return self
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> "Span":
+        return self
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        return None
+
+
+class NoopTracer:
+    """Tracer stand-in when tracing is disabled (no trace_id)."""
+
+    trace_id = ""
+
+    def start_span(self, name: str, **_: Any) -> Span:
+        return _NoopSpan()
+
+    span = start_span
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, **_: Any) -> Span:
+        return _NoopSpan()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        return None
+
+
+NOOP_TRACER = NoopTracer()
+_TRACERS: Dict[str, Tracer] = {}
+_TRACERS_LOCK = threading.Lock()
+
+
+def get_tracer(trace_id: Optional[str], out_dir: Union[Path, str, None] = None) -> Union[Tracer, NoopTracer]:
+    """Process-wide tracer for ``trace_id`` (created on first use); no-op when trace_id is falsy."""
+    if not trace_id:
+        return NOOP_TRACER
+    with _TRACERS_LOCK:
+        t = _TRACERS.get(trace_id)
+        if t is None:
+            t = _TRACERS[trace_id] = Tracer(trace_id, out_dir if out_dir is not None else OTEL_DIR)
+        return t
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def shutdown_all() -> None:
+    with _TRACERS_LOCK:
+        tracers = list(_TRACERS.values())
+        _TRACERS.clear()
+    for t in tracers:
+        t.shutdown()
+
+
+# Registered after blackboard_logger's close_all, so it runs first at exit and the
+# JSONL lines reach the writer before the writer closes.
+atexit.register(shutdown_all)
+
+
+def _collector(host: str, port: int, out_dir: Path) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counter = {"n": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt: str, *args: Any) -> None:
+            return
+
+        def do_POST(self) -> None:  # noqa: N802 (http.server naming)
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_response(404)
+                self.end_headers()
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            with lock:
+                counter["n"] += 1
+                n = counter["n"]
+            (out_dir / f"batch-{int(time.time() * 1000)}-{n:06d}.json").write_bytes(body)
+            spans = sum(len(ss.get("spans", [])) for rs in payload.get("resourceSpans", []) for ss in rs.get("scopeSpans", []))
+            print(f"received batch {n}: {spans} spans", flush=True)
+            raw = b'{"partialSuccess":{}}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    print(f"OTLP/JSON collector on http://{host}:{port}/v1/traces -> {out_dir}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Crew AI tracing utilities")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("collect", help="Run a minimal local OTLP/JSON collector")
+    c.add_argument("--host", type=str, default="127.0.0.1")
+    c.add_argument("--port", type=int, default=4318)
+    c.add_argument("--out", type=str, default=str(OTEL_DIR / "collector"))
+    args = ap.parse_args()
+    if args.cmd == "collect":
+        _collector(args.host, args.port, Path(args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,40 @@
 import json
+from contextlib import contextmanager
+
 import duckdb
 
-def append_event(timestamp, event, role, summary, artifacts, jsonl_path='blackboard/obsidian_synapse_blackboard.jsonl', db_path='blackboard/obsidian_synapse_blackboard.duckdb'):
+
+@contextmanager
+def events_db(db_path):
+    """Open db_path with the events table in place and close it on exit.
+
+    The connection holds the DuckDB file lock while open, so keep it scoped: one per
+    append_event call, or one around a batch of appends (pass it as con=).
+    """
+    con = duckdb.connect(db_path)
+    try:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                timestamp TEXT,
+                event TEXT,
+                role TEXT,
+                summary TEXT,
+                artifacts TEXT
+            )
+        """)
+        yield con
+    finally:
+        con.close()
+
+
+def append_event(timestamp, event, role, summary, artifacts, jsonl_path='blackboard/obsidian_synapse_blackboard.jsonl', db_path='blackboard/obsidian_synapse_blackboard.duckdb', con=None):
     """
     Append event to JSONL file and mirror to DuckDB table 'events'.
     Schema: timestamp TEXT, event TEXT, role TEXT, summary TEXT, artifacts TEXT
-    Ensures append-only operation.
+    Ensures append-only operation. The DuckDB connection is closed again before
+    returning unless an open one from events_db() is passed as con.
+
+    For querying receipts by mission/phase/time, see scripts/blackboard_index.py.
     """
     event_data = {
         "timestamp": timestamp,
@@ -20,25 +49,19 @@ def append_event(timestamp, event, role, summary, artifacts, jsonl_path='blackbo
         json.dump(event_data, f)
         f.write('\n')
     
-    # Connect to DuckDB and create table if not exists
-    con = duckdb.connect(db_path)
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS events (
-            timestamp TEXT,
-            event TEXT,
-            role TEXT,
-            summary TEXT,
-            artifacts TEXT
-        )
-    """)
-    
     # Insert into DuckDB (append-only, no UPDATE/DELETE)
+    if con is None:
+        with events_db(db_path) as con:
+            _insert_event(con, [timestamp, event, role, summary, artifacts])
+    else:
+        _insert_event(con, [timestamp, event, role, summary, artifacts])
+
+
+def _insert_event(con, values):
     con.execute("""
         INSERT INTO events (timestamp, event, role, summary, artifacts)
         VALUES (?, ?, ?, ?, ?)
-    """, [timestamp, event, role, summary, artifacts])
-    
-    con.close()
+    """, values)
 
 if __name__ == "__main__":
     # Test with sample event
@@ -49,4 +72,4 @@ if __name__ == "__main__":
         "Blackboard initialized",
         "[]"
     )
-    print("Sample event appended successfully.")
\ No newline at end of file
+    print("Sample event appended successfully.")
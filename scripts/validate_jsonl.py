@@ -7,85 +7,288 @@ Rules (low-friction):
 - .jsonl: each non-empty line must parse as a valid JSON object or array
 - Special case: hfo_blackboard/*.jsonl — lines must parse as JSON objects; if they
   include mission_id and phase, ensure evidence_refs is an array when present.
+- .jsonl.zst: sealed blackboard segments are streamed through zstd and validated
+  like .jsonl; each segments manifest.json is also checked against segment hashes.
 
-Exit non-zero on first failure; print a concise error summary.
+Incremental: verdicts are cached in .validate_cache/validate_jsonl.json keyed by
+path with (size, mtime_ns, xxh3 hash). Unchanged files are not read; a touched but
+identical file is only hashed; an appended .jsonl (validated prefix hash matches)
+is parsed from the last validated offset only. A manifest's verdict also records
+(size, mtime_ns) of every segment it lists and is redone when any of them changes,
+even if the manifest itself did not. Remaining files are validated on a
+process pool (orjson as the parser when installed). Virtualenvs (pettingzoo_env*,
+anything with a pyvenv.cfg) and other bulky directories are not walked.
+
+Usage:
+  python scripts/validate_jsonl.py              # incremental
+  python scripts/validate_jsonl.py --no-cache   # full re-validation
+  python scripts/validate_jsonl.py --jobs 1     # no process pool
+
+Print a concise error summary and exit non-zero if any file fails.
 """
 
 from __future__ import annotations
+import argparse
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import xxhash
+
+from blackboard_segments import MANIFEST_NAME, open_lines, verify
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = REPO_ROOT / ".validate_cache/validate_jsonl.json"
+CACHE_VERSION = 1
+SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", "site-packages", ".validate_cache"}
+# Below this much pending work a process pool costs more than it saves
+POOL_MIN_BYTES = 4 * 1024 * 1024
+_CHUNK = 1 << 20
 
 
-def iter_files(root: Path):
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        # Skip common bulky directories
-        parts = {p.lower() for p in path.parts}
-        if ".git" in parts or "node_modules" in parts or ".venv" in parts:
-            continue
-        if path.suffix.lower() in {".json", ".jsonl"}:
-            yield path
+def _skip_dir(dirpath: str, name: str) -> bool:
+    low = name.lower()
+    if low in SKIP_DIRS or low.startswith("pettingzoo_env"):
+        return True
+    return os.path.exists(os.path.join(dirpath, name, "pyvenv.cfg"))
+
+
+def _kind(name: str) -> Optional[str]:
+    low = name.lower()
+    if low.endswith(".jsonl.zst"):
+        return "jsonl"
+    if low.endswith(".jsonl"):
+        return "jsonl"
+    if low.endswith(".json"):
+        return "json"
+    return None
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not _skip_dir(dirpath, d)]
+        for name in filenames:
+            if _kind(name) is not None:
+                yield Path(dirpath) / name
+
+
+def _loads(s: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass  # fall through: json accepts NaN/Infinity and big ints orjson rejects
+    return json.loads(s)
+
+
+def _hash_prefix(path: Path, nbytes: Optional[int] = None) -> str:
+    """xxh3-64 of the first ``nbytes`` of the file (whole file when None)."""
+    h = xxhash.xxh3_64()
+    remaining = nbytes
+    with path.open("rb") as f:
+        while remaining is None or remaining > 0:
+            block = f.read(_CHUNK if remaining is None else min(_CHUNK, remaining))
+            if not block:
+                break
+            h.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return h.hexdigest()
 
 
 def validate_json(path: Path) -> None:
     try:
-        with path.open("r", encoding="utf-8") as f:
-            json.load(f)
+        with path.open("rb") as f:
+            _loads(f.read())
     except Exception as e:
         raise SystemExit(f"JSON invalid: {path}\n  error: {e}")
 
 
-def validate_jsonl(path: Path) -> None:
+def validate_segments(manifest: Path) -> None:
+    active = manifest.parent.with_name(manifest.parent.name[: -len(".segments")])
+    errors = verify(active)
+    if errors:
+        raise SystemExit(f"Segment manifest invalid: {manifest}\n  " + "\n  ".join(errors))
+
+
+def validate_jsonl(path: Path, start: int = 0, line_no: int = 0) -> Tuple[int, int]:
+    """Validate lines from byte ``start`` (line number ``line_no`` before it).
+
+    Returns (offset, line_no) after the last newline-terminated line, so a partially
+    written tail line is validated again next time.
+    """
+    blackboard = "hfo_blackboard" in str(path)
+    offset = start
     try:
-        with path.open("r", encoding="utf-8") as f:
-            for i, line in enumerate(f, start=1):
-                s = line.strip()
-                if not s:
-                    continue
-                try:
-                    obj = json.loads(s)
-                except Exception as e:
-                    raise SystemExit(f"JSONL invalid: {path}:{i}\n  line: {s[:160]}\n  error: {e}")
-                # Blackboard lines should be JSON objects
-                if "hfo_blackboard" in str(path):
-                    if not isinstance(obj, dict):
-                        raise SystemExit(f"Blackboard JSONL must be object: {path}:{i}")
-                    # Soft validation: if mission_id and phase exist, evidence_refs should be a list when present
-                    if "mission_id" in obj and "phase" in obj and "evidence_refs" in obj:
-                        if not isinstance(obj["evidence_refs"], list):
-                            raise SystemExit(
-                                f"Blackboard evidence_refs must be an array: {path}:{i}"
-                            )
+        with open_lines(path) as f:
+            if start:
+                f.seek(start)
+            i = line_no
+            for raw in f:
+                i += 1
+                s = raw.decode("utf-8").strip()
+                if s:
+                    try:
+                        obj = _loads(s.encode("utf-8"))
+                    except Exception as e:
+                        raise SystemExit(f"JSONL invalid: {path}:{i}\n  line: {s[:160]}\n  error: {e}")
+                    # Blackboard lines should be JSON objects
+                    if blackboard:
+                        if not isinstance(obj, dict):
+                            raise SystemExit(f"Blackboard JSONL must be object: {path}:{i}")
+                        # Soft validation: if mission_id and phase exist, evidence_refs should be a list when present
+                        if "mission_id" in obj and "phase" in obj and "evidence_refs" in obj:
+                            if not isinstance(obj["evidence_refs"], list):
+                                raise SystemExit(
+                                    f"Blackboard evidence_refs must be an array: {path}:{i}"
+                                )
+                if raw.endswith(b"\n"):
+                    offset += len(raw)
+                    line_no = i
     except SystemExit:
         raise
     except Exception as e:
         raise SystemExit(f"Error reading JSONL: {path}\n  error: {e}")
+    return offset, line_no
+
+
+def _segment_stats(manifest: Path) -> Optional[Dict[str, Any]]:
+    """(size, mtime_ns) of each segment a manifest lists, None for missing ones."""
+    try:
+        listed = json.loads(manifest.read_text(encoding="utf-8"))["segments"]
+        names = [seg["file"] for seg in listed]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    stats: Dict[str, Any] = {}
+    for name in names:
+        try:
+            st = (manifest.parent / name).stat()
+        except OSError:
+            stats[name] = None
+        else:
+            stats[name] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def _check(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one file; runs in a worker process. Returns the new cache entry."""
+    path = Path(job["path"])
+    entry = {"size": job["size"], "mtime_ns": job["mtime_ns"], "ok": True, "error": None}
+    try:
+        if job["manifest"]:
+            # stat before verifying, so a segment changing meanwhile is seen next run
+            entry["segments"] = _segment_stats(path)
+            validate_json(path)
+            validate_segments(path)
+        elif job["kind"] == "json":
+            validate_json(path)
+        elif path.name.lower().endswith(".zst"):
+            validate_jsonl(path)
+        else:
+            offset, line_no = validate_jsonl(path, job.get("start", 0), job.get("line_no", 0))
+            entry.update(offset=offset, line_no=line_no, prefix_hash=_hash_prefix(path, offset))
+    except SystemExit as e:
+        entry.update(ok=False, error=str(e))
+    if "prefix_hash" not in entry:
+        entry["hash"] = _hash_prefix(path)
+    return entry
+
+
+def _plan(path: Path, st: os.stat_result, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return a validation job, or None when the cached verdict still holds."""
+    kind = _kind(path.name)
+    manifest = path.name == MANIFEST_NAME and path.parent.name.endswith(".segments")
+    job = {"path": str(path), "kind": kind, "manifest": manifest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if not cached:
+        return job
+    if cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+        if not manifest:
+            return None
+        segments = _segment_stats(path)
+        if segments is not None and cached.get("segments") == segments:
+            return None
+        return job
+    appendable = kind == "jsonl" and not path.name.lower().endswith(".zst") and not manifest
+    if appendable and cached.get("ok") and "offset" in cached:
+        if st.st_size >= cached["offset"] and _hash_prefix(path, cached["offset"]) == cached["prefix_hash"]:
+            job.update(start=cached["offset"], line_no=cached["line_no"])
+        return job
+    if not manifest and "hash" in cached and cached["size"] == st.st_size and _hash_prefix(path) == cached["hash"]:
+        cached.update(mtime_ns=st.st_mtime_ns)  # touched, content unchanged
+        return None
+    return job
+
+
+def _load_cache(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def _save_cache(path: Path, files: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": files}), encoding="utf-8")
+    os.replace(tmp, path)
 
 
 def main() -> int:
-    failures = 0
-    for path in iter_files(REPO_ROOT):
-        if path.suffix.lower() == ".json":
-            try:
-                validate_json(path)
-            except SystemExit as e:
-                print(e, file=sys.stderr)
-                failures += 1
-        elif path.suffix.lower() == ".jsonl":
-            try:
-                validate_jsonl(path)
-            except SystemExit as e:
-                print(e, file=sys.stderr)
-                failures += 1
+    ap = argparse.ArgumentParser(description="Validate repository JSON/JSONL files (incremental)")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and rebuild the verdict cache")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (default: CPU count; 1 = inline)")
+    ap.add_argument("--root", type=str, default=str(REPO_ROOT))
+    args = ap.parse_args()
+
+    root = Path(args.root).resolve()
+    cache_path = CACHE_PATH if root == REPO_ROOT else root / ".validate_cache/validate_jsonl.json"
+    cache = {} if args.no_cache else _load_cache(cache_path)
+    files: Dict[str, Any] = {}
+    jobs: List[Dict[str, Any]] = []
+    for path in iter_files(root):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        rel = str(path.relative_to(root))
+        job = _plan(path, st, cache.get(rel))
+        if job is None:
+            files[rel] = cache[rel]
+        else:
+            job["rel"] = rel
+            jobs.append(job)
+
+    pending_bytes = sum(j["size"] - j.get("start", 0) for j in jobs)
+    workers = args.jobs or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1 and pending_bytes >= POOL_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+            results = list(ex.map(_check, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [_check(j) for j in jobs]
+    for job, entry in zip(jobs, results):
+        files[job["rel"]] = entry
+
+    _save_cache(cache_path, files)
+
+    failures = [e["error"] for _, e in sorted(files.items()) if not e["ok"]]
+    for err in failures:
+        print(err, file=sys.stderr)
     if failures:
-        print(f"Validation failed: {failures} file(s) with errors.", file=sys.stderr)
+        print(f"Validation failed: {len(failures)} file(s) with errors.", file=sys.stderr)
         return 1
-    print("JSON/JSONL validation PASS")
+    print(f"JSON/JSONL validation PASS ({len(files)} files, {len(jobs)} re-validated)")
     return 0
 
 